@@ -0,0 +1,16 @@
+from . import names, schema
+
+
+class APRadio(schema.APRadio):
+    """Cisco WLC access point radio"""
+
+    def titleSuffixes(self):
+        """Suffixes of the title, indexed for filtering the radio grid"""
+        return names.suffixes(self.titleOrId())
+
+    def snmpIgnore(self):
+        """Skips SNMP polling of disabled radios or radios of disabled APs"""
+        if super(APRadio, self).snmpIgnore() or self.enabled is False:
+            return True
+        ap = self.accessPoint()
+        return ap is not None and ap.enabled is False
@@ -0,0 +1,172 @@
+import re
+
+from . import names, schema
+from .packing import PACKED, POSITION
+
+
+HEX = re.compile('[0-9A-Fa-f]')
+
+
+def normalize_mac(value):
+    """Returns a MAC address in the modeled form, 00:11:22:AA:BB:CC
+
+    Accepts any separator or none, or the 6 raw octets of a trap varbind.
+    Returns None if the value isn't a MAC address.
+    """
+    if not value:
+        return None
+    if len(value) == 6:
+        octets = bytearray(
+            value if isinstance(value, bytes) else value.encode('latin-1')
+            )
+        if any(octet < 0x20 or octet > 0x7e for octet in octets):
+            return ':'.join('{0:02X}'.format(octet) for octet in octets)
+    digits = ''.join(HEX.findall(value))
+    if len(digits) != 12 or len(value) > 17:
+        return None
+    return ':'.join(digits[i:i + 2] for i in range(0, 12, 2)).upper()
+
+
+def packed_property(name):
+    """Returns a property read from packedProperties when the AP is
+    packed, or from its own attribute when it isn't"""
+    index = POSITION[name]
+    default = getattr(schema.AccessPoint, name, None)
+
+    def fget(self):
+        packed = self._packedProperties
+        if packed:
+            value = packed[index] if index < len(packed) else None
+            return default if value is None else value
+        return self.__dict__.get(name, default)
+
+    def fset(self, value):
+        packed = self._packedProperties
+        if packed:
+            values = list(packed) + [None] * (len(PACKED) - len(packed))
+            values[index] = value
+            self._packedProperties = tuple(values)
+        else:
+            self.__dict__[name] = value
+            self._p_changed = True
+
+    return property(fget, fset, doc=name)
+
+
+class AccessPoint(schema.AccessPoint):
+    """Cisco WLC access point"""
+
+    _packedProperties = tuple()
+
+    def _getPackedProperties(self):
+        return self._packedProperties
+
+    def _setPackedProperties(self, values):
+        # The attributes below are read and written through __dict__,
+        # which is empty until a ghost's state is loaded
+        self._p_activate()
+        values = tuple(values or tuple())
+        if values:
+            for name in PACKED:
+                self.__dict__.pop(name, None)
+        else:
+            # Unpacking, values go back to attributes of their own
+            for name, value in zip(PACKED, self._packedProperties):
+                if value is not None:
+                    self.__dict__[name] = value
+        self._packedProperties = values
+
+    # Set by CiscoControllerAP, see packing
+    packedProperties = property(_getPackedProperties, _setPackedProperties)
+
+    def pack(self):
+        """Moves this AP's display-only properties into packedProperties"""
+        if not self._packedProperties:
+            self.packedProperties = tuple(
+                self.__dict__.get(name) for name in PACKED
+                )
+
+    def titleSuffixes(self):
+        """Suffixes of the title, indexed for filtering the AP grid"""
+        return names.suffixes(self.titleOrId())
+
+    def snmpIgnore(self):
+        """Skips SNMP polling of disabled APs or those not measuring latency
+
+        Only the link latency datasources are SNMP, so an AP with latency
+        measurement off has nothing meaningful to poll.
+        """
+        return (
+            super(AccessPoint, self).snmpIgnore()
+            or self.enabled is False
+            or self.latency is False
+            )
+
+    @classmethod
+    def find(cls, dmd, query):
+        """Returns APs on any controller by Ethernet or radio MAC address,
+        serial number, IP address or name
+
+        MAC addresses, serials and IPs are looked up in the global index
+        kept up to date as CiscoControllerAP's datamaps are applied.
+        """
+        query = (query or '').strip()
+        if not query:
+            return list()
+
+        mac = normalize_mac(query)
+        if mac:
+            searches = ({'mac': mac}, {'radioMac': mac})
+        else:
+            searches = ({'serial': query.upper()}, {'ip': query})
+
+        found = dict()
+        for search in searches:
+            for ap in cls.search_objects(dmd, **search):
+                found.setdefault(ap.getPrimaryId(), ap)
+        if found:
+            return list(found.values())
+
+        # Names are in the global catalog rather than this class's index
+        for brain in dmd.global_catalog(meta_type=cls.meta_type, name=query):
+            try:
+                ap = brain.getObject()
+            except Exception:
+                continue
+            if isinstance(ap, cls):
+                found.setdefault(ap.getPrimaryId(), ap)
+        return list(found.values())
+
+    @classmethod
+    def search_objects(cls, dmd, **kwargs):
+        """Generates APs matching properties in the global AP index"""
+        # zenpacklib names global catalogs after the class's module
+        catalog = cls.__module__.replace('.', '_')
+        for brain in cls.class_search(dmd, catalog, **kwargs):
+            try:
+                yield brain.getObject()
+            except Exception:
+                continue
+
+    @classmethod
+    def find_radio(cls, dmd, radio_mac, slot):
+        """Returns the radio in a slot of the AP with a base radio MAC"""
+        mac = normalize_mac(radio_mac)
+        if not mac:
+            return None
+        for ap in cls.search_objects(dmd, radioMac=mac):
+            radio = ap.radio(slot)
+            if radio is not None:
+                return radio
+        return None
+
+    def radio(self, slot):
+        """Returns the radio in a slot of this AP, if modeled"""
+        return self.apRadios._getOb(
+            '{0}_{1}'.format(self.id, slot),
+            None
+            )
+
+
+for _name in PACKED:
+    setattr(AccessPoint, _name, packed_property(_name))
@@ -0,0 +1,79 @@
+from . import schema
+from .channels import BANDS, METRICS, datapoint
+
+
+class Controller(schema.Controller):
+    """Cisco Wireless LAN Controller"""
+
+    def getSnmpIgnoreReport(self):
+        """Counts components and OIDs per cycle skipped by snmpIgnore()
+
+        Returns a dict keyed by component class name, each value a dict of
+        the number of components, how many are ignored, and the OIDs per
+        cycle that are not polled as a result: one per SNMP datapoint, and
+        the columns of a row of the tables of each Python datasource plugin
+        that skips ignored components too, however many of the component's
+        datasources share it.
+        """
+        from . import dsplugins
+
+        report = dict()
+        for component in self.getDeviceComponents():
+            if not component.monitored():
+                continue
+            name = component.__class__.__name__
+            counts = report.setdefault(
+                name,
+                {'components': 0, 'ignored': 0, 'oids': 0}
+                )
+            counts['components'] += 1
+            if not component.snmpIgnore():
+                continue
+            counts['ignored'] += 1
+            plugins = set()
+            for template in component.getRRDTemplates():
+                for datasource in template.getRRDDataSources():
+                    if not datasource.enabled:
+                        continue
+                    if 'SNMP' == datasource.sourcetype:
+                        counts['oids'] += len(datasource.datapoints())
+                        continue
+                    module, _, name = getattr(
+                        datasource,
+                        'plugin_classname',
+                        ''
+                        ).rpartition('.')
+                    plugin = getattr(dsplugins, name, None)
+                    if dsplugins.__name__ == module \
+                            and getattr(plugin, 'skips_ignored', False):
+                        plugins.add(plugin)
+            counts['oids'] += sum(plugin.row_oids() for plugin in plugins)
+        return report
+
+    def getChannelMatrix(self):
+        """Returns the last channel matrix recorded by the channelMatrix
+        datasource, as a list of channels for each band
+
+        Each channel is a dict of its number, radios, clients, and mean
+        and maximum channel utilization.
+        """
+        names = list()
+        for _, _, channels in BANDS:
+            for channel in channels:
+                for suffix, _ in METRICS:
+                    names.append(
+                        'channelMatrix_' + datapoint(channel, suffix)
+                        )
+        last = self.getRRDValues(names) or dict()
+
+        matrix = dict()
+        for band, _, channels in BANDS:
+            rows = matrix.setdefault(band, list())
+            for channel in channels:
+                row = {'channel': channel}
+                for suffix, key in METRICS:
+                    row[key] = last.get(
+                        'channelMatrix_' + datapoint(channel, suffix)
+                        )
+                rows.append(row)
+        return matrix
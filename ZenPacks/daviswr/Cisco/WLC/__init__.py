@@ -1,4 +1,5 @@
 # https://zenpack-sdk.zenoss.com/en/2.0.0/changes.html
 from ZenPacks.zenoss.ZenPackLib import zenpacklib
-CFG = zenpacklib.load_yaml()
+from . import yamlcache
+CFG = yamlcache.load_yaml(zenpacklib)
 schema = CFG.zenpack_module.schema
@@ -0,0 +1,93 @@
+__doc__ = """capture
+
+records the raw (getdata, tabledata) results given to the CiscoController*
+modeler plugins, along with the device properties they used, so process()
+can be replayed offline by ZenPacks.daviswr.Cisco.WLC.replay
+
+CiscoControllerAPResumable's results also hold the tables its walk didn't
+finish, so a replay only updates existing components as the run did.
+
+Set zWlanModelCaptureDir to a directory writable by zenmodeler to enable.
+
+"""
+
+import gzip
+import os
+import time
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+
+deviceProperties = (
+    'zWlanModelCaptureDir',
+    )
+
+# Credentials are never written to a capture
+SECRETS = (
+    'Community',
+    'Password',
+    'SecurityName',
+    )
+
+
+def fixture_name(device_id, plugin_name, captured):
+    """Returns the file name of a capture"""
+    return '{0}_{1}_{2}.pickle.gz'.format(
+        device_id,
+        plugin_name,
+        time.strftime('%Y%m%d%H%M%S', time.localtime(captured))
+        )
+
+
+def capture(plugin, device, results, log):
+    """Writes a plugin's results to zWlanModelCaptureDir, if set"""
+    directory = getattr(device, 'zWlanModelCaptureDir', '')
+    if not directory:
+        return None
+
+    properties = dict()
+    for name in plugin.deviceProperties:
+        if any(secret in name for secret in SECRETS):
+            continue
+        properties[name] = getattr(device, name, None)
+
+    captured = time.time()
+    fixture = {
+        'plugin': '{0}.{1}'.format(
+            plugin.__class__.__module__,
+            plugin.__class__.__name__
+            ),
+        'device': device.id,
+        'captured': captured,
+        'properties': properties,
+        'results': results,
+        }
+
+    path = os.path.join(
+        directory,
+        fixture_name(device.id, plugin.name(), captured)
+        )
+    try:
+        capture_file = gzip.open(path, 'wb')
+        try:
+            pickle.dump(fixture, capture_file, 2)
+        finally:
+            capture_file.close()
+    except (IOError, OSError) as ex:
+        log.warn('Unable to write capture %s: %s', path, ex)
+        return None
+
+    log.info('Captured %s results for %s to %s', plugin.name(), device.id, path)
+    return path
+
+
+def load(path):
+    """Reads a capture written by capture()"""
+    capture_file = gzip.open(path, 'rb')
+    try:
+        return pickle.load(capture_file)
+    finally:
+        capture_file.close()
@@ -0,0 +1,39 @@
+__doc__ = """channels
+
+802.11 channels by band, in the order of the per-controller channel
+matrix recorded by the channelMatrix datasource
+
+"""
+
+# Band as modeled on APRadio: (datapoint suffix, channels)
+BANDS = (
+    ('2.4 GHz', '24', tuple(range(1, 15))),
+    ('5 GHz', '5', (
+        36, 40, 44, 48, 52, 56, 60, 64,
+        100, 104, 108, 112, 116, 120, 124, 128, 132, 136, 140, 144,
+        149, 153, 157, 161, 165,
+        )),
+    )
+
+# Datapoint ID suffix: matrix column
+METRICS = (
+    ('Radios', 'radios'),
+    ('Clients', 'clients'),
+    ('UtilAvg', 'utilAvg'),
+    ('UtilMax', 'utilMax'),
+    )
+
+
+def datapoint(channel, suffix):
+    """Returns the ID of a channel's datapoint"""
+    return 'ch{0}{1}'.format(channel, suffix)
+
+
+def primary(channel):
+    """Returns the primary channel number of a modeled channel, such as
+    36 for "36,40", or None
+    """
+    try:
+        return int(str(channel).split(',')[0])
+    except ValueError:
+        return None
@@ -0,0 +1,251 @@
+__doc__ = """coalesce
+
+folds the access point and radio status events of a mass outage, such
+as a failed switch stack member or PoE budget, into one event per switch,
+AP group or controller, with a limited number of per-component events
+
+Transitions are counted by scope over zWlanEventCoalesceWindow seconds.
+Once a scope has zWlanEventCoalesceMin problems of a kind, its problems
+are reported by a summary event for the scope, which is updated as the
+affected components change and cleared when the last one recovers.
+
+"""
+
+from collections import deque
+
+# Scope kind and where its summary says the components are, most
+# specific first
+SCOPES = (
+    ('neighbor', 'behind switch {0}'),
+    ('group', 'in AP group {0}'),
+    ('controller', 'on the controller'),
+    )
+
+WHERE = dict(SCOPES)
+
+# Event key: what its summary counts, singular and plural, and their
+# state
+NOUNS = {
+    'apRejoin': ('AP', 'APs', 'rejoined'),
+    'apStatus': ('AP', 'APs', 'down'),
+    'radioStatus': ('radio', 'radios', 'down'),
+    }
+
+# Event keys of problems cleared by a severity 0 event of the same key
+CLEARED = (
+    'apStatus',
+    'radioStatus',
+    )
+
+
+def neighbor(name, interface):
+    """Returns the switch, and the stack member or module of the port, an
+    AP's CDP neighbor reports, or None if there's no neighbor
+    """
+    if not name:
+        return None
+    module = (interface or '').rpartition('/')[0]
+    return '{0} {1}'.format(name, module).strip()
+
+
+def scopes(group, neighbor_key):
+    """Returns an AP's or radio's (kind, key) scopes, most specific first"""
+    keys = {
+        'neighbor': neighbor_key,
+        'group': group or None,
+        'controller': '',
+        }
+    return [
+        (kind, keys[kind])
+        for kind, _ in SCOPES
+        if keys[kind] is not None
+        ]
+
+
+class Storm(object):
+    """Components affected by problems of one kind in one scope"""
+
+    def __init__(self, event_key, kind, key):
+        self.event_key = event_key
+        self.kind = kind
+        self.key = key
+        self.components = set()
+        self.peak = 0
+        self.severity = 0
+
+    def add(self, component, severity):
+        self.components.add(component)
+        self.peak = max(self.peak, len(self.components))
+        self.severity = max(self.severity, severity)
+
+    def event(self, device):
+        """Summary event for the storm's current state"""
+        where = WHERE[self.kind].format(self.key)
+        singular, plural, state = NOUNS.get(
+            self.event_key,
+            (self.event_key, self.event_key, 'affected')
+            )
+        count = len(self.components)
+        if count or self.event_key not in CLEARED:
+            count = count or self.peak
+            summary = '{0} {1} {2} {3}'.format(
+                count,
+                singular if 1 == count else plural,
+                state,
+                where
+                )
+            severity = self.severity
+        else:
+            summary = 'All {0} {1} {2} recovered'.format(
+                self.peak,
+                singular if 1 == self.peak else plural,
+                where
+                )
+            severity = 0
+        return {
+            'device': device,
+            'component': '',
+            'summary': summary,
+            'severity': severity,
+            'eventClass': '/Status/Wireless',
+            'eventKey': '{0}Storm {1} {2}'.format(
+                self.event_key,
+                self.kind,
+                self.key
+                ).strip(),
+            'affected': count,
+            }
+
+
+class Coalescer(object):
+    """Coalesces a device's status events from cycle to cycle"""
+
+    def __init__(self):
+        # (time, (event key, kind, key)) of problems within the window
+        self.recent = deque()
+        # (event key, kind, key): problems within the window
+        self.counts = dict()
+        # (event key, kind, key): Storm
+        self.storms = dict()
+        # (event key, component) of problem events sent, whose
+        # recoveries are always sent
+        self.open = set()
+
+    def state(self):
+        """Returns the open storms and problem events as lines, so they
+        can be restored after a collector restart
+        """
+        lines = list()
+        for group in sorted(self.storms):
+            storm = self.storms[group]
+            lines.append('\t'.join(
+                ('storm',)
+                + group
+                + (str(storm.peak), str(storm.severity))
+                + tuple(sorted(storm.components))
+                ))
+        for event_key, component in sorted(self.open):
+            lines.append('\t'.join(('open', event_key, component)))
+        return lines
+
+    def restore(self, lines):
+        """Restores the open storms and problem events from state()
+
+        The window's counts aren't kept, so it starts over.
+        """
+        for line in lines or ():
+            fields = line.split('\t')
+            try:
+                if 'storm' == fields[0]:
+                    group = tuple(fields[1:4])
+                    storm = Storm(*group)
+                    storm.peak = int(fields[4])
+                    storm.severity = int(fields[5])
+                    storm.components = set(fields[6:])
+                    self.storms[group] = storm
+                elif 'open' == fields[0]:
+                    self.open.add((fields[1], fields[2]))
+            except (IndexError, TypeError, ValueError):
+                continue
+
+    def affected(self, event_key, component):
+        """Whether a component's problem was sent or is in a storm"""
+        return (event_key, component) in self.open or any(
+            group[0] == event_key and component in storm.components
+            for group, storm in self.storms.items()
+            )
+
+    def expire(self, now, window):
+        """Forgets problems older than the window"""
+        while self.recent and self.recent[0][0] <= now - window:
+            _, group = self.recent.popleft()
+            self.counts[group] -= 1
+            if not self.counts[group]:
+                del self.counts[group]
+
+    def coalesce(self, device, transitions, now, window, minimum, detail):
+        """Returns the events to send for a cycle's transitions
+
+        transitions are (event, scopes) for each component event of the
+        cycle. With minimum 0, events are returned as they are.
+        """
+        if not minimum:
+            return [event for event, _ in transitions]
+
+        self.expire(now, window)
+        for event, event_scopes in transitions:
+            if not event['severity']:
+                continue
+            for kind, key in event_scopes:
+                group = (event['eventKey'], kind, key)
+                self.recent.append((now, group))
+                self.counts[group] = self.counts.get(group, 0) + 1
+
+        passed = list()
+        details = list()
+        changed = set()
+        for event, event_scopes in transitions:
+            component = event['component']
+            if not event['severity']:
+                # Recoveries of components in a storm update its summary
+                recovered = False
+                for group, storm in self.storms.items():
+                    if group[0] == event['eventKey'] \
+                            and component in storm.components:
+                        storm.components.discard(component)
+                        changed.add(group)
+                        recovered = True
+                opened = (event['eventKey'], component)
+                if opened in self.open or not recovered:
+                    self.open.discard(opened)
+                    passed.append(event)
+                else:
+                    details.append(event)
+                continue
+
+            # A storm already summarizing a scope takes its new problems,
+            # even once the window's count drops below the minimum
+            for kind, key in event_scopes:
+                group = (event['eventKey'], kind, key)
+                if group in self.storms \
+                        or self.counts.get(group, 0) >= minimum:
+                    break
+            else:
+                passed.append(event)
+                continue
+            if group not in self.storms:
+                self.storms[group] = Storm(*group)
+            self.storms[group].add(component, event['severity'])
+            changed.add(group)
+            details.append(event)
+
+        events = passed + details[:detail]
+        for event in events:
+            if event['severity'] and event['eventKey'] in CLEARED:
+                self.open.add((event['eventKey'], event['component']))
+        for group in sorted(changed):
+            storm = self.storms[group]
+            events.append(storm.event(device))
+            if not storm.components or storm.event_key not in CLEARED:
+                del self.storms[group]
+        return events
@@ -0,0 +1,1845 @@
+__doc__ = """dsplugins
+
+PythonCollector datasource plugins that walk a Cisco Wireless LAN
+Controller's (WLC) tables, or get its scalars, once per cycle for all of
+its components
+
+"""
+
+import bisect
+import heapq
+import logging
+import time
+
+from array import array
+from collections import deque
+
+try:
+    from itertools import izip as zip
+except ImportError:
+    # Python 3's zip is already lazy
+    pass
+
+from Products.DataCollector.plugins.CollectorPlugin \
+    import GetTableMap
+from Products.DataCollector.plugins.DataMaps \
+    import ObjectMap
+
+from ZenPacks.zenoss.PythonCollector.datasources.PythonDataSource \
+    import PythonDataSourcePlugin
+
+from ZenPacks.daviswr.Cisco.WLC import channels, coalesce
+from ZenPacks.daviswr.Cisco.WLC.walker \
+    import BulkTuning, TableWalker
+from ZenPacks.daviswr.Cisco.WLC.walker \
+    import deviceProperties as SNMP_PROPERTIES
+
+log = logging.getLogger('zen.CiscoWLC')
+
+
+def radio_enabled(context):
+    """Returns False if a radio, or its AP, is administratively disabled"""
+    if getattr(context, 'enabled', None) is False:
+        return False
+    ap = context.accessPoint()
+    return not ap or getattr(ap, 'enabled', None) is not False
+
+
+class SnmpTablePlugin(PythonDataSourcePlugin):
+    """Walks tables once per cycle, shared by all of a device's components
+
+    Subclasses define tablemaps and build their results in onSuccess().
+    """
+
+    proxy_attributes = SNMP_PROPERTIES
+
+    tablemaps = ()
+
+    # Whether components skipped by snmpIgnore() are also skipped by the
+    # plugin, for Controller.getSnmpIgnoreReport()
+    skips_ignored = False
+
+    def __init__(self, *args, **kwargs):
+        super(SnmpTablePlugin, self).__init__(*args, **kwargs)
+        # Learned GETBULK settings carry over from cycle to cycle
+        self.tuning = None
+
+    @classmethod
+    def config_key(cls, datasource, context):
+        """One task per device and plugin, whatever the component"""
+        return (
+            context.device().id,
+            datasource.getCycleTime(context),
+            cls.__name__,
+            )
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Component details needed to map rows back to components"""
+        params = {
+            'snmpindex': getattr(context, 'snmpindex', ''),
+            'title': context.titleOrId(),
+            }
+        device = context.device()
+        if context != device:
+            params['compname'] = context.getPrimaryId().replace(
+                device.getPrimaryId() + '/',
+                ''
+                )
+        return params
+
+    @classmethod
+    def row_oids(cls):
+        """Returns the OIDs walked for each row of the plugin's tables"""
+        return sum(len(tablemap.colnames) for tablemap in cls.tablemaps)
+
+    def components(self, config):
+        """Returns datasource configs keyed by component snmpindex"""
+        return dict(
+            (ds.params.get('snmpindex'), ds)
+            for ds in config.datasources
+            if ds.component and ds.params.get('snmpindex')
+            )
+
+    def walker(self, config):
+        """Returns an open TableWalker for the device"""
+        if self.tuning is None:
+            timeout = getattr(config, 'zSnmpTimeout', 2.5) or 2.5
+            reps = getattr(config, 'bulkMaxRepetitions', 0) or 20
+            self.tuning = BulkTuning(
+                max_repetitions=reps,
+                timeout=getattr(config, 'bulkTimeout', 0) or timeout,
+                max_timeout=timeout * 4,
+                )
+        walker = TableWalker(config, log, retries=1, tuning=self.tuning)
+        walker.open()
+        return walker
+
+    def collect(self, config):
+        """Walks the plugin's tables"""
+        walker = self.walker(config)
+        d = walker.walk_tables(self.tablemaps)
+
+        def close(result):
+            walker.close()
+            return result
+
+        d.addBoth(close)
+        return d
+
+    def targets(self):
+        """Names of what the plugin polls, for its error event"""
+        return ', '.join(tablemap.name for tablemap in self.tablemaps)
+
+    def onError(self, result, config):
+        """Error event for the whole walk"""
+        log.error('%s failed for %s: %s', self.__class__.__name__,
+                  config.id, result)
+        data = self.new_data()
+        data['events'].append({
+            'device': config.id,
+            'summary': 'Unable to poll {0}: {1}'.format(
+                self.targets(),
+                result.getErrorMessage()
+                ),
+            'severity': 3,
+            'eventClass': '/Status/Wireless',
+            'eventKey': self.__class__.__name__,
+            })
+        return data
+
+
+class SnmpScalarPlugin(SnmpTablePlugin):
+    """Gets scalars together in one request per cycle
+
+    Subclasses define scalars, {OID: name}, and build their results in
+    onSuccess() from the {name: value} this collects.
+    """
+
+    scalars = dict()
+
+    def targets(self):
+        return ', '.join(sorted(self.scalars.values()))
+
+    def oids(self, config):
+        """The scalars' OIDs to get this cycle"""
+        return sorted(self.scalars)
+
+    def collect(self, config):
+        """Gets the plugin's scalars"""
+        walker = self.walker(config)
+        oids = self.oids(config)
+        d = walker.get(oids)
+
+        def named(result):
+            walker.close()
+            values = dict()
+            for oid in oids:
+                value = result.get(oid)
+                name = self.scalars[oid]
+                if value is not None and value != '':
+                    values[name] = value
+            return values
+
+        def close(failure):
+            walker.close()
+            return failure
+
+        d.addCallbacks(named, close)
+        return d
+
+
+class AccessPointStatus(SnmpTablePlugin):
+    """Access point operational and join state for every AP, and radio
+    operational state for every radio, with a mass outage's events
+    coalesced by switch, AP group and controller
+    """
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'eventStorms',
+        'zWlanEventCoalesceMin',
+        'zWlanEventCoalesceWindow',
+        'zWlanEventDetailLimit',
+        )
+
+    tablemaps = (
+        GetTableMap(
+            'bsnAPTable',
+            '.1.3.6.1.4.1.14179.2.2.1.1',
+            {
+                # bsnAPOperationStatus
+                '.6': 'operStatus',
+                # bsnAPAdminStatus
+                '.37': 'enabled',
+                }
+            ),
+        GetTableMap(
+            'cLApTable',
+            '.1.3.6.1.4.1.9.9.513.1.1.1.1',
+            {
+                # cLApLwappUpTime
+                '.7': 'joinUpTime',
+                }
+            ),
+        GetTableMap(
+            'bsnAPIfTable',
+            '.1.3.6.1.4.1.14179.2.2.2.1',
+            {
+                '.12': 'bsnAPIfOperStatus',
+                }
+            ),
+        )
+
+    status_map = {
+        1: 'Associated',
+        2: 'Disassociating',
+        3: 'Downloading',
+        }
+
+    severity_map = {
+        'Associated': 0,
+        'Disassociating': 3,
+        'Downloading': 2,
+        'Not Joined': 4,
+        }
+
+    # bsnAPIfOperStatus
+    radio_status_map = {
+        1: 'Down',
+        2: 'Up',
+        }
+
+    def __init__(self, *args, **kwargs):
+        super(AccessPointStatus, self).__init__(*args, **kwargs)
+        # Component ID: (status, join uptime) as of the last cycle
+        self.states = dict()
+        self.coalescer = coalesce.Coalescer()
+        # Coalescer state as last modeled, None until restored from the
+        # controller's eventStorms
+        self.storm_state = None
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds an AP's last known status, so a restart raises no events,
+        or a radio's AP, and the scopes its events are coalesced by
+        """
+        params = super(AccessPointStatus, cls).params(datasource, context)
+        if hasattr(context, 'accessPoint'):
+            ap = context.accessPoint()
+            params['radio'] = True
+            params['ap'] = ap.titleOrId() if ap else ''
+            params['apComponent'] = ap.id if ap else ''
+        else:
+            ap = context
+            params['operStatus'] = getattr(context, 'operStatus', None)
+        group = ap.apGroup() if ap else None
+        params['group'] = group.titleOrId() if group else ''
+        params['neighbor'] = coalesce.neighbor(
+            getattr(ap, 'neighborName', ''),
+            getattr(ap, 'neighborInterface', '')
+            )
+        return params
+
+    def ap_status(self, ds, tabledata, incomplete):
+        """Returns an AP's status and join uptime"""
+        row = tabledata.get('bsnAPTable', dict()).get(ds.params['snmpindex'])
+        if row is None:
+            # Not walked, rather than not joined
+            if 'bsnAPTable' in incomplete:
+                return None, None
+            status = 'Not Joined'
+        elif 2 == row.get('enabled'):
+            status = 'Disabled'
+        else:
+            status = self.status_map.get(row.get('operStatus'), 'Unknown')
+        uptime = tabledata.get('cLApTable', dict()).get(
+            ds.params['snmpindex'],
+            dict()
+            ).get('joinUpTime')
+        return status, uptime
+
+    def radio_status(self, ds, tabledata, incomplete):
+        """Returns a radio's status and bsnAPIfOperStatus"""
+        row = tabledata.get('bsnAPIfTable', dict()).get(
+            ds.params['snmpindex']
+            )
+        if row is None:
+            if 'bsnAPIfTable' in incomplete:
+                return None, None
+            return 'Down', None
+        value = row.get('bsnAPIfOperStatus')
+        return self.radio_status_map.get(value, 'Unknown'), value
+
+    def onSuccess(self, result, config):
+        """Events and status updates for APs and radios whose state
+        changed
+        """
+        tabledata, incomplete = result
+        data = self.new_data()
+        transitions = list()
+        if self.storm_state is None:
+            self.coalescer.restore(getattr(config, 'eventStorms', None))
+            self.storm_state = self.coalescer.state()
+
+        components = self.components(config)
+        aps = [ds for ds in components.values() if not ds.params.get('radio')]
+        radios = [ds for ds in components.values() if ds.params.get('radio')]
+
+        changed = set()
+        for ds in aps:
+            status, uptime = self.ap_status(ds, tabledata, incomplete)
+            if status is None:
+                continue
+
+            # Unchanged APs are left alone
+            last_status, last_uptime = self.states.get(
+                ds.component,
+                (ds.params.get('operStatus') or 'Associated', None)
+                )
+            self.states[ds.component] = (status, uptime)
+            rejoined = (
+                uptime is not None and last_uptime is not None
+                and uptime < last_uptime
+                )
+            if status == last_status and not rejoined:
+                continue
+
+            title = ds.params.get('title', ds.component)
+            scopes = coalesce.scopes(
+                ds.params.get('group'),
+                ds.params.get('neighbor')
+                )
+            if status != last_status:
+                changed.add(ds.component)
+                data['maps'].append(ObjectMap({
+                    'compname': ds.params.get('compname'),
+                    'modname': 'ZenPacks.daviswr.Cisco.WLC.AccessPoint',
+                    'operStatus': status,
+                    }))
+                transitions.append(({
+                    'device': config.id,
+                    'component': ds.component,
+                    'summary': 'AP {0} is {1}'.format(title, status.lower()),
+                    'severity': self.severity_map.get(status, 0),
+                    'eventClass': '/Status/Wireless',
+                    'eventKey': 'apStatus',
+                    }, scopes))
+            if rejoined:
+                transitions.append(({
+                    'device': config.id,
+                    'component': ds.component,
+                    'summary': 'AP {0} rejoined the controller'.format(title),
+                    'severity': 2,
+                    'eventClass': '/Status/Wireless',
+                    'eventKey': 'apRejoin',
+                    }, scopes))
+
+        for ds in radios:
+            status, value = self.radio_status(ds, tabledata, incomplete)
+            if status is None:
+                continue
+            if value is not None:
+                data['values'][ds.component]['bsnAPIfOperStatus'] = value
+
+            # A radio's first status is its baseline, unless its problem
+            # was open before a restart
+            if ds.component in self.states:
+                last_status = self.states[ds.component][0]
+            elif self.coalescer.affected('radioStatus', ds.component):
+                last_status = 'Down'
+            else:
+                last_status = status
+            self.states[ds.component] = (status, None)
+            # Radios of an AP that changed state are covered by its event
+            if status == last_status \
+                    or ds.params.get('apComponent') in changed:
+                continue
+
+            transitions.append(({
+                'device': config.id,
+                'component': ds.component,
+                'summary': 'Radio {0} {1} is {2}'.format(
+                    ds.params.get('ap', ''),
+                    ds.params.get('title', ds.component),
+                    status.lower()
+                    ),
+                'severity': 0 if 'Up' == status else 3,
+                'eventClass': '/Status/Wireless',
+                'eventKey': 'radioStatus',
+                }, coalesce.scopes(
+                    ds.params.get('group'),
+                    ds.params.get('neighbor')
+                    )))
+
+        data['events'].extend(self.coalescer.coalesce(
+            config.id,
+            transitions,
+            time.time(),
+            getattr(config, 'zWlanEventCoalesceWindow', 300) or 300,
+            getattr(config, 'zWlanEventCoalesceMin', 10) or 0,
+            getattr(config, 'zWlanEventDetailLimit', 10) or 0
+            ))
+        state = self.coalescer.state()
+        if state != self.storm_state:
+            data['maps'].append(ObjectMap({
+                'modname': 'ZenPacks.daviswr.Cisco.WLC.Controller',
+                'eventStorms': state,
+                }))
+            self.storm_state = state
+        if transitions:
+            log.debug(
+                '%s: %s AP and radio status changes, %s events',
+                config.id,
+                len(transitions),
+                len(data['events'])
+                )
+        return data
+
+
+class Rollup(object):
+    """Running client and channel utilization totals for a set of radios"""
+
+    def __init__(self):
+        self.radios = 0
+        self.clients = 0
+        self.poor_snr = 0
+        self.utilization = 0
+        # Radios at each channel utilization percentage, for the maximum
+        self.histogram = [0] * 101
+
+    def add(self, clients, poor_snr, utilization, sign=1):
+        """Adds a radio's values, or removes them with a sign of -1"""
+        self.radios += sign
+        self.clients += sign * clients
+        self.poor_snr += sign * poor_snr
+        self.utilization += sign * utilization
+        self.histogram[utilization] += sign
+
+    def values(self, suffix=''):
+        """Returns datapoint values, their IDs ending with suffix"""
+        peak = 0
+        for percent in range(100, -1, -1):
+            if self.histogram[percent]:
+                peak = percent
+                break
+        return {
+            'clients' + suffix: self.clients,
+            'poorSnrClients' + suffix: self.poor_snr,
+            'channelUtilAvg' + suffix:
+                float(self.utilization) / self.radios if self.radios else 0,
+            'channelUtilMax' + suffix: peak,
+            }
+
+
+class RadioLoad(SnmpTablePlugin):
+    """Radio load metrics and client, poor-SNR and channel utilization
+    thresholds for every radio, evaluated together once per cycle
+    """
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'zWlanApChannelUtilThreshold',
+        'zWlanApClientThreshold',
+        'zWlanApGroupClientThresholds',
+        'zWlanApPoorSnrThreshold',
+        )
+
+    skips_ignored = True
+
+    tablemaps = (
+        GetTableMap(
+            'bsnAPIfLoadParametersTable',
+            '.1.3.6.1.4.1.14179.2.2.13.1',
+            {
+                '.1': 'bsnAPIfLoadRxUtilization',
+                '.2': 'bsnAPIfLoadTxUtilization',
+                '.3': 'bsnAPIfLoadChannelUtilization',
+                '.4': 'bsnAPIfLoadNumOfClients',
+                '.24': 'bsnAPIfPoorSNRClients',
+                }
+            ),
+        )
+
+    # Datapoint ID suffixes for per-band rollups
+    bands = {
+        '2.4 GHz': '24',
+        '5 GHz': '5',
+        }
+
+    # Threshold bit: (datapoint, event key, summary)
+    checks = (
+        (1, 'bsnAPIfLoadNumOfClients', 'radioClients',
+         '{0} clients, threshold {1}'),
+        (2, 'bsnAPIfPoorSNRClients', 'radioPoorSnr',
+         '{0} clients with poor SNR, threshold {1}'),
+        (4, 'bsnAPIfLoadChannelUtilization', 'radioChannelUtil',
+         'channel utilization {0}%, threshold {1}%'),
+        )
+
+    def __init__(self, *args, **kwargs):
+        super(RadioLoad, self).__init__(*args, **kwargs)
+        # Component ID: threshold bits exceeded as of the last cycle
+        self.exceeded = dict()
+        # (APGroup ID or '' for the controller, band suffix): Rollup
+        self.rollups = dict()
+        # Radio component ID: (rollup keys, values) it contributed
+        self.contributions = dict()
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds the radio's AP, AP group and thresholds last exceeded, or
+        marks an APGroup or Controller datasource as a rollup of its radios
+        """
+        params = super(RadioLoad, cls).params(datasource, context)
+        if not hasattr(context, 'accessPoint'):
+            params['rollup'] = True
+            return params
+        params['band'] = getattr(context, 'band', '')
+        params['channel'] = channels.primary(getattr(context, 'channel', ''))
+        # As of the last cycle before a restart, so recoveries during it
+        # are still cleared
+        params['exceeded'] = getattr(context, 'thresholdsExceeded', 0) or 0
+        params['enabled'] = radio_enabled(context)
+        ap = context.accessPoint()
+        if ap:
+            params['ap'] = ap.titleOrId()
+            group = ap.apGroup()
+            params['group'] = group.titleOrId() if group else ''
+            params['groupId'] = group.id if group else ''
+        return params
+
+    def components(self, config):
+        """Returns radio datasource configs keyed by snmpindex"""
+        return dict(
+            (snmpindex, ds)
+            for snmpindex, ds in super(RadioLoad, self).components(
+                config
+                ).items()
+            if not ds.params.get('rollup')
+            )
+
+    def update_rollups(self, contributions):
+        """Applies changes in radios' values to the running rollups
+
+        contributions maps each radio reported this cycle to its
+        (rollup keys, (clients, poor SNR clients, channel utilization)).
+        Only radios whose values changed, appeared or disappeared touch
+        the rollups.
+        """
+        for component in list(self.contributions):
+            if component not in contributions:
+                keys, values = self.contributions.pop(component)
+                for key in keys:
+                    self.rollups[key].add(*values, sign=-1)
+
+        for component, contribution in contributions.items():
+            last = self.contributions.get(component)
+            if contribution == last:
+                continue
+            if last:
+                for key in last[0]:
+                    self.rollups[key].add(*last[1], sign=-1)
+            keys, values = contribution
+            for key in keys:
+                self.rollups.setdefault(key, Rollup()).add(*values)
+            self.contributions[component] = contribution
+
+    def rollup_values(self, scope):
+        """Returns datapoint values for an APGroup ID, or '' for all"""
+        values = dict()
+        for suffix in [''] + sorted(self.bands.values()):
+            values.update(
+                self.rollups.get((scope, suffix), Rollup()).values(suffix)
+                )
+        return values
+
+    def client_thresholds(self, config):
+        """Returns the default client threshold and overrides by AP group
+
+        zWlanApGroupClientThresholds lines are an AP group name and its
+        threshold, separated by whitespace.
+        """
+        overrides = dict()
+        for line in getattr(config, 'zWlanApGroupClientThresholds', []):
+            try:
+                group, threshold = line.rsplit(None, 1)
+                overrides[group] = int(threshold)
+            except ValueError:
+                log.warn(
+                    '%s: ignoring zWlanApGroupClientThresholds line %r',
+                    config.id,
+                    line
+                    )
+        default = getattr(config, 'zWlanApClientThreshold', 0) or 0
+        return default, overrides
+
+    def channel_matrix(self, radios, clients, utilization):
+        """Returns channel datapoint values for the controller
+
+        Radios, clients, and mean and maximum channel utilization are
+        accumulated in one pass into an array per metric, indexed by the
+        channel's position in channels.BANDS.
+        """
+        position = dict()
+        for band, _, band_channels in channels.BANDS:
+            for channel in band_channels:
+                position[(band, channel)] = len(position)
+        count = array('l', [0]) * len(position)
+        total = array('l', [0]) * len(position)
+        util_total = array('l', [0]) * len(position)
+        util_max = array('l', [0]) * len(position)
+
+        for i, ds in enumerate(radios):
+            j = position.get((ds.params.get('band'), ds.params.get('channel')))
+            if j is None:
+                continue
+            count[j] += 1
+            total[j] += clients[i]
+            util_total[j] += utilization[i]
+            if utilization[i] > util_max[j]:
+                util_max[j] = utilization[i]
+
+        values = dict()
+        for (band, channel), j in position.items():
+            values[channels.datapoint(channel, 'Radios')] = count[j]
+            values[channels.datapoint(channel, 'Clients')] = total[j]
+            values[channels.datapoint(channel, 'UtilAvg')] = (
+                float(util_total[j]) / count[j] if count[j] else 0
+                )
+            values[channels.datapoint(channel, 'UtilMax')] = util_max[j]
+        return values
+
+    def onSuccess(self, result, config):
+        """Datapoints for every radio, events for threshold crossings"""
+        tabledata, incomplete = result
+        table = tabledata.get('bsnAPIfLoadParametersTable', dict())
+        data = self.new_data()
+
+        default, overrides = self.client_thresholds(config)
+        snr_limit = getattr(config, 'zWlanApPoorSnrThreshold', 0) or 0
+        util_limit = getattr(config, 'zWlanApChannelUtilThreshold', 0) or 0
+
+        # Gather the cycle's rows into columns
+        radios = list()
+        # Radios not evaluated, and why
+        skipped = list()
+        contributions = dict()
+        columns = dict((check[1], array('l')) for check in self.checks)
+        client_limits = array('l')
+        for snmpindex, ds in self.components(config).items():
+            row = table.get(snmpindex)
+            if ds.params.get('enabled') is False:
+                skipped.append((ds, 'disabled'))
+                continue
+            elif not row:
+                # Rows past where an incomplete walk stopped may be there
+                if not incomplete:
+                    skipped.append((ds, 'no longer reporting load'))
+                continue
+            radios.append(ds)
+            for datapoint, value in row.items():
+                data['values'][ds.component][datapoint] = value
+            for column in columns:
+                columns[column].append(int(row.get(column) or 0))
+            client_limits.append(
+                overrides.get(ds.params.get('group'), default)
+                )
+
+            band = self.bands.get(ds.params.get('band'))
+            keys = [('', '')]
+            if ds.params.get('groupId'):
+                keys.append((ds.params['groupId'], ''))
+            if band:
+                keys.extend((scope, band) for scope, _ in list(keys))
+            contributions[ds.component] = (tuple(keys), (
+                int(row.get('bsnAPIfLoadNumOfClients') or 0),
+                int(row.get('bsnAPIfPoorSNRClients') or 0),
+                min(100, max(0, int(
+                    row.get('bsnAPIfLoadChannelUtilization') or 0
+                    ))),
+                ))
+
+        limits = {
+            'bsnAPIfLoadNumOfClients': client_limits,
+            'bsnAPIfPoorSNRClients': array('l', [snr_limit]) * len(radios),
+            'bsnAPIfLoadChannelUtilization':
+                array('l', [util_limit]) * len(radios),
+            }
+
+        # One pass per threshold over all radios, 0 disabling a threshold
+        masks = array('l', [0]) * len(radios)
+        for bit, column, _, _ in self.checks:
+            exceeded = [
+                limit and value > limit
+                for value, limit in zip(columns[column], limits[column])
+                ]
+            masks = array('l', [
+                mask | bit if over else mask
+                for mask, over in zip(masks, exceeded)
+                ])
+
+        # Rollups are left as they were if the walk didn't finish
+        if not incomplete:
+            self.update_rollups(contributions)
+        matrix = None
+        for ds in config.datasources:
+            if not ds.params.get('rollup'):
+                continue
+            data['values'][ds.component].update(
+                self.rollup_values(ds.component or '')
+                )
+            # Controller datasources, not APGroup
+            if not ds.component:
+                if matrix is None:
+                    matrix = self.channel_matrix(
+                        radios,
+                        columns['bsnAPIfLoadNumOfClients'],
+                        columns['bsnAPIfLoadChannelUtilization']
+                        )
+                data['values'][ds.component].update(matrix)
+
+        # Events only for radios whose exceeded thresholds changed
+        for i, ds in enumerate(radios):
+            mask = masks[i]
+            last = self.exceeded.get(
+                ds.component,
+                ds.params.get('exceeded', 0)
+                )
+            self.exceeded[ds.component] = mask
+            if mask == last:
+                continue
+            data['maps'].append(self.exceeded_map(ds, mask))
+            for bit, column, event_key, summary in self.checks:
+                if (mask ^ last) & bit:
+                    data['events'].append({
+                        'device': config.id,
+                        'component': ds.component,
+                        'summary': '{0} {1}'.format(
+                            self.radio_title(ds),
+                            summary.format(
+                                columns[column][i],
+                                limits[column][i]
+                                )
+                            ),
+                        'severity': 3 if mask & bit else 0,
+                        'eventClass': '/Perf/Wireless',
+                        'eventKey': event_key,
+                        })
+
+        # Thresholds radios no longer evaluated had exceeded are cleared
+        for ds, reason in skipped:
+            last = self.exceeded.get(
+                ds.component,
+                ds.params.get('exceeded', 0)
+                )
+            self.exceeded[ds.component] = 0
+            if not last:
+                continue
+            data['maps'].append(self.exceeded_map(ds, 0))
+            for bit, _, event_key, _ in self.checks:
+                if last & bit:
+                    data['events'].append({
+                        'device': config.id,
+                        'component': ds.component,
+                        'summary': '{0} {1}'.format(
+                            self.radio_title(ds),
+                            reason
+                            ),
+                        'severity': 0,
+                        'eventClass': '/Perf/Wireless',
+                        'eventKey': event_key,
+                        })
+
+        return data
+
+    def radio_title(self, ds):
+        """Returns a radio's AP and title, for event summaries"""
+        return '{0} {1}'.format(
+            ds.params.get('ap', ''),
+            ds.params.get('title', ds.component)
+            ).strip()
+
+    def exceeded_map(self, ds, mask):
+        """Returns an ObjectMap storing a radio's exceeded thresholds"""
+        return ObjectMap({
+            'compname': ds.params.get('compname'),
+            'modname': 'ZenPacks.daviswr.Cisco.WLC.APRadio',
+            'thresholdsExceeded': mask,
+            })
+
+
+def mac_index(value):
+    """Returns a MAC address OCTET STRING as a dotted-decimal index"""
+    return '.'.join(
+        str(octet if isinstance(octet, int) else ord(octet))
+        for octet in value or ''
+        )
+
+
+def index_int(index):
+    """Returns a dotted-decimal MAC address index as an integer"""
+    value = 0
+    for octet in index.split('.'):
+        value = (value << 8) | int(octet)
+    return value
+
+
+def ip_int(value):
+    """Returns an IpAddress, dotted-decimal or as 4 octets, as an integer,
+    or None if it isn't one
+    """
+    if not value:
+        return None
+    try:
+        # Shorter than any dotted-decimal address
+        if 4 == len(value):
+            octets = [
+                octet if isinstance(octet, int) else ord(octet)
+                for octet in value
+                ]
+        else:
+            octets = [int(octet) for octet in value.split('.')]
+    except (TypeError, ValueError):
+        return None
+    if 4 != len(octets):
+        return None
+    return index_int('.'.join(str(octet) for octet in octets))
+
+
+class MobileStations(SnmpTablePlugin):
+    """Client counts by WLAN, AP, AP group, protocol and band, client
+    roaming by AP and AP group, and clients addressed from each DHCP pool
+
+    bsnMobileStationTable is streamed rather than walked. Only the counts
+    and each client's current AP are kept. Client addresses are only
+    walked for controllers with modeled DHCP pools, and a pool's count is
+    compared to its modeled size, with an event when the share in use
+    passes zWlanDhcpUtilThreshold.
+    """
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'zWlanDhcpUtilThreshold',
+        'zWlanRoamWindow',
+        )
+
+    tablemaps = (
+        GetTableMap(
+            'bsnMobileStationTable',
+            '.1.3.6.1.4.1.14179.2.1.4.1',
+            {
+                # bsnMobileStationAPMacAddr
+                '.4': 'apMac',
+                # bsnMobileStationEssIndex
+                '.6': 'essIndex',
+                # bsnMobileStationProtocol
+                '.25': 'protocol',
+                }
+            ),
+        )
+
+    # bsnMobileStationIpAddress
+    address_column = ('.2', 'ip')
+
+    # bsnMobileStationProtocol: (datapoint suffix, band suffix)
+    protocols = {
+        1: ('11a', '5'),
+        2: ('11b', '24'),
+        3: ('11g', '24'),
+        6: ('11n24', '24'),
+        7: ('11n5', '5'),
+        10: ('11ac', '5'),
+        }
+
+    roam_metrics = (
+        'roamJoins',
+        'roamLeaves',
+        'roamsIn',
+        'roamsOut',
+        )
+
+    def __init__(self, *args, **kwargs):
+        super(MobileStations, self).__init__(*args, **kwargs)
+        # Client MAC address as an integer: AP number, as of the last cycle
+        self.clients = dict()
+        # AP snmpindex: AP number, and the reverse
+        self.ap_numbers = dict()
+        self.ap_indexes = list()
+        # Set once a complete walk has seeded self.clients
+        self.baseline = False
+        # Roam counts of each cycle in the window, and their totals
+        self.window = deque()
+        self.roams = dict()
+        # DHCP pool component ID: whether it's over the threshold
+        self.exhausted = dict()
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds the kind of component counted, an AP's AP group and a DHCP
+        pool's range and last known state
+        """
+        params = super(MobileStations, cls).params(datasource, context)
+        meta_type = getattr(context, 'meta_type', '')
+        if context == context.device():
+            params['kind'] = 'device'
+        elif 'AccessPoint' == meta_type:
+            params['kind'] = 'ap'
+            group = context.apGroup()
+            params['groupId'] = group.id if group else ''
+        elif 'APGroup' == meta_type:
+            params['kind'] = 'group'
+        elif 'DHCPPool' == meta_type:
+            params['kind'] = 'pool'
+            params['start'] = getattr(context, 'start', '')
+            params['end'] = getattr(context, 'end', '')
+            params['size'] = getattr(context, 'size', 0) or 0
+            params['exhausted'] = bool(getattr(context, 'exhausted', False))
+        else:
+            params['kind'] = 'wlan'
+        return params
+
+    def collect(self, config):
+        """Streams the client table into counts"""
+        # AP snmpindex: APGroup component ID
+        ap_groups = dict(
+            (ds.params.get('snmpindex'), ds.params.get('groupId'))
+            for ds in config.datasources
+            if 'ap' == ds.params.get('kind')
+            )
+        counts = dict()
+
+        def count(key):
+            counts[key] = counts.get(key, 0) + 1
+
+        pools = self.pools(config)
+        starts = [start for start, end, component in pools]
+
+        # Clients as of the last cycle, left as they are until this walk
+        # succeeds, and those seen so far this cycle
+        last = self.clients
+        current = dict()
+        changes = dict()
+
+        def roam(ap, metric):
+            changes[('ap', ap, metric)] = \
+                changes.get(('ap', ap, metric), 0) + 1
+            if ap_groups.get(ap):
+                key = ('group', ap_groups[ap], metric)
+                changes[key] = changes.get(key, 0) + 1
+
+        def add(index, row):
+            protocol, band = self.protocols.get(
+                row.get('protocol'),
+                ('Other', '')
+                )
+            ap = mac_index(row.get('apMac'))
+            keys = [
+                ('device', None),
+                ('wlan', str(row.get('essIndex'))),
+                ('ap', ap),
+                ]
+            if ap_groups.get(ap):
+                keys.append(('group', ap_groups[ap]))
+            for key in keys:
+                count(key + ('',))
+                if band:
+                    count(key + (band,))
+            count(('device', None, protocol))
+
+            if pools:
+                address = ip_int(row.get('ip'))
+                position = bisect.bisect_right(starts, address or 0) - 1
+                if address and position >= 0 \
+                        and address <= pools[position][1]:
+                    count(('pool', pools[position][2], ''))
+
+            client = index_int(index)
+            number = self.ap_number(ap)
+            previous = last.get(client)
+            current[client] = number
+            if previous is None:
+                roam(ap, 'roamJoins')
+            elif previous != number:
+                roam(self.ap_indexes[previous], 'roamsOut')
+                roam(ap, 'roamsIn')
+
+        walker = self.walker(config)
+        d = walker.stream_table(self.tablemap(pools), add)
+
+        def close(complete):
+            walker.close()
+            for client, number in last.items():
+                if client in current:
+                    continue
+                elif complete:
+                    # Not in the table this cycle
+                    roam(self.ap_indexes[number], 'roamLeaves')
+                else:
+                    # Possibly past where the walk stopped
+                    current[client] = number
+            self.clients = current
+            if self.baseline:
+                self.slide(changes, self.window_size(config))
+            elif complete:
+                # Every client would otherwise count as joining
+                self.baseline = True
+            return complete, counts
+
+        def fail(result):
+            walker.close()
+            return result
+
+        d.addCallbacks(close, fail)
+        return d
+
+    def pools(self, config):
+        """Returns (start, end, component ID) of the DHCP pools, as
+        integers, sorted by start address
+        """
+        pools = list()
+        for ds in config.datasources:
+            if 'pool' != ds.params.get('kind'):
+                continue
+            start = ip_int(ds.params.get('start'))
+            end = ip_int(ds.params.get('end'))
+            if start and end and start <= end:
+                pools.append((start, end, ds.component))
+        return sorted(pools)
+
+    def tablemap(self, pools):
+        """The client table, with addresses only if there are pools"""
+        if not pools:
+            return self.tablemaps[0]
+        columns = dict(self.tablemaps[0].colnames)
+        columns[self.address_column[0]] = self.address_column[1]
+        return GetTableMap(
+            self.tablemaps[0].name,
+            self.tablemaps[0].tableoid,
+            columns
+            )
+
+    def ap_number(self, ap):
+        """Returns the number standing in for an AP's snmpindex"""
+        number = self.ap_numbers.get(ap)
+        if number is None:
+            number = self.ap_numbers[ap] = len(self.ap_indexes)
+            self.ap_indexes.append(ap)
+        return number
+
+    def window_size(self, config):
+        """Returns the number of cycles in zWlanRoamWindow"""
+        minutes = getattr(config, 'zWlanRoamWindow', 60) or 60
+        cycletime = max([
+            getattr(ds, 'cycletime', 0) or 300
+            for ds in config.datasources
+            ] or [300])
+        return max(1, int(minutes * 60 // cycletime))
+
+    def slide(self, changes, size):
+        """Adds a cycle's roam counts to the window, dropping the oldest"""
+        self.window.append(changes)
+        for key, value in changes.items():
+            self.roams[key] = self.roams.get(key, 0) + value
+        while len(self.window) > size:
+            for key, value in self.window.popleft().items():
+                remaining = self.roams[key] - value
+                if remaining:
+                    self.roams[key] = remaining
+                else:
+                    del self.roams[key]
+
+    def onSuccess(self, result, config):
+        """Datapoints for every counted component, none if incomplete"""
+        complete, counts = result
+        data = self.new_data()
+        if not complete:
+            log.warn(
+                '%s: bsnMobileStationTable incomplete, not recording counts',
+                config.id
+                )
+            return data
+
+        # Datapoint ID suffixes, totals and by band
+        bands = ['', '24', '5']
+        protocols = sorted(
+            protocol for protocol, _ in self.protocols.values()
+            ) + ['Other']
+        threshold = getattr(config, 'zWlanDhcpUtilThreshold', 0) or 0
+        for ds in config.datasources:
+            kind = ds.params.get('kind')
+            suffixes = bands
+            if 'pool' == kind:
+                self.pool_usage(
+                    config,
+                    ds,
+                    counts.get(('pool', ds.component, ''), 0),
+                    threshold,
+                    data
+                    )
+                continue
+            elif 'device' == kind:
+                ident = None
+                suffixes = bands + protocols
+            elif 'group' == kind:
+                ident = ds.component
+            elif kind:
+                ident = ds.params.get('snmpindex')
+            else:
+                continue
+            for suffix in suffixes:
+                data['values'][ds.component]['stations' + suffix] = \
+                    counts.get((kind, ident, suffix), 0)
+            if self.baseline and kind in ('ap', 'group'):
+                for metric in self.roam_metrics:
+                    data['values'][ds.component][metric] = \
+                        self.roams.get((kind, ident, metric), 0)
+        return data
+
+    def pool_usage(self, config, ds, used, threshold, data):
+        """A DHCP pool's datapoints, and an event on threshold crossings"""
+        values = data['values'][ds.component]
+        values['clients'] = used
+        size = ds.params.get('size')
+        if not size:
+            return
+        utilization = 100.0 * used / size
+        values['utilization'] = utilization
+
+        exhausted = bool(threshold) and utilization >= threshold
+        last = self.exhausted.get(
+            ds.component,
+            ds.params.get('exhausted', False)
+            )
+        self.exhausted[ds.component] = exhausted
+        if exhausted == last:
+            return
+        data['maps'].append(ObjectMap({
+            'compname': ds.params.get('compname'),
+            'modname': 'ZenPacks.daviswr.Cisco.WLC.DHCPPool',
+            'exhausted': exhausted,
+            }))
+        data['events'].append({
+            'device': config.id,
+            'component': ds.component,
+            'summary': 'DHCP pool {0}: {1} of {2} addresses in use by '
+                       'clients ({3:.0f}%), threshold {4}%'.format(
+                           ds.params.get('title', ds.component),
+                           used,
+                           size,
+                           utilization,
+                           threshold
+                           ),
+            'severity': 4 if exhausted else 0,
+            'eventClass': '/Perf/Wireless',
+            'eventKey': 'dhcpPoolExhaustion',
+            })
+
+
+class Rogues(SnmpTablePlugin):
+    """Rogue AP counts by classification, channel and detecting AP group,
+    the strongest rogues, and events for newly contained or malicious ones
+
+    bsnRogueAPTable is streamed rather than walked. Besides the counts,
+    only the strongest zWlanRogueTopN rogues and the MAC addresses of
+    contained or malicious rogues are kept.
+    """
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'strongestRogues',
+        'zWlanRogueTopN',
+        )
+
+    tablemaps = (
+        GetTableMap(
+            'bsnRogueAPTable',
+            '.1.3.6.1.4.1.14179.2.1.7.1',
+            {
+                # bsnRogueAPMaxDetectedRSSI
+                '.10': 'rssi',
+                # bsnRogueAPSSID
+                '.11': 'ssid',
+                # bsnRogueAPDetectingAPMacAddress
+                '.13': 'apMac',
+                # bsnRogueAPState
+                '.24': 'state',
+                # bsnRogueAPClassType
+                '.25': 'classType',
+                # bsnRogueAPChannel
+                '.26': 'channel',
+                }
+            ),
+        )
+
+    # bsnRogueAPClassType: datapoint suffix
+    classes = {
+        0: 'Pending',
+        1: 'Friendly',
+        2: 'Malicious',
+        3: 'Unclassified',
+        4: 'Custom',
+        }
+
+    # bsnRogueAPState: contained, containedPending, knownContained
+    contained = (6, 8, 9)
+
+    # Events per cycle, beyond which they're summarized
+    event_limit = 50
+
+    def __init__(self, *args, **kwargs):
+        super(Rogues, self).__init__(*args, **kwargs)
+        # MAC addresses, as integers, of contained or malicious rogues
+        self.flagged = set()
+        # Set once a complete walk has seeded self.flagged
+        self.baseline = False
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds the snmpindex of each of an AP group's APs"""
+        params = super(Rogues, cls).params(datasource, context)
+        if 'APGroup' == getattr(context, 'meta_type', ''):
+            params['aps'] = [
+                ap.snmpindex for ap in context.accessPoints()
+                ]
+        return params
+
+    def collect(self, config):
+        """Streams the rogue table into counts"""
+        # AP snmpindex: APGroup component ID
+        ap_groups = dict()
+        for ds in config.datasources:
+            for ap in ds.params.get('aps', list()):
+                ap_groups[ap] = ds.component
+
+        limit = getattr(config, 'zWlanRogueTopN', 10) or 0
+        counts = dict()
+        strongest = list()
+        last = self.flagged
+        flagged = set()
+        new = list()
+
+        def count(key):
+            counts[key] = counts.get(key, 0) + 1
+
+        def add(index, row):
+            class_type = self.classes.get(row.get('classType'), 'Pending')
+            count(('device', ''))
+            count(('device', class_type))
+            channel = channels.primary(row.get('channel'))
+            if channel:
+                count(('channel', channel))
+            group = ap_groups.get(mac_index(row.get('apMac')))
+            if group:
+                count(('group', group))
+
+            flag = None
+            if row.get('state') in self.contained:
+                count(('device', 'Contained'))
+                flag = 'contained'
+            elif 'Malicious' == class_type:
+                flag = 'malicious'
+            if flag:
+                rogue = index_int(index)
+                flagged.add(rogue)
+                if rogue not in last:
+                    new.append((index, row.get('ssid'), flag))
+
+            if limit:
+                entry = (int(row.get('rssi') or -128), index, row.get('ssid'))
+                if len(strongest) < limit:
+                    heapq.heappush(strongest, entry)
+                elif entry > strongest[0]:
+                    heapq.heapreplace(strongest, entry)
+
+        walker = self.walker(config)
+        d = walker.stream_table(self.tablemaps[0], add)
+
+        def close(complete):
+            walker.close()
+            if complete:
+                self.flagged = flagged
+            else:
+                # A rogue not walked this cycle isn't new the next
+                last.update(flagged)
+            if not self.baseline:
+                self.baseline = complete
+                del new[:]
+            return complete, counts, sorted(strongest, reverse=True), new
+
+        def fail(result):
+            walker.close()
+            return result
+
+        d.addCallbacks(close, fail)
+        return d
+
+    def rogue_mac(self, index):
+        """Returns a MAC address index as colon-separated hex"""
+        return ':'.join(
+            '{0:02x}'.format(int(octet)) for octet in index.split('.')
+            )
+
+    def onSuccess(self, result, config):
+        """Counts, the strongest rogues, and events for new ones"""
+        complete, counts, strongest, new = result
+        data = self.new_data()
+
+        for index, ssid, flag in new[:self.event_limit]:
+            mac = self.rogue_mac(index)
+            data['events'].append({
+                'device': config.id,
+                'summary': 'New {0} rogue AP {1} ({2})'.format(
+                    flag,
+                    mac,
+                    ssid or 'no SSID'
+                    ),
+                'severity': 3,
+                'eventClass': '/Security/Wireless',
+                'eventKey': 'rogue_{0}'.format(mac),
+                })
+        if len(new) > self.event_limit:
+            data['events'].append({
+                'device': config.id,
+                'summary': '{0} more new contained or malicious rogue '
+                           'APs'.format(len(new) - self.event_limit),
+                'severity': 3,
+                'eventClass': '/Security/Wireless',
+                'eventKey': 'rogue_summary',
+                })
+
+        if not complete:
+            log.warn(
+                '%s: bsnRogueAPTable incomplete, not recording counts',
+                config.id
+                )
+            return data
+
+        # Only written when a different set of rogues is strongest
+        lines = [
+            '{0} {1} {2} dBm'.format(self.rogue_mac(index), ssid, rssi)
+            for rssi, index, ssid in strongest
+            ]
+        previous = getattr(config, 'strongestRogues', None) or list()
+        if set(line.split()[0] for line in lines) != \
+                set(line.split()[0] for line in previous):
+            config.strongestRogues = lines
+            data['maps'].append(ObjectMap({
+                'modname': 'ZenPacks.daviswr.Cisco.WLC.Controller',
+                'strongestRogues': lines,
+                }))
+
+        suffixes = [''] + sorted(self.classes.values()) + ['Contained']
+        for ds in config.datasources:
+            values = data['values'][ds.component]
+            if ds.component:
+                values['rogues'] = counts.get(('group', ds.component), 0)
+                continue
+            for suffix in suffixes:
+                values['rogues' + suffix] = counts.get(('device', suffix), 0)
+            for _, _, band_channels in channels.BANDS:
+                for channel in band_channels:
+                    values[channels.datapoint(channel, 'Rogues')] = \
+                        counts.get(('channel', channel), 0)
+        return data
+
+
+class NeighborGraph(object):
+    """RRM neighbor relationships between radios as parallel arrays
+
+    Radios are numbered by their position in the list given, and each
+    edge is a source radio number, a target radio number (-1 for radios
+    of other controllers) and the RSSI at which the source heard it.
+    """
+
+    def __init__(self, radios):
+        self.numbers = dict(
+            (snmpindex, number) for number, snmpindex in enumerate(radios)
+            )
+        # 4 bytes a radio number, where 'l' would take 8 on 64-bit Linux
+        self.source = array('i')
+        self.target = array('i')
+        self.rssi = array('b')
+
+    def __len__(self):
+        return len(self.source)
+
+    def add(self, source, target, rssi):
+        """Adds an edge between two radio snmpindexes"""
+        number = self.numbers.get(source)
+        if number is None:
+            return
+        self.source.append(number)
+        self.target.append(self.numbers.get(target, -1))
+        self.rssi.append(max(-128, min(127, rssi)))
+
+    def stats(self, channel, threshold):
+        """Returns per-radio arrays of neighbors, neighbors louder than
+        threshold, co-channel neighbors and the loudest neighbor's RSSI
+
+        channel is an array of each radio's primary channel, 0 if unknown.
+        """
+        size = len(self.numbers)
+        neighbors = array('l', [0]) * size
+        strong = array('l', [0]) * size
+        cochannel = array('l', [0]) * size
+        loudest = array('l', [-128]) * size
+        for source, target, rssi in zip(self.source, self.target, self.rssi):
+            neighbors[source] += 1
+            if rssi > threshold:
+                strong[source] += 1
+            if target >= 0 and channel[source] and \
+                    channel[source] == channel[target]:
+                cochannel[source] += 1
+            if rssi > loudest[source]:
+                loudest[source] = rssi
+        return neighbors, strong, cochannel, loudest
+
+
+class RadioNeighbors(SnmpTablePlugin):
+    """Per-radio RF neighbor statistics from the RRM neighbor table"""
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'zWlanRrmNeighborRssi',
+        )
+
+    skips_ignored = True
+
+    tablemaps = (
+        GetTableMap(
+            'bsnAPIfRxNeighborsTable',
+            '.1.3.6.1.4.1.14179.2.2.7.1',
+            {
+                # bsnAPIfRxNeighborRSSI
+                '.3': 'rssi',
+                # bsnAPIfRxNeighborSlot
+                '.4': 'slot',
+                }
+            ),
+        )
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds the radio's primary channel and whether it's enabled"""
+        params = super(RadioNeighbors, cls).params(datasource, context)
+        params['channel'] = channels.primary(getattr(context, 'channel', ''))
+        params['enabled'] = radio_enabled(context)
+        return params
+
+    def components(self, config):
+        """Returns enabled radios' datasource configs keyed by snmpindex"""
+        return dict(
+            (snmpindex, ds)
+            for snmpindex, ds in super(RadioNeighbors, self).components(
+                config
+                ).items()
+            if ds.params.get('enabled') is not False
+            )
+
+    def collect(self, config):
+        """Streams the neighbor table into a NeighborGraph"""
+        radios = self.components(config)
+        graph = NeighborGraph(sorted(radios))
+
+        def add(index, row):
+            # AP base radio MAC, slot, neighbor's base radio MAC
+            parts = index.split('.')
+            graph.add(
+                '.'.join(parts[:7]),
+                '.'.join(parts[7:13] + [str(row.get('slot'))]),
+                int(row.get('rssi') or -128)
+                )
+
+        walker = self.walker(config)
+        d = walker.stream_table(self.tablemaps[0], add)
+
+        def close(complete):
+            walker.close()
+            return complete, graph
+
+        def fail(result):
+            walker.close()
+            return result
+
+        d.addCallbacks(close, fail)
+        return d
+
+    def onSuccess(self, result, config):
+        """Neighbor datapoints for every radio"""
+        complete, graph = result
+        data = self.new_data()
+        if not complete:
+            log.warn(
+                '%s: bsnAPIfRxNeighborsTable incomplete, not recording '
+                'neighbors',
+                config.id
+                )
+            return data
+
+        radios = self.components(config)
+        order = sorted(radios)
+        channel = array('l', [
+            radios[snmpindex].params.get('channel') or 0
+            for snmpindex in order
+            ])
+        threshold = getattr(config, 'zWlanRrmNeighborRssi', -70)
+        neighbors, strong, cochannel, loudest = graph.stats(
+            channel,
+            threshold
+            )
+
+        for number, snmpindex in enumerate(order):
+            values = data['values'][radios[snmpindex].component]
+            values['neighbors'] = neighbors[number]
+            values['neighborsStrong'] = strong[number]
+            values['coChannelNeighbors'] = cochannel[number]
+            if neighbors[number]:
+                values['neighborRssiMax'] = loudest[number]
+
+        log.debug(
+            '%s: %s RRM neighbors of %s radios',
+            config.id,
+            len(graph),
+            len(order)
+            )
+        return data
+
+
+class AccessPointUplink(SnmpTablePlugin):
+    """Byte, packet and error rates, speed and duplex of every AP's
+    Ethernet interfaces, with events when an AP's uplink is degraded
+    """
+
+    proxy_attributes = SnmpTablePlugin.proxy_attributes + (
+        'zWlanApUplinkMinSpeed',
+        )
+
+    tablemaps = (
+        GetTableMap(
+            'cLApEthernetIfTable',
+            '.1.3.6.1.4.1.9.9.513.1.2.2.1',
+            {
+                # cLApEthernetIfDuplex
+                '.4': 'duplex',
+                # cLApEthernetIfLinkSpeed
+                '.5': 'speed',
+                # cLApEthernetIfRxUcastPkts
+                '.6': 'rxUcast',
+                # cLApEthernetIfRxNUcastPkts
+                '.7': 'rxNUcast',
+                # cLApEthernetIfTxUcastPkts
+                '.8': 'txUcast',
+                # cLApEthernetIfTxNUcastPkts
+                '.9': 'txNUcast',
+                # cLApEthernetIfInputErrors
+                '.12': 'rxErrors',
+                # cLApEthernetIfOutputErrors
+                '.26': 'txErrors',
+                # cLApEthernetIfRxTotalBytes
+                '.29': 'rxBytes',
+                # cLApEthernetIfTxTotalBytes
+                '.30': 'txBytes',
+                }
+            ),
+        )
+
+    # Datapoint: counters summed for its rate
+    counters = (
+        ('rxBytes', ('rxBytes',)),
+        ('txBytes', ('txBytes',)),
+        ('rxPackets', ('rxUcast', 'rxNUcast')),
+        ('txPackets', ('txUcast', 'txNUcast')),
+        ('rxErrors', ('rxErrors',)),
+        ('txErrors', ('txErrors',)),
+        )
+
+    # cLApEthernetIfDuplex
+    duplexes = {
+        1: 'unknown',
+        2: 'half',
+        3: 'full',
+        4: 'auto',
+        }
+
+    # Counter32 wraps at 2^32, anything larger is treated as a reset
+    wrap = 2 ** 32
+
+    def __init__(self, *args, **kwargs):
+        super(AccessPointUplink, self).__init__(*args, **kwargs)
+        # AP snmpindex: (time, interface snmpindex: counters)
+        self.last = dict()
+        # AP component ID: degraded summary, or '' if not degraded
+        self.degraded = dict()
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds the AP's CDP neighbor and its uplink's last known state"""
+        params = super(AccessPointUplink, cls).params(datasource, context)
+        params['neighborName'] = getattr(context, 'neighborName', '')
+        params['neighborInterface'] = getattr(
+            context,
+            'neighborInterface',
+            ''
+            )
+        params['degraded'] = getattr(context, 'uplinkDegraded', '') or ''
+        return params
+
+    def delta(self, value, last):
+        """Returns the increase of a counter, None if it was reset"""
+        if value is None or last is None:
+            return None
+        increase = value - last
+        if increase < 0:
+            increase += self.wrap
+        if increase < 0 or increase >= self.wrap / 2:
+            return None
+        return increase
+
+    def onSuccess(self, result, config):
+        """Rates for every AP, events for APs whose uplink state changed"""
+        tabledata, incomplete = result
+        table = tabledata.get('cLApEthernetIfTable', dict())
+        now = time.time()
+        data = self.new_data()
+
+        # Interfaces by AP, cLApSysMacAddress then cLApEthernetIfSlotId
+        interfaces = dict()
+        for snmpindex, row in table.items():
+            ap, _, slot = snmpindex.rpartition('.')
+            interfaces.setdefault(ap, dict())[slot] = row
+
+        minimum = getattr(config, 'zWlanApUplinkMinSpeed', 0) or 0
+        for snmpindex, ds in self.components(config).items():
+            rows = interfaces.get(snmpindex)
+            if not rows:
+                continue
+            values = data['values'][ds.component]
+
+            last_time, last_rows = self.last.get(snmpindex, (None, dict()))
+            self.last[snmpindex] = (now, rows)
+            elapsed = now - last_time if last_time else 0
+            for datapoint, columns in self.counters:
+                increases = list()
+                for slot, row in rows.items():
+                    previous = last_rows.get(slot, dict())
+                    for column in columns:
+                        increases.append(self.delta(
+                            row.get(column),
+                            previous.get(column)
+                            ))
+                if elapsed > 0 and None not in increases:
+                    values[datapoint] = sum(increases) / elapsed
+
+            # Slot 0 is the uplink
+            uplink = rows.get('0') or rows[sorted(rows)[0]]
+            speed = uplink.get('speed') or 0
+            duplex = self.duplexes.get(uplink.get('duplex'), 'unknown')
+            values['linkSpeed'] = speed
+
+            problems = list()
+            if speed and minimum and speed < minimum:
+                problems.append('{0} Mbps'.format(speed))
+            if 'half' == duplex:
+                problems.append('half duplex')
+            summary = ', '.join(problems)
+            last = self.degraded.get(
+                ds.component,
+                ds.params.get('degraded', '')
+                )
+            self.degraded[ds.component] = summary
+            if summary == last:
+                continue
+            data['maps'].append(ObjectMap({
+                'compname': ds.params.get('compname'),
+                'modname': 'ZenPacks.daviswr.Cisco.WLC.AccessPoint',
+                'uplinkDegraded': summary,
+                }))
+
+            port = ' '.join(
+                part for part in (
+                    ds.params.get('neighborName'),
+                    ds.params.get('neighborInterface'),
+                    ) if part
+                )
+            title = ds.params.get('title', ds.component)
+            data['events'].append({
+                'device': config.id,
+                'component': ds.component,
+                'summary': 'AP {0} uplink{1} {2}'.format(
+                    title,
+                    ' to {0}'.format(port) if port else '',
+                    'degraded: {0}'.format(summary) if summary else 'OK'
+                    ),
+                'severity': 3 if summary else 0,
+                'eventClass': '/Status/Wireless',
+                'eventKey': 'apUplink',
+                'cdpNeighbor': ds.params.get('neighborName'),
+                'cdpInterface': ds.params.get('neighborInterface'),
+                'linkSpeed': speed,
+                'duplex': duplex,
+                })
+
+        return data
+
+
+class ControllerScalars(SnmpScalarPlugin):
+    """Every controller-level scalar polled, in a single request per cycle,
+    for the Device template and the controller's temperature sensor
+
+    Memory utilization is computed from total and free memory from the
+    same request, so it doesn't depend on the modeled total. A controller
+    not yet modeled gets its AP count from here, so the modeling schedule
+    knows if it's large before its first model.
+    """
+
+    scalars = {
+        # agentCurrentCPUUtilization
+        '.1.3.6.1.4.1.14179.1.1.5.1.0': 'agentCurrentCPUUtilization',
+        # agentTotalMemory
+        '.1.3.6.1.4.1.14179.1.1.5.2.0': 'agentTotalMemory',
+        # agentFreeMemory
+        '.1.3.6.1.4.1.14179.1.1.5.3.0': 'agentFreeMemory',
+        # clsSysApConnectCount
+        '.1.3.6.1.4.1.9.9.618.1.8.4.0': 'clsSysApConnectCount',
+        # clsMaxClientsCount
+        '.1.3.6.1.4.1.9.9.618.1.8.12.0': 'clsMaxClientsCount',
+        # sysUpTime
+        '.1.3.6.1.2.1.1.3.0': 'sysUpTime',
+        # bsnOperatingTemperatureEnvironment
+        '.1.3.6.1.4.1.14179.2.3.1.12.0': 'environment',
+        # bsnSensorTemperature
+        '.1.3.6.1.4.1.14179.2.3.1.13.0': 'temperature_celsius',
+        }
+
+    # Only requested for controllers with a modeled temperature sensor
+    sensor = (
+        '.1.3.6.1.4.1.14179.2.3.1.12.0',
+        '.1.3.6.1.4.1.14179.2.3.1.13.0',
+        )
+
+    # bsnOperatingTemperatureEnvironment
+    environments = {
+        1: 'Commercial',
+        2: 'Industrial',
+        }
+
+    # Reported by the vWLC and WiSM, which lack a sensor
+    no_sensor = 5000
+
+    def __init__(self, *args, **kwargs):
+        super(ControllerScalars, self).__init__(*args, **kwargs)
+        # Sensor component ID: environment last modeled or polled
+        self.environment = dict()
+        # AP count modeled here for a controller not yet modeled
+        self.ap_count = 0
+
+    @classmethod
+    def params(cls, datasource, context):
+        """Adds a temperature sensor's modeled environment, or the
+        controller's modeled AP count
+        """
+        params = super(ControllerScalars, cls).params(datasource, context)
+        if context != context.device():
+            params['state'] = getattr(context, 'state', '')
+        else:
+            params['apCount'] = getattr(context, 'apCount', 0) or 0
+        return params
+
+    def oids(self, config):
+        if any(ds.component for ds in config.datasources):
+            return sorted(self.scalars)
+        return sorted(set(self.scalars) - set(self.sensor))
+
+    def onSuccess(self, result, config):
+        """Device datapoints, and the temperature sensor's"""
+        data = self.new_data()
+        values = data['values'][None]
+        for name in (
+                'agentCurrentCPUUtilization',
+                'agentFreeMemory',
+                'clsSysApConnectCount',
+                'clsMaxClientsCount',
+                'sysUpTime',
+                ):
+            if name in result:
+                values[name] = result[name]
+
+        ap_count = int(result.get('clsSysApConnectCount') or 0)
+        for ds in config.datasources:
+            if ds.component:
+                continue
+            if ap_count and not (self.ap_count or ds.params.get('apCount')):
+                data['maps'].append(ObjectMap({
+                    'modname': 'ZenPacks.daviswr.Cisco.WLC.Controller',
+                    'apCount': ap_count,
+                    }))
+                self.ap_count = ap_count
+            break
+
+        if 'agentFreeMemory' in result:
+            # AIRESPACE-SWITCHING-MIB reports memory in kilobytes
+            free = int(result['agentFreeMemory']) * 1024
+            total = int(result.get('agentTotalMemory') or 0) * 1024
+            if total:
+                used = total - free
+                values['totalMemory'] = total
+                values['usedMemory'] = used
+                values['mem_pct'] = 100.0 * used / total
+
+        temperature = result.get('temperature_celsius')
+        environment = self.environments.get(
+            result.get('environment'),
+            result.get('environment')
+            )
+        for ds in config.datasources:
+            if not ds.component:
+                continue
+            if temperature is not None and temperature != self.no_sensor:
+                data['values'][ds.component]['temperature_celsius'] = \
+                    temperature
+            last = self.environment.get(ds.component, ds.params.get('state'))
+            if environment and environment != last:
+                data['maps'].append(ObjectMap({
+                    'compname': ds.params.get('compname'),
+                    'modname': 'Products.ZenModel.TemperatureSensor',
+                    'state': environment,
+                    }))
+            self.environment[ds.component] = environment or last
+
+        return data
@@ -0,0 +1,76 @@
+__doc__ = """events
+
+resolves traps and syslog messages from Cisco Wireless LAN Controllers
+(WLC) to the access point or radio they concern, using the AccessPoint
+index rather than walking every controller's APs
+
+Called from the /Status/Wireless event class mapping transforms.
+
+"""
+
+import re
+
+from ZenPacks.daviswr.Cisco.WLC.AccessPoint \
+    import AccessPoint, normalize_mac
+
+
+# Trap varbinds identifying an AP, most specific first
+AP_VARBINDS = (
+    'bsnAPMacAddrTrapVariable',
+    'bsnAPName',
+    )
+
+SLOT_VARBINDS = (
+    'bsnAPIfSlotIdTrapVariable',
+    )
+
+# Syslog messages name the AP by its base radio MAC
+MAC = re.compile(r'\b(?:[0-9A-Fa-f]{2}[:.-]?){5}[0-9A-Fa-f]{2}\b')
+
+
+def varbind(evt, names):
+    """Returns the first of the named varbinds present on an event"""
+    for name in names:
+        # zentrap may keep the instance suffix of scalar varbinds
+        for attr in (name, '{0}.0'.format(name)):
+            value = getattr(evt, attr, None)
+            if value not in (None, ''):
+                return value
+    return None
+
+
+def find_ap(evt, device, dmd):
+    """Returns the AP on the event's device that an event concerns"""
+    queries = [varbind(evt, AP_VARBINDS)]
+    if not queries[0]:
+        queries = MAC.findall(getattr(evt, 'summary', '') or '')
+
+    device_id = device.id if device else evt.device
+    for query in queries:
+        if not query:
+            continue
+        for ap in AccessPoint.find(dmd, normalize_mac(query) or query):
+            if ap.device().id == device_id:
+                return ap
+    return None
+
+
+def resolve_ap(evt, device, dmd, event_key='apStatus'):
+    """Sets an event's component to the AP or radio it concerns
+
+    Returns the component, or None if the event doesn't name one that's
+    modeled on the event's device.
+    """
+    ap = find_ap(evt, device, dmd)
+    if ap is None:
+        return None
+
+    component = ap
+    slot = varbind(evt, SLOT_VARBINDS)
+    if slot is not None:
+        component = ap.radio(slot) or ap
+        event_key = 'radioStatus' if component is not ap else event_key
+
+    evt.component = component.id
+    evt.eventKey = event_key
+    return component
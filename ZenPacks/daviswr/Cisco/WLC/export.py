@@ -0,0 +1,415 @@
+__doc__ = """export
+
+writes every access point, radio and WLAN of the Cisco Wireless LAN
+Controllers (WLC) in a device class to columnar files, one per kind of
+component, for inventory and lifecycle reporting
+
+    python -m ZenPacks.daviswr.Cisco.WLC.export [-o DIR] [-i]
+
+Files are Parquet if pyarrow is installed, otherwise gzipped JSON with a
+line of columns per batch. Components are read and written in batches,
+with the ZODB cache trimmed after each, so memory doesn't grow with the
+number of APs. With --incremental, only components changed since the
+last export to the directory are written, along with the IDs of every
+component, so deletions can be found.
+
+"""
+
+import gzip
+import json
+import logging
+import optparse
+import os
+import time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from Products.ZenUtils.ZenScriptBase import ZenScriptBase
+
+log = logging.getLogger('zen.CiscoWLC.export')
+
+# Name of the file in the output directory recording the last export
+STATE = 'export.state'
+
+# Table: (column, type), read from each component
+TABLES = (
+    ('accessPoints', (
+        ('device', 'string'),
+        ('id', 'string'),
+        ('title', 'string'),
+        ('model', 'string'),
+        ('serial', 'string'),
+        ('swVersion', 'string'),
+        ('hwVersion', 'string'),
+        ('group', 'string'),
+        ('mac', 'string'),
+        ('ip', 'string'),
+        ('mode', 'string'),
+        ('enabled', 'bool'),
+        ('operStatus', 'string'),
+        ('location', 'string'),
+        ('neighborName', 'string'),
+        ('neighborInterface', 'string'),
+        ('neighborIp', 'string'),
+        ('neighborModel', 'string'),
+        ('modified', 'float'),
+        )),
+    ('radios', (
+        ('device', 'string'),
+        ('ap', 'string'),
+        ('id', 'string'),
+        ('slot', 'int'),
+        ('band', 'string'),
+        ('channel', 'string'),
+        ('width', 'string'),
+        ('mode', 'string'),
+        ('enabled', 'bool'),
+        ('modified', 'float'),
+        )),
+    ('wlans', (
+        ('device', 'string'),
+        ('id', 'string'),
+        ('title', 'string'),
+        ('type', 'string'),
+        ('profile', 'string'),
+        ('security', 'string'),
+        ('enabled', 'bool'),
+        ('modified', 'float'),
+        )),
+    )
+
+# Table of every component present at an incremental export, by the
+# table it's exported to
+IDS = 'ids'
+
+COLUMNS = dict(TABLES)
+COLUMNS[IDS] = (
+    ('table', 'string'),
+    ('device', 'string'),
+    ('id', 'string'),
+    )
+
+ARROW_TYPES = {
+    'bool': 'bool_',
+    'float': 'float64',
+    'int': 'int64',
+    'string': 'string',
+    }
+
+
+def coerce(value, kind):
+    """Returns a component's value as a column's type, or None"""
+    if value is None or value == '':
+        return None
+    try:
+        if 'bool' == kind:
+            return bool(value)
+        elif 'float' == kind:
+            return float(value)
+        elif 'int' == kind:
+            return int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if isinstance(value, type(u'')) else str(value)
+
+
+def modified(obj):
+    """Returns when a component was last committed, in epoch seconds"""
+    # A ghost's serial, and so its mtime, isn't known until it's loaded
+    obj._p_activate()
+    return obj._p_mtime or 0.0
+
+
+class JsonColumnsWriter(object):
+    """Writes batches as gzipped JSON, a line of columns per batch, after
+    a line naming the columns and their types
+    """
+
+    extension = 'json.gz'
+
+    def __init__(self, path, table):
+        self.file = gzip.open(path, 'wb')
+        self.write_line({'table': table, 'columns': COLUMNS[table]})
+
+    def write_line(self, data):
+        self.file.write(json.dumps(data, separators=(',', ':')).encode(
+            'utf-8'
+            ))
+        self.file.write(b'\n')
+
+    def write(self, columns):
+        self.write_line(columns)
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter(object):
+    """Writes batches as row groups of a Parquet file"""
+
+    extension = 'parquet'
+
+    def __init__(self, path, table):
+        self.schema = pyarrow.schema([
+            (name, getattr(pyarrow, ARROW_TYPES[kind])())
+            for name, kind in COLUMNS[table]
+            ])
+        # gzip for the widest support among Parquet readers
+        self.writer = pyarrow.parquet.ParquetWriter(
+            path,
+            self.schema,
+            compression='gzip'
+            )
+
+    def write(self, columns):
+        self.writer.write_table(pyarrow.Table.from_pydict(
+            columns,
+            schema=self.schema
+            ))
+
+    def close(self):
+        self.writer.close()
+
+
+class TableExport(object):
+    """Buffers one table's rows as columns, writing each full batch"""
+
+    def __init__(self, directory, table, stamp, writer_class, batch):
+        self.table = table
+        self.columns = COLUMNS[table]
+        self.batch = batch
+        self.path = os.path.join(directory, '{0}-{1}.{2}'.format(
+            table,
+            stamp,
+            writer_class.extension
+            ))
+        # Written under a temporary name until complete
+        self.partial = '{0}.partial'.format(self.path)
+        self.writer = writer_class(self.partial, table)
+        self.rows = 0
+        self.reset()
+
+    def reset(self):
+        self.buffer = dict((name, list()) for name, kind in self.columns)
+        self.buffered = 0
+
+    def add(self, values):
+        """Adds a row, writing the batch if it's full
+
+        Returns True if a batch was written.
+        """
+        for name, kind in self.columns:
+            self.buffer[name].append(coerce(values.get(name), kind))
+        self.buffered += 1
+        self.rows += 1
+        if self.buffered >= self.batch:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        if self.buffered:
+            self.writer.write(self.buffer)
+            self.reset()
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+        os.rename(self.partial, self.path)
+
+    def abort(self):
+        self.writer.close()
+        os.remove(self.partial)
+
+
+def controllers(dmd, path):
+    """Yields the controllers in a device class and its subclasses"""
+    for device in dmd.Devices.getOrganizer(path).getSubDevicesGen():
+        if hasattr(device, 'apGroups'):
+            yield device
+
+
+def rows(device, since=0, ids=False):
+    """Yields (table, values) for a controller's components changed
+    after since, and with ids, the IDS row of every component
+    """
+    for group in device.apGroups():
+        for ap in group.accessPoints():
+            if ids:
+                yield IDS, {
+                    'table': 'accessPoints',
+                    'device': device.id,
+                    'id': ap.id,
+                    }
+            ap_modified = modified(ap)
+            if ap_modified > since:
+                values = dict(
+                    (name, getattr(ap, name, None))
+                    for name, kind in COLUMNS['accessPoints']
+                    )
+                values.update({
+                    'device': device.id,
+                    'title': ap.titleOrId(),
+                    'modified': ap_modified,
+                    })
+                yield 'accessPoints', values
+            for radio in ap.apRadios():
+                if ids:
+                    yield IDS, {
+                        'table': 'radios',
+                        'device': device.id,
+                        'id': radio.id,
+                        }
+                radio_modified = modified(radio)
+                if radio_modified <= since:
+                    continue
+                values = dict(
+                    (name, getattr(radio, name, None))
+                    for name, kind in COLUMNS['radios']
+                    )
+                values.update({
+                    'device': device.id,
+                    'ap': ap.id,
+                    'slot': radio.id.rpartition('_')[2],
+                    'modified': radio_modified,
+                    })
+                yield 'radios', values
+
+    for wlan in device.wlans():
+        if ids:
+            yield IDS, {
+                'table': 'wlans',
+                'device': device.id,
+                'id': wlan.id,
+                }
+        wlan_modified = modified(wlan)
+        if wlan_modified <= since:
+            continue
+        values = dict(
+            (name, getattr(wlan, name, None))
+            for name, kind in COLUMNS['wlans']
+            )
+        values.update({
+            'device': device.id,
+            'title': wlan.titleOrId(),
+            'type': wlan.meta_type,
+            'modified': wlan_modified,
+            })
+        yield 'wlans', values
+
+
+def read_state(directory):
+    """Returns when the last export to a directory started, or 0"""
+    try:
+        with open(os.path.join(directory, STATE)) as state_file:
+            return float(json.load(state_file)['started'])
+    except (IOError, OSError, KeyError, TypeError, ValueError):
+        return 0
+
+
+def write_state(directory, started):
+    path = os.path.join(directory, STATE)
+    with open('{0}.partial'.format(path), 'w') as state_file:
+        json.dump({'started': started}, state_file)
+    os.rename('{0}.partial'.format(path), path)
+
+
+def export(dmd, directory, path='/Network/Cisco/Controller', batch=5000,
+           incremental=False, writer_class=None):
+    """Exports every controller's components, returning rows by table
+
+    An incremental export also writes the IDS table, listing every
+    component whether changed or not, so a component missing from it
+    was deleted.
+    """
+    if writer_class is None:
+        writer_class = ParquetWriter if pyarrow else JsonColumnsWriter
+    started = time.time()
+    since = read_state(directory) if incremental else 0
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(started))
+    if since:
+        stamp = '{0}-changes'.format(stamp)
+        log.info('Exporting components changed since %s', time.ctime(since))
+
+    names = [table for table, columns in TABLES]
+    if since:
+        names.append(IDS)
+    tables = dict()
+    try:
+        for table in names:
+            tables[table] = TableExport(
+                directory,
+                table,
+                stamp,
+                writer_class,
+                batch
+                )
+        for device in controllers(dmd, path):
+            log.info('Exporting %s', device.id)
+            for table, values in rows(device, since, bool(since)):
+                if tables[table].add(values):
+                    # Written rows' components needn't stay in memory
+                    dmd._p_jar.cacheGC()
+            dmd._p_jar.cacheGC()
+    except Exception:
+        for table in tables.values():
+            table.abort()
+        raise
+
+    for table in tables.values():
+        table.close()
+        log.info('Wrote %s rows to %s', table.rows, table.path)
+    write_state(directory, started)
+    return dict((table, tables[table].rows) for table in tables)
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options]')
+    parser.add_option(
+        '-o', '--output',
+        default='.',
+        help='Directory to write the export files to'
+        )
+    parser.add_option(
+        '-c', '--device-class',
+        default='/Network/Cisco/Controller',
+        help='Device class of the controllers to export'
+        )
+    parser.add_option(
+        '-b', '--batch',
+        type='int',
+        default=5000,
+        help='Rows to read before writing them'
+        )
+    parser.add_option(
+        '-i', '--incremental',
+        action='store_true',
+        default=False,
+        help='Only export components changed since the last export'
+        )
+    parser.add_option(
+        '-j', '--json',
+        action='store_true',
+        default=False,
+        help='Write gzipped JSON columns even if pyarrow is installed'
+        )
+    options, args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    dmd = ZenScriptBase(connect=True, noopts=True).dmd
+    export(
+        dmd,
+        options.output,
+        path=options.device_class,
+        batch=options.batch,
+        incremental=options.incremental,
+        writer_class=JsonColumnsWriter if options.json else None
+        )
+
+
+if __name__ == '__main__':
+    main()
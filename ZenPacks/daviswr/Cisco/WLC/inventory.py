@@ -0,0 +1,109 @@
+__doc__ = """inventory
+
+counts access points and radios by model, software version, mode and
+band for the summaries CiscoControllerAP stores on each AP group and the
+controller, and checks stored summaries against the modeled components
+
+    from ZenPacks.daviswr.Cisco.WLC import inventory
+    inventory.mismatches(find('wlc1'))
+
+"""
+
+# Summary property, component kind, attribute counted
+COUNTS = (
+    ('apModels', 'ap', 'model'),
+    ('apSwVersions', 'ap', 'swVersion'),
+    ('apModes', 'ap', 'mode'),
+    ('radioBands', 'radio', 'band'),
+    )
+
+TOTALS = (
+    'apsEnabled',
+    'apsDisabled',
+    'radiosEnabled',
+    'radiosDisabled',
+    )
+
+ATTRIBUTES = tuple(name for name, kind, attr in COUNTS) + TOTALS
+
+
+def value_of(item, attr):
+    """Returns an attribute of a component or a cleaned SNMP row"""
+    if isinstance(item, dict):
+        return item.get(attr)
+    return getattr(item, attr, None)
+
+
+class Summary(object):
+    """Counts of APs and radios by attribute, and enabled totals"""
+
+    def __init__(self):
+        self.counts = dict((name, dict()) for name, kind, attr in COUNTS)
+        self.totals = dict.fromkeys(TOTALS, 0)
+
+    def add(self, kind, item):
+        """Counts an AP or radio, kind being 'ap' or 'radio'"""
+        for name, counted, attr in COUNTS:
+            if counted != kind:
+                continue
+            value = value_of(item, attr) or 'Unknown'
+            counts = self.counts[name]
+            counts[value] = counts.get(value, 0) + 1
+        # Unknown admin status counts as enabled, as snmpIgnore() does
+        state = 'Disabled' if value_of(item, 'enabled') is False else 'Enabled'
+        self.totals['{0}s{1}'.format(kind, state)] += 1
+
+    def update(self, other):
+        """Adds another summary's counts to this one"""
+        for name in other.counts:
+            counts = self.counts[name]
+            for value, count in other.counts[name].items():
+                counts[value] = counts.get(value, 0) + count
+        for name in other.totals:
+            self.totals[name] += other.totals[name]
+
+    def data(self):
+        """Returns the summary as property values for an ObjectMap
+
+        Counts are lines of "value: count", most common first.
+        """
+        data = dict(self.totals)
+        for name, counts in self.counts.items():
+            data[name] = [
+                '{0}: {1}'.format(value, count)
+                for value, count in sorted(
+                    counts.items(),
+                    key=lambda item: (-item[1], str(item[0]))
+                    )
+                ]
+        return data
+
+
+def traverse(obj):
+    """Summarizes an AP group or controller by walking its components"""
+    summary = Summary()
+    if hasattr(obj, 'apGroups'):
+        groups = obj.apGroups()
+    else:
+        groups = [obj]
+    for group in groups:
+        for ap in group.accessPoints():
+            summary.add('ap', ap)
+            for radio in ap.apRadios():
+                summary.add('radio', radio)
+    return summary
+
+
+def mismatches(obj):
+    """Compares an AP group's or controller's stored summary to its
+    components, returning {property: (stored, actual)} where they differ
+    """
+    actual = traverse(obj).data()
+    differences = dict()
+    for name in ATTRIBUTES:
+        stored = getattr(obj, name, None)
+        if isinstance(stored, (list, tuple)):
+            stored = list(stored)
+        if stored != actual[name]:
+            differences[name] = (stored, actual[name])
+    return differences
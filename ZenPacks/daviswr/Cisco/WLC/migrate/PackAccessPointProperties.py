@@ -0,0 +1,43 @@
+__doc__ = """PackAccessPointProperties
+
+moves existing access points' display-only properties into
+packedProperties, on controllers with zWlanApPackProperties set
+
+"""
+
+import logging
+
+import transaction
+
+from Products.ZenModel.migrate.Migrate import Version
+from Products.ZenModel.ZenPack import ZenPackMigration
+
+log = logging.getLogger('zen.CiscoWLC')
+
+# APs packed between savepoints
+BATCH = 1000
+
+
+class PackAccessPointProperties(ZenPackMigration):
+    version = Version(0, 2, 0)
+
+    def migrate(self, pack):
+        packed = 0
+        for device in pack.dmd.Devices.getSubDevicesGen():
+            if not hasattr(device, 'apGroups'):
+                continue
+            if not getattr(device, 'zWlanApPackProperties', False):
+                continue
+            for group in device.apGroups():
+                for ap in group.accessPoints():
+                    if ap.packedProperties:
+                        continue
+                    ap.pack()
+                    packed += 1
+                    if packed % BATCH == 0:
+                        transaction.savepoint(optimistic=True)
+        if packed:
+            log.info('Packed display-only properties of %s APs', packed)
+
+
+PackAccessPointProperties()
@@ -0,0 +1,40 @@
+__doc__ = """RemoveApModelWorkers
+
+deletes zWlanApModelWorkers, which set the size of a worker pool
+CiscoControllerAP no longer uses, wherever it is defined or overridden
+
+"""
+
+import logging
+
+from Products.ZenModel.migrate.Migrate import Version
+from Products.ZenModel.ZenPack import ZenPackMigration
+
+log = logging.getLogger('zen.CiscoWLC')
+
+PROPERTY = 'zWlanApModelWorkers'
+
+
+class RemoveApModelWorkers(ZenPackMigration):
+    version = Version(0, 2, 0)
+
+    def migrate(self, pack):
+        root = pack.dmd.Devices
+        overrides = [
+            obj for obj in root.getSubOrganizers() + list(
+                root.getSubDevicesGen()
+                )
+            if obj.hasProperty(PROPERTY)
+            ]
+        for obj in overrides:
+            obj.deleteZenProperty(PROPERTY)
+        if root.hasProperty(PROPERTY):
+            root.deleteZenProperty(PROPERTY)
+            log.info(
+                'Removed %s and %s overrides of it',
+                PROPERTY,
+                len(overrides)
+                )
+
+
+RemoveApModelWorkers()
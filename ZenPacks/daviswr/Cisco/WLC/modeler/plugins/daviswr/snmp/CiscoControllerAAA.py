@@ -14,6 +14,9 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerAAA(SnmpPlugin):
     maptype = 'ControllerAAA'
@@ -24,7 +27,7 @@ class CiscoControllerAAA(SnmpPlugin):
     deviceProperties = SnmpPlugin.deviceProperties + (
         'zWlanServerIgnoreSubnets',
         'zWlanServerIgnoreTypes',
-        )
+        ) + schedule.deviceProperties + capture.deviceProperties
 
     cldlServerEntry = {
         # cldlServerAddressType
@@ -89,9 +92,14 @@ class CiscoControllerAAA(SnmpPlugin):
             ),
         )
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         getdata, tabledata = results
 
         log.debug('SNMP Tables:\n%s', tabledata)
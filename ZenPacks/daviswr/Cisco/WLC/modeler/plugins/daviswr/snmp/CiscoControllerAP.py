@@ -15,6 +15,9 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, inventory, packing, schedule
+
 
 class CiscoControllerAP(SnmpPlugin):
     maptype = 'ControllerAP'
@@ -24,7 +27,8 @@ class CiscoControllerAP(SnmpPlugin):
         'zWlanApIgnoreModels',
         'zWlanApIgnoreNames',
         'zWlanApIgnoreSubnets',
-        )
+        'zWlanApPackProperties',
+        ) + schedule.deviceProperties + capture.deviceProperties
 
     bsnAPGroupsVlanEntry = {
         # bsnAPGroupsVlanName
@@ -44,6 +48,8 @@ class CiscoControllerAP(SnmpPlugin):
         '.4': 'location',
         # bsnAPMonitorOnlyMode
         '.5': 'mode',
+        # bsnAPOperationStatus
+        '.6': 'operStatus',
         # bsnAPSoftwareVersion
         '.8': 'swVersion',
         # bsnAPBootVersion
@@ -171,8 +177,21 @@ class CiscoControllerAP(SnmpPlugin):
             ),
         )
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
+        try:
+            capture.capture(self, device, results, log)
+            return self.build_maps(device, results, log)
+        finally:
+            # A large controller's lease is returned even if this failed
+            schedule.release(device.id)
+
+    def build_maps(self, device, results, log):
+        """Returns the maps for the AP groups, APs and radios"""
         log.info('processing %s for device %s', self.name(), device.id)
         maps = list()
         getdata, tabledata = results
@@ -306,45 +325,6 @@ class CiscoControllerAP(SnmpPlugin):
             row.update(cLApLinkLatencyTable.get(snmpindex, dict()))
             row.update(cLApTable.get(snmpindex, dict()))
 
-            # Clean up some values
-            attr_map = dict()
-            attr_map['enabled'] = {
-                1: True,
-                2: False,
-                }
-
-            attr_map['latency'] = attr_map['enabled']
-
-            attr_map['mode'] = {
-                0: 'Local',
-                1: 'Monitor',
-                # (H)REAP
-                2: 'FlexConnect',
-                3: 'Rogue Detector',
-                4: 'Sniffer',
-                5: 'Bridge',
-                #  CleanAir-enabled models only
-                6: 'Spectrum Expert Connect',
-                }
-
-            for attr in attr_map:
-                if attr in row:
-                    row[attr] = attr_map[attr].get(row[attr], row[attr])
-
-            macs = [
-                'radioMac',
-                'mac',
-                ]
-            for attr in macs:
-                if attr in row:
-                    row[attr] = self.asmac(row[attr])
-
-            if model:
-                row['model'] = row['model'].strip(' ')
-
-            if 'iosVersion' in row:
-                row['iosVersion'] = row['iosVersion'].strip('$')
-
             # Entity hardware version
             entity = entPhysicalTable.get(str(row.get('ent_idx', 0)), dict())
             row['hwVersion'] = entity.get('hwVersion', None)
@@ -368,6 +348,7 @@ class CiscoControllerAP(SnmpPlugin):
                 ap_groups[group] = {
                     'id': self.prepId(group),
                     'title': group,
+                    'access_points': dict(),
                     }
 
             ap_groups[group]['access_points'][name] = row
@@ -379,92 +360,13 @@ class CiscoControllerAP(SnmpPlugin):
             ap_index = '.'.join(snmpindex.split('.')[:-1]).strip('.')
             radio_index = snmpindex.replace(ap_index, '').strip('.')
 
+            # Radio of an ignored AP
+            if ap_index not in ap_radios:
+                continue
+
             # Merge with other AP radio table, same indexing
             row.update(cLApDot11IfTable.get(snmpindex, dict()))
 
-            attr_map = dict()
-            attr_map['11n'] = {
-                1: True,
-                2: False,
-                }
-
-            attr_map['antenna'] = {
-                1: 'Internal',
-                2: 'External',
-                }
-
-            attr_map['assignment'] = {
-                1: 'Automatic',
-                2: 'Customized',
-                }
-
-            attr_map['band'] = {
-                1: '2.4 GHz',
-                2: '5 GHz',
-                }
-
-            attr_map['diversity'] = {
-                # Right?
-                0: 'Connector A',
-                # Left?
-                1: 'Connector B',
-                255: 'Enabled',
-                }
-
-            attr_map['enabled'] = attr_map['11n']
-
-            attr_map['mode'] = {
-                1: 'Sector A',
-                2: 'Sector B',
-                3: 'Omnidirectional',
-                99: 'Not Applicable',
-                }
-
-            # Assuming cLApDot11IfEntry.24's lower values are
-            # compatible with cLAp11nChannelBandwidth
-            attr_map['width'] = {
-                1: '5 MHz',
-                2: '10 MHz',
-                3: '20 MHz',
-                4: '40 MHz',
-                5: '80 MHz',
-                }
-
-            attr_map['width_new'] = attr_map['width']
-
-            for attr in attr_map:
-                if attr in row:
-                    row[attr] = attr_map[attr].get(row[attr], row[attr])
-
-            # Gain is reported in multiples of 0.5 dBm
-            if 'gain' in row:
-                row['gain'] = row['gain']*0.5
-
-            # IEEE 802.11 radio type
-            row['dot11'] = '802.11'
-            if row.get('11n'):
-                row['dot11'] += 'n'
-            else:
-                # Assuming there aren't any more strictly-11b radios out there
-                dot11_map = {
-                    '2.4 GHz': 'g',
-                    '5 GHz': 'a',
-                    }
-                row['dot11'] += dot11_map.get(row.get('band'), '')
-
-            # Extension Channels
-            if len(row.get('ext_channel', '')) > 0:
-                row['channel'] = '{0},{1}'.format(
-                    row['channel'],
-                    row['ext_channel']
-                    )
-            if 'width_new' in row:
-                row['width'] = row['width_new']
-            # This assumption will not work when 11ax is released
-            # Still no way to detect 11ac (VHT) with a 20- or 40-MHz channel
-            if '80 MHz' == row['width'] and '802.11ac' != row['dot11']:
-                row['dot11'] = '802.11ac'
-
             log.debug(
                 'Found radio %s for AP index %s',
                 radio_index,
@@ -473,6 +375,18 @@ class CiscoControllerAP(SnmpPlugin):
             row['snmpindex'] = snmpindex.strip('.')
             ap_radios[ap_index][radio_index] = row
 
+        # Partition by AP group, each group's maps are independent
+        pack = bool(getattr(device, 'zWlanApPackProperties', False))
+        partitions = list()
+        for group_name in sorted(ap_groups):
+            group = ap_groups[group_name]
+            radios = dict()
+            for ap in group['access_points'].values():
+                radios[ap['snmpindex']] = ap_radios[ap['snmpindex']]
+            partitions.append((group_name, group, radios, pack))
+
+        partition_maps = [self.group_maps(*part) for part in partitions]
+
         # Build Relationship Maps
         group_rm = RelationshipMap(
             relname='apGroups',
@@ -480,62 +394,224 @@ class CiscoControllerAP(SnmpPlugin):
             )
         ap_rm_list = list()
         radio_rm_list = list()
+        summary = inventory.Summary()
 
-        for group_name in ap_groups:
-            group_id = self.prepId(group_name)
-            group = ap_groups[group_name]
-            group_rm.append(ObjectMap(
-                modname='ZenPacks.daviswr.Cisco.WLC.APGroup',
-                data=group
-                ))
-
-            ap_rm = RelationshipMap(
-                compname='apGroups/{0}'.format(group_id),
-                relname='accessPoints',
-                modname='ZenPacks.daviswr.Cisco.WLC.AccessPoint'
-                )
-            for ap_name in group['access_points']:
-                ap_id = self.prepId(ap_name)
-                ap = group['access_points'][ap_name]
-                ap_rm.append(ObjectMap(
-                    modname='ZenPacks.daviswr.Cisco.WLC.AccessPoint',
-                    data=ap
-                    ))
-                radio_rm = RelationshipMap(
-                    compname='apGroups/{0}/accessPoints/{1}'.format(
-                        group_id,
-                        ap_id
-                        ),
-                    relname='apRadios',
-                    modname='ZenPacks.daviswr.Cisco.WLC.APRadio'
-                    )
-                for radio_index in ap_radios[ap['snmpindex']]:
-                    radio = ap_radios[ap['snmpindex']][radio_index]
-                    radio['id'] = self.prepId('{0}_{1}'.format(
-                        ap_id,
-                        radio_index
-                        ))
-                    radio['title'] = '{0} Slot {1}'.format(
-                        ap_name,
-                        radio_index
-                        )
-                    radio_rm.append(ObjectMap(
-                        modname='ZenPacks.daviswr.Cisco.WLC.APRadio',  # noqa
-                        data=radio
-                        ))
-                # Append this AP's radio RelMap
-                radio_rm_list.append(radio_rm)
-
+        for group_om, ap_rm, radio_rms, group_summary in partition_maps:
+            group_rm.append(group_om)
             # Append this group's AP RelMap
             ap_rm_list.append(ap_rm)
+            radio_rm_list += radio_rms
+            summary.update(group_summary)
 
         maps.append(group_rm)
         maps += ap_rm_list
         maps += radio_rm_list
-        log.debug('%s RelMaps:\n%s', self.name(), str(maps))
+
+        # Expected modeling cost, used by the scheduler, and inventory
+        controller = summary.data()
+        controller['apCount'] = sum(len(rm.maps) for rm in ap_rm_list)
+        maps.append(ObjectMap(
+            modname='ZenPacks.daviswr.Cisco.WLC.Controller',
+            data=controller
+            ))
+        log.debug('%s RelMaps:\n%s', self.name(), maps)
 
         return maps
 
+    def group_maps(self, group_name, group, radios, pack=False):
+        """Returns an AP group's ObjectMap, AP RelMap, radio RelMaps, and
+        inventory summary"""
+        group_id = self.prepId(group_name)
+        summary = inventory.Summary()
+
+        ap_rm = RelationshipMap(
+            compname='apGroups/{0}'.format(group_id),
+            relname='accessPoints',
+            modname='ZenPacks.daviswr.Cisco.WLC.AccessPoint'
+            )
+        radio_rm_list = list()
+        for ap_name in sorted(group['access_points']):
+            ap_id = self.prepId(ap_name)
+            ap = self.clean_ap(group['access_points'][ap_name])
+            summary.add('ap', ap)
+            ap_rm.append(ObjectMap(
+                modname='ZenPacks.daviswr.Cisco.WLC.AccessPoint',
+                data=packing.pack(ap) if pack else packing.unpacked(ap)
+                ))
+            radio_rm = RelationshipMap(
+                compname='apGroups/{0}/accessPoints/{1}'.format(
+                    group_id,
+                    ap_id
+                    ),
+                relname='apRadios',
+                modname='ZenPacks.daviswr.Cisco.WLC.APRadio'
+                )
+            for radio_index in sorted(radios[ap['snmpindex']]):
+                radio = self.clean_radio(radios[ap['snmpindex']][radio_index])
+                radio['id'] = self.prepId('{0}_{1}'.format(
+                    ap_id,
+                    radio_index
+                    ))
+                radio['title'] = '{0} Slot {1}'.format(
+                    ap_name,
+                    radio_index
+                    )
+                summary.add('radio', radio)
+                radio_rm.append(ObjectMap(
+                    modname='ZenPacks.daviswr.Cisco.WLC.APRadio',
+                    data=radio
+                    ))
+            # Append this AP's radio RelMap
+            radio_rm_list.append(radio_rm)
+
+        data = dict(
+            (key, value) for key, value in group.items()
+            if key != 'access_points'
+            )
+        data.update(summary.data())
+        group_om = ObjectMap(
+            modname='ZenPacks.daviswr.Cisco.WLC.APGroup',
+            data=data
+            )
+
+        return group_om, ap_rm, radio_rm_list, summary
+
+    def clean_ap(self, row):
+        """Decodes an access point's SNMP values"""
+        # Clean up some values
+        attr_map = dict()
+        attr_map['enabled'] = {
+            1: True,
+            2: False,
+            }
+
+        attr_map['latency'] = attr_map['enabled']
+
+        attr_map['mode'] = {
+            0: 'Local',
+            1: 'Monitor',
+            # (H)REAP
+            2: 'FlexConnect',
+            3: 'Rogue Detector',
+            4: 'Sniffer',
+            5: 'Bridge',
+            #  CleanAir-enabled models only
+            6: 'Spectrum Expert Connect',
+            }
+
+        attr_map['operStatus'] = {
+            1: 'Associated',
+            2: 'Disassociating',
+            3: 'Downloading',
+            }
+
+        for attr in attr_map:
+            if attr in row:
+                row[attr] = attr_map[attr].get(row[attr], row[attr])
+
+        macs = [
+            'radioMac',
+            'mac',
+            ]
+        for attr in macs:
+            if attr in row:
+                row[attr] = self.asmac(row[attr])
+
+        if row.get('model'):
+            row['model'] = row['model'].strip(' ')
+
+        if 'iosVersion' in row:
+            row['iosVersion'] = row['iosVersion'].strip('$')
+
+        return row
+
+    def clean_radio(self, row):
+        """Decodes an access point radio's SNMP values"""
+        attr_map = dict()
+        attr_map['11n'] = {
+            1: True,
+            2: False,
+            }
+
+        attr_map['antenna'] = {
+            1: 'Internal',
+            2: 'External',
+            }
+
+        attr_map['assignment'] = {
+            1: 'Automatic',
+            2: 'Customized',
+            }
+
+        attr_map['band'] = {
+            1: '2.4 GHz',
+            2: '5 GHz',
+            }
+
+        attr_map['diversity'] = {
+            # Right?
+            0: 'Connector A',
+            # Left?
+            1: 'Connector B',
+            255: 'Enabled',
+            }
+
+        attr_map['enabled'] = attr_map['11n']
+
+        attr_map['mode'] = {
+            1: 'Sector A',
+            2: 'Sector B',
+            3: 'Omnidirectional',
+            99: 'Not Applicable',
+            }
+
+        # Assuming cLApDot11IfEntry.24's lower values are
+        # compatible with cLAp11nChannelBandwidth
+        attr_map['width'] = {
+            1: '5 MHz',
+            2: '10 MHz',
+            3: '20 MHz',
+            4: '40 MHz',
+            5: '80 MHz',
+            }
+
+        attr_map['width_new'] = attr_map['width']
+
+        for attr in attr_map:
+            if attr in row:
+                row[attr] = attr_map[attr].get(row[attr], row[attr])
+
+        # Gain is reported in multiples of 0.5 dBm
+        if 'gain' in row:
+            row['gain'] = row['gain']*0.5
+
+        # IEEE 802.11 radio type
+        row['dot11'] = '802.11'
+        if row.get('11n'):
+            row['dot11'] += 'n'
+        else:
+            # Assuming there aren't any more strictly-11b radios out there
+            dot11_map = {
+                '2.4 GHz': 'g',
+                '5 GHz': 'a',
+                }
+            row['dot11'] += dot11_map.get(row.get('band'), '')
+
+        # Extension Channels
+        if len(row.get('ext_channel', '')) > 0:
+            row['channel'] = '{0},{1}'.format(
+                row['channel'],
+                row['ext_channel']
+                )
+        if 'width_new' in row:
+            row['width'] = row['width_new']
+        # This assumption will not work when 11ax is released
+        # Still no way to detect 11ac (VHT) with a 20- or 40-MHz channel
+        if '80 MHz' == row.get('width') and '802.11ac' != row['dot11']:
+            row['dot11'] = '802.11ac'
+
+        return row
+
     def ip_in_nets(self, ip, nets):
         """Determines if an IP address is in a subnet in a list"""
         contains = False
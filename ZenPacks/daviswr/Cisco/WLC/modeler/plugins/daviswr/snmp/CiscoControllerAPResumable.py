@@ -0,0 +1,126 @@
+__doc__ = """CiscoControllerAPResumable
+
+models access points and AP groups from a Cisco Wireless LAN Controller
+(WLC) running AireOS, walking the AP tables with checkpoints so a timeout
+part-way through a large table resumes rather than discarding the run
+
+Use in place of CiscoControllerAP, not alongside it.
+
+"""
+
+from twisted.internet import defer
+
+from Products.DataCollector.plugins.CollectorPlugin \
+    import PythonPlugin
+from Products.DataCollector.plugins.DataMaps \
+    import ObjectMap
+
+from ZenPacks.daviswr.Cisco.WLC import schedule
+from ZenPacks.daviswr.Cisco.WLC.modeler.plugins.daviswr.snmp.CiscoControllerAP \
+    import CiscoControllerAP
+from ZenPacks.daviswr.Cisco.WLC.inventory \
+    import ATTRIBUTES as INVENTORY
+from ZenPacks.daviswr.Cisco.WLC.walker \
+    import BulkTuning, TableWalker
+from ZenPacks.daviswr.Cisco.WLC.walker \
+    import deviceProperties as SNMP_PROPERTIES
+
+
+class CiscoControllerAPResumable(PythonPlugin, CiscoControllerAP):
+    deviceProperties = CiscoControllerAP.deviceProperties + (
+        'zWlanWalkBackoff',
+        'zWlanWalkRetries',
+        ) + SNMP_PROPERTIES
+
+    @defer.inlineCallbacks
+    def collect(self, device, log):
+        """walk AP tables, resuming from the last OID on timeout"""
+        log.info('collecting %s for device %s', self.name(), device.id)
+        walker = TableWalker(
+            device,
+            log,
+            retries=getattr(device, 'zWlanWalkRetries', 3),
+            backoff=getattr(device, 'zWlanWalkBackoff', 2),
+            tuning=self.tuning(device),
+            )
+        walker.open()
+        try:
+            tabledata, incomplete = yield walker.walk_tables(
+                self.snmpGetTableMaps
+                )
+        except Exception:
+            # process() won't be called to return a large controller's lease
+            schedule.release(device.id)
+            raise
+        finally:
+            walker.close()
+
+        # Learned settings are modeled onto the device for the next run
+        getdata = {
+            'bulkMaxRepetitions': walker.tuning.max_repetitions,
+            'bulkTimeout': walker.tuning.timeout,
+            }
+
+        defer.returnValue((getdata, tabledata, incomplete))
+
+    def build_maps(self, device, results, log):
+        """Returns the maps for the AP groups, APs and radios, only
+        updating existing components if a table's walk was incomplete
+        """
+        getdata, tabledata = results[:2]
+        # Captures made before the incomplete tables were recorded hold
+        # only (getdata, tabledata)
+        incomplete = results[2] if len(results) > 2 else list()
+        maps = CiscoControllerAP.build_maps(
+            self,
+            device,
+            (getdata, tabledata),
+            log
+            )
+
+        if incomplete:
+            log.warn(
+                '%s incomplete on %s, updating existing components only',
+                ', '.join(incomplete),
+                device.id
+                )
+            maps = self.updates_only(maps)
+
+        maps.append(ObjectMap(
+            modname='ZenPacks.daviswr.Cisco.WLC.Controller',
+            data=getdata
+            ))
+
+        return maps
+
+    def tuning(self, device):
+        """GETBULK settings learned on a previous run, or the defaults"""
+        timeout = getattr(device, 'zSnmpTimeout', 2.5) or 2.5
+        return BulkTuning(
+            max_repetitions=getattr(device, 'bulkMaxRepetitions', 0) or 20,
+            timeout=getattr(device, 'bulkTimeout', 0) or timeout,
+            max_timeout=timeout * 4,
+            )
+
+    def updates_only(self, maps):
+        """Replaces RelationshipMaps with ObjectMaps so nothing is removed
+
+        Inventory summaries counted from part of a table are dropped,
+        leaving the previous ones in place.
+        """
+        updates = list()
+        for datamap in maps:
+            if not hasattr(datamap, 'relname'):
+                updates.append(datamap)
+                continue
+            for om in datamap.maps:
+                om.compname = '/'.join(
+                    part for part in (datamap.compname, datamap.relname, om.id)
+                    if part
+                    )
+                updates.append(om)
+        for om in updates:
+            for attr in INVENTORY:
+                if hasattr(om, attr):
+                    delattr(om, attr)
+        return updates
@@ -12,6 +12,9 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerDHCPPool(SnmpPlugin):
     maptype = 'ControllerDHCPPool'
@@ -22,7 +25,7 @@ class CiscoControllerDHCPPool(SnmpPlugin):
     deviceProperties = SnmpPlugin.deviceProperties + (
         'zWlanDhcpIgnoreNames',
         'zWlanDhcpIgnoreSubnets',
-        )
+        ) + schedule.deviceProperties + capture.deviceProperties
 
     agentDhcpScopeEntry = {
         # agentDhcpScopeName
@@ -68,11 +71,12 @@ class CiscoControllerDHCPPool(SnmpPlugin):
         if 'VM' in model:
             log.info('Cisco Virtual WLC does not support DHCP pools, skipping')
             ignore = True
-        return not ignore
+        return not ignore and schedule.due(device, log)
 
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         getdata, tabledata = results
 
         log.debug('SNMP Tables:\n%s', tabledata)
@@ -139,6 +143,13 @@ class CiscoControllerDHCPPool(SnmpPlugin):
                 cidr = self.maskToBits(row['netmask'])
                 row['network'] = '{0}/{1}'.format(row['network'], cidr)
 
+            # Addresses in the pool, so MobileStations needn't parse them
+            row['size'] = self.pool_size(
+                row.get('start'),
+                row.get('end'),
+                log
+                )
+
             # DNS servers & default gateways
             dns = list()
             routers = list()
@@ -180,3 +191,12 @@ class CiscoControllerDHCPPool(SnmpPlugin):
                 log.warn('%s ip not a valid IP address', ip)
                 break
         return contains
+
+    def pool_size(self, start, end, log):
+        """Returns the number of addresses from start to end, inclusive"""
+        try:
+            size = int(ipaddr.IPAddress(end)) - int(ipaddr.IPAddress(start))
+        except ValueError:
+            log.warn('Invalid DHCP pool range %s - %s', start, end)
+            return 0
+        return size + 1 if size >= 0 else 0
@@ -12,10 +12,16 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerDevice(SnmpPlugin):
     maptype = 'ControllerDevice'
 
+    deviceProperties = SnmpPlugin.deviceProperties + \
+        schedule.deviceProperties + capture.deviceProperties
+
     snmpGetMap = GetMap({
         # entPhysicalDescr
         '.1.3.6.1.2.1.47.1.1.1.1.2.1': 'snmpDescr',
@@ -39,6 +45,10 @@ class CiscoControllerDevice(SnmpPlugin):
         '.1.3.6.1.4.1.14179.2.3.1.17.0': 'mobility',
         })
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info(
@@ -46,6 +56,7 @@ class CiscoControllerDevice(SnmpPlugin):
             self.name(),
             device.id
             )
+        capture.capture(self, device, results, log)
         getdata, tabledata = results
         if not getdata:
             log.warn(
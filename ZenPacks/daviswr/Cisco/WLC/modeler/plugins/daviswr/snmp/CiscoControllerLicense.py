@@ -13,10 +13,16 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerLicense(SnmpPlugin):
     maptype = 'ControllerLicense'
 
+    deviceProperties = SnmpPlugin.deviceProperties + \
+        schedule.deviceProperties + capture.deviceProperties
+
     relname = 'licenses'
     modname = 'ZenPacks.daviswr.Cisco.WLC.License'
 
@@ -41,9 +47,14 @@ class CiscoControllerLicense(SnmpPlugin):
             ),
         )
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         maps = list()
         getdata, tabledata = results
 
@@ -6,9 +6,10 @@ models temperature sensors from an Cisco Wireless LAN Controller
 """
 
 from Products.DataCollector.plugins.CollectorPlugin \
-    import SnmpPlugin, GetTableMap
-from Products.DataCollector.plugins.DataMaps \
-    import MultiArgs
+    import SnmpPlugin, GetMap
+
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
 
 
 class CiscoControllerTemperature(SnmpPlugin):
@@ -17,20 +18,16 @@ class CiscoControllerTemperature(SnmpPlugin):
     relname = 'temperaturesensors'
     modname = 'Products.ZenModel.TemperatureSensor'
 
-    bsnGlobalDot11Config = {
+    deviceProperties = SnmpPlugin.deviceProperties + \
+        schedule.deviceProperties + capture.deviceProperties
+
+    # Two scalars of bsnGlobalDot11Config, rather than walking it
+    snmpGetMap = GetMap({
         # bsnOperatingTemperatureEnvironment
-        '.12': 'state',
+        '.1.3.6.1.4.1.14179.2.3.1.12.0': 'state',
         # bsnSensorTemperature
-        '.13': 'temperature_celsius'
-        }
-
-    snmpGetTableMaps = (
-        GetTableMap(
-            'bsnSensorTemperature',
-            '.1.3.6.1.4.1.14179.2.3.1',
-            bsnGlobalDot11Config
-            ),
-        )
+        '.1.3.6.1.4.1.14179.2.3.1.13.0': 'temperature_celsius',
+        })
 
     def condition(self, device, log):
         """determine if this modeler should run"""
@@ -39,24 +36,21 @@ class CiscoControllerTemperature(SnmpPlugin):
         if 'VM' in model or 'WISM' in model:
             log.info('Cisco vWLC and WiSM lack temperature sensors, skipping')
             ignore = True
-        return not ignore
+        return not ignore and schedule.due(device, log)
 
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         getdata, tabledata = results
 
-        log.debug('SNMP Tables:\n%s', tabledata)
+        log.debug('SNMP Get:\n%s', getdata)
 
-        bsnSensorTemperature = tabledata.get('bsnSensorTemperature')
-        if not bsnSensorTemperature:
+        if getdata.get('temperature_celsius') is None:
             log.error('Unable to get bsnSensorTemperature for %s', device.id)
             return None
-        else:
-            log.debug(
-                'bsnSensorTemperature has %s entries',
-                len(bsnSensorTemperature),
-                )
+        # The scalar's instance, as a single-row table
+        bsnSensorTemperature = {'.0': getdata}
 
         # Temperator sensors
         rm = self.relMap()
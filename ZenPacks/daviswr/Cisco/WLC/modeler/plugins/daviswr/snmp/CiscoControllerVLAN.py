@@ -13,6 +13,9 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerVLAN(SnmpPlugin):
     maptype = 'ControllerVLAN'
@@ -24,7 +27,7 @@ class CiscoControllerVLAN(SnmpPlugin):
         'zWlanInterfaceIgnoreNames',
         'zWlanInterfaceIgnoreSubnets',
         'zWlanInterfaceIgnoreVlans',
-        )
+        ) + schedule.deviceProperties + capture.deviceProperties
 
     agentInterfaceConfigEntry = {
         # agentInterfaceName
@@ -47,9 +50,14 @@ class CiscoControllerVLAN(SnmpPlugin):
             ),
         )
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         maps = list()
         getdata, tabledata = results
 
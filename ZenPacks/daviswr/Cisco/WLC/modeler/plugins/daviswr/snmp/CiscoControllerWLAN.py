@@ -11,6 +11,9 @@ from Products.DataCollector.plugins.CollectorPlugin \
 from Products.DataCollector.plugins.DataMaps \
     import MultiArgs, RelationshipMap, ObjectMap
 
+from ZenPacks.daviswr.Cisco.WLC \
+    import capture, schedule
+
 
 class CiscoControllerWLAN(SnmpPlugin):
     maptype = 'ControllerWLAN'
@@ -20,7 +23,7 @@ class CiscoControllerWLAN(SnmpPlugin):
 
     deviceProperties = SnmpPlugin.deviceProperties + (
         'zWlanWlanIgnoreNames',
-        )
+        ) + schedule.deviceProperties + capture.deviceProperties
 
     bsnDot11EssEntry = {
         # bsnDot11EssSsid
@@ -136,9 +139,14 @@ class CiscoControllerWLAN(SnmpPlugin):
             ),
         )
 
+    def condition(self, device, log):
+        """determine if this modeler should run"""
+        return schedule.due(device, log)
+
     def process(self, device, results, log):
         """collect snmp information from this device"""
         log.info('processing %s for device %s', self.name(), device.id)
+        capture.capture(self, device, results, log)
         getdata, tabledata = results
 
         log.debug('SNMP Tables:\n%s', tabledata)
@@ -0,0 +1,26 @@
+__doc__ = """names
+
+suffixes of AP and radio titles, indexed in each controller's catalogs
+so the component grids can be filtered by any part of a name with a
+catalog query rather than by reading every component
+
+"""
+
+# Sorts after every printable ASCII character, closing a prefix range
+LAST = '\x7f'
+
+
+def suffixes(title):
+    """Returns the distinct suffixes of a title, lowercased"""
+    title = (title or '').lower()
+    return sorted(set(title[start:] for start in range(len(title))))
+
+
+def query(name):
+    """Returns a catalog query for titles containing name
+
+    A title contains name if one of its suffixes starts with it, so this
+    is a range of the suffixes index.
+    """
+    name = name.lower()
+    return {'query': (name, name + LAST), 'range': 'min:max'}
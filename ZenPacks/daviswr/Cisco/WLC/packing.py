@@ -0,0 +1,38 @@
+__doc__ = """packing
+
+display-only AccessPoint properties that CiscoControllerAP can store
+together in a single packedProperties tuple, when zWlanApPackProperties
+is set, rather than as attributes of their own
+
+This keeps each AP's pickle smaller and lets a remodel compare and write
+one value instead of ten.
+
+"""
+
+# Position in the tuple is the storage format, so only ever append
+PACKED = (
+    'bootVersion',
+    'gateway',
+    'hwVersion',
+    'iosVersion',
+    'location',
+    'neighborInterface',
+    'neighborIp',
+    'neighborModel',
+    'neighborName',
+    'netmask',
+    )
+
+POSITION = dict((name, index) for index, name in enumerate(PACKED))
+
+
+def pack(row):
+    """Moves an AP row's packed properties into its packedProperties"""
+    row['packedProperties'] = tuple(row.pop(name, None) for name in PACKED)
+    return row
+
+
+def unpacked(row):
+    """Marks an AP row's properties as stored individually"""
+    row['packedProperties'] = tuple()
+    return row
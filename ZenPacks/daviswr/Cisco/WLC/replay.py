@@ -0,0 +1,113 @@
+__doc__ = """replay
+
+runs a CiscoController* modeler plugin's process() against a capture
+written with zWlanModelCaptureDir, under cProfile and tracemalloc, and
+reports the hottest functions and largest allocations
+
+    python -m ZenPacks.daviswr.Cisco.WLC.replay [-n 25] [-s tottime] FILE
+
+"""
+
+import cProfile
+import importlib
+import logging
+import optparse
+import pstats
+import sys
+import time
+
+try:
+    import tracemalloc
+except ImportError:
+    # Python 2 without the pytracemalloc backport
+    tracemalloc = None
+
+from ZenPacks.daviswr.Cisco.WLC.capture import load
+
+
+class ReplayDevice(object):
+    """Stands in for the device proxy given to process()"""
+
+    def __init__(self, device_id, properties):
+        self.id = device_id
+        for name, value in properties.items():
+            setattr(self, name, value)
+
+
+def load_plugin(path):
+    """Returns an instance of a plugin class from its dotted path"""
+    module_name, class_name = path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def replay(path, top=25, sort='tottime', stream=sys.stdout):
+    """Profiles process() against a capture, returning its maps"""
+    fixture = load(path)
+    plugin = load_plugin(fixture['plugin'])
+    device = ReplayDevice(fixture['device'], fixture['properties'])
+    # Nothing needs capturing a second time
+    device.zWlanModelCaptureDir = ''
+    log = logging.getLogger('zen.CiscoWLC.replay')
+
+    stream.write('Replaying {0} for {1} captured {2}\n'.format(
+        fixture['plugin'],
+        fixture['device'],
+        time.ctime(fixture['captured'])
+        ))
+    # Tables CiscoControllerAPResumable couldn't walk completely, which
+    # process() models as updates only, as it did when captured
+    incomplete = fixture['results'][2] if len(fixture['results']) > 2 \
+        else None
+    if incomplete:
+        stream.write('Incomplete walk of {0}\n'.format(', '.join(incomplete)))
+
+    if tracemalloc:
+        tracemalloc.start(25)
+    profiler = cProfile.Profile()
+    started = time.time()
+    maps = profiler.runcall(
+        plugin.process,
+        device,
+        fixture['results'],
+        log
+        )
+    elapsed = time.time() - started
+
+    stream.write('process() took {0:.3f}s\n\n'.format(elapsed))
+    stats = pstats.Stats(profiler, stream=stream)
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+
+    if tracemalloc:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stream.write('Peak traced memory {0:.1f} KiB\n'.format(peak / 1024.0))
+        for stat in snapshot.statistics('lineno')[:top]:
+            stream.write('{0}\n'.format(stat))
+
+    return maps
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [options] FILE')
+    parser.add_option(
+        '-n', '--top',
+        type='int',
+        default=25,
+        help='Number of functions and allocation sites to report'
+        )
+    parser.add_option(
+        '-s', '--sort',
+        default='tottime',
+        help='pstats sort key, such as tottime or cumulative'
+        )
+    options, args = parser.parse_args()
+    if len(args) != 1:
+        parser.error('a capture file is required')
+
+    logging.basicConfig(level=logging.WARN)
+    replay(args[0], top=options.top, sort=options.sort)
+
+
+if __name__ == '__main__':
+    main()
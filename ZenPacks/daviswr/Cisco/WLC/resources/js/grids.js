@@ -0,0 +1,24 @@
+/*
+ * Pages the AccessPoint and AccessPointRadio component grids from the
+ * controller's catalogs rather than loading every component at once
+ */
+Ext.onReady(function() {
+    var router = Zenoss.remote.CiscoWLCRouter;
+
+    Ext.each(['AccessPoint', 'APRadio'], function(meta_type) {
+        var panel = Ext.ClassManager.get(
+            'Zenoss.component.' + meta_type + 'Panel'
+        );
+        if (!panel) {
+            return;
+        }
+        Ext.override(panel, {
+            constructor: function(config) {
+                config = Ext.applyIf(config || {}, {
+                    directFn: router.getComponentPage
+                });
+                this.callParent([config]);
+            }
+        });
+    });
+});
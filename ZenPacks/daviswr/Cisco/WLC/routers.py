@@ -0,0 +1,107 @@
+__doc__ = """routers
+
+Ext.Direct routers for Cisco Wireless LAN Controller (WLC) views
+
+"""
+
+from Products import Zuul
+from Products.ZenUtils.Ext import DirectRouter, DirectResponse
+from Products.Zuul.decorators import require
+from Products.Zuul.interfaces import IInfo
+
+from ZenPacks.daviswr.Cisco.WLC import names
+from ZenPacks.daviswr.Cisco.WLC.AccessPoint import AccessPoint
+
+
+# Component grids read a page at a time from the controller's catalog of
+# each class, and the indexed grid columns they can be sorted by
+PAGED_GRIDS = {
+    'AccessPoint': ('enabled', 'group', 'ip', 'model', 'swVersion'),
+    'APRadio': ('band', 'channel', 'enabled'),
+    }
+
+
+class CiscoWLCRouter(DirectRouter):
+    """Data for WLC views"""
+
+    def _getController(self, uid):
+        return self.context.dmd.unrestrictedTraverse(uid)
+
+    @require('View')
+    def getChannelMatrix(self, uid):
+        """Channel matrix of a controller, for a heatmap by band"""
+        controller = self._getController(uid)
+        if not hasattr(controller, 'getChannelMatrix'):
+            return DirectResponse.fail(
+                '{0} is not a wireless controller'.format(uid)
+                )
+        return DirectResponse.succeed(data=controller.getChannelMatrix())
+
+    @require('View')
+    def getComponentPage(self, uid, meta_type, keys=None, start=0, limit=50,
+                         page=0, sort='name', dir='ASC', name=None):
+        """A sorted page of a controller's APs or radios for its component
+        grid, in place of DeviceRouter.getComponents
+
+        Filtering by name, sorting and counting are catalog queries, and
+        only the components on the requested page are loaded.
+        """
+        controller = self._getController(uid)
+        if meta_type not in PAGED_GRIDS:
+            return DirectResponse.fail(
+                '{0} components are not paged'.format(meta_type)
+                )
+        # zenpacklib's per-device catalog of the class's indexed properties
+        catalog = getattr(controller, '{0}Search'.format(meta_type), None)
+        if catalog is None:
+            return DirectResponse.fail(
+                '{0} has no {1} catalog'.format(uid, meta_type)
+                )
+
+        query = {
+            # The name column, or one that isn't indexed, sorts by title
+            'sort_on': sort if sort in PAGED_GRIDS[meta_type] else 'title',
+            'sort_order': 'descending' if dir == 'DESC' else 'ascending',
+            }
+        if name:
+            query['titleSuffixes'] = names.query(name)
+        # Lazy, brains are only read as the page is sliced from them
+        brains = catalog(**query)
+
+        total = len(brains)
+        start = int(start)
+        components = list()
+        for brain in brains[start:start + int(limit)]:
+            try:
+                components.append(IInfo(brain.getObject()))
+            except Exception:
+                # Stale catalog entry
+                continue
+
+        return DirectResponse(
+            data=Zuul.marshal(components, keys),
+            totalCount=total,
+            hash=total,
+            )
+
+    @require('View')
+    def findAccessPoints(self, query):
+        """APs on any controller by MAC address, serial number, IP or name"""
+        data = list()
+        for ap in AccessPoint.find(self.context.dmd, query):
+            if not ap.checkRemotePerm('View', ap):
+                continue
+            controller = ap.device()
+            group = ap.getPrimaryParent().getPrimaryParent()
+            data.append({
+                'uid': ap.getPrimaryId(),
+                'name': ap.titleOrId(),
+                'mac': ap.mac,
+                'radioMac': ap.radioMac,
+                'serial': ap.serial,
+                'ip': ap.ip,
+                'group': group.titleOrId(),
+                'device': controller.titleOrId(),
+                'deviceUid': controller.getPrimaryId(),
+                })
+        return DirectResponse.succeed(data=data)
@@ -0,0 +1,119 @@
+__doc__ = """schedule
+
+spreads modeling of Cisco Wireless LAN Controllers (WLC) over
+zWlanModelInterval so a zenmodeler restart or a bulk device add doesn't
+model every controller at once
+
+Each controller gets a fixed offset into the interval derived from its id
+and is due once per interval, at that offset, including its first model.
+Controllers with at least zWlanModelLargeAPs access points, or whose
+count isn't known yet, also need one of zWlanModelMaxLarge leases held by
+this zenmodeler process before they're modeled. A controller zenmodeler
+was asked to model by id, as when modeling from the UI, is always due.
+
+"""
+
+import hashlib
+import sys
+import time
+
+
+deviceProperties = (
+    '_snmpLastCollection',
+    'apCount',
+    'zCollectorClientTimeout',
+    'zWlanModelInterval',
+    'zWlanModelLargeAPs',
+    'zWlanModelMaxLarge',
+    )
+
+# Device ID: lease expiration time, large controllers being modeled
+_leases = dict()
+
+# Device ID: when this process first saw a controller never modeled
+_first_seen = dict()
+
+
+def offset(device_id, interval):
+    """Returns a device's fixed offset, in seconds, into the interval"""
+    digest = hashlib.md5(device_id.encode('utf-8')).hexdigest()
+    return int(digest[:8], 16) % interval
+
+
+def last_slot(device_id, interval, now):
+    """Returns the most recent time the device was scheduled to model"""
+    phase = offset(device_id, interval)
+    return now - ((now - phase) % interval)
+
+
+def acquire(device_id, expires, limit, now):
+    """Takes a lease for a large controller, if one is free"""
+    for leased in list(_leases):
+        if _leases[leased] <= now:
+            del _leases[leased]
+    if device_id in _leases or len(_leases) < limit:
+        _leases[device_id] = expires
+        return True
+    return False
+
+
+def release(device_id):
+    """Returns a large controller's lease once it's been processed"""
+    _leases.pop(device_id, None)
+
+
+def requested(device_id, argv=None):
+    """Determines if zenmodeler was run for the device by id"""
+    argv = sys.argv if argv is None else argv
+    for index, arg in enumerate(argv):
+        if arg in ('-d', '--device'):
+            value = argv[index + 1] if index + 1 < len(argv) else None
+        elif arg.startswith('--device='):
+            value = arg.partition('=')[2]
+        elif arg.startswith('-d') and not arg.startswith('--'):
+            value = arg[2:]
+        else:
+            continue
+        if value == device_id:
+            return True
+    return False
+
+
+def due(device, log, now=None, argv=None):
+    """Determines if the controller is due to be modeled"""
+    interval = int(getattr(device, 'zWlanModelInterval', 0) or 0) * 60
+    if interval <= 0 or requested(device.id, argv):
+        return True
+
+    now = now or time.time()
+    last = getattr(device, '_snmpLastCollection', 0) or 0
+    if not last:
+        # Never modeled, so due at its first slot after it was added
+        last = _first_seen.setdefault(device.id, now)
+    else:
+        _first_seen.pop(device.id, None)
+    slot = last_slot(device.id, interval, now)
+    if last >= slot:
+        log.debug(
+            '%s next due for modeling at %s',
+            device.id,
+            time.ctime(slot + interval)
+            )
+        return False
+
+    ap_count = getattr(device, 'apCount', 0) or 0
+    large = getattr(device, 'zWlanModelLargeAPs', 0) or 0
+    if large and (ap_count >= large or not ap_count):
+        limit = getattr(device, 'zWlanModelMaxLarge', 1) or 1
+        timeout = getattr(device, 'zCollectorClientTimeout', 180) or 180
+        if not acquire(device.id, now + timeout, limit, now):
+            log.info(
+                '%s has %s APs, waiting for one of %s large controllers '
+                'to finish modeling',
+                device.id,
+                ap_count or 'an unknown number of',
+                limit
+                )
+            return False
+
+    return True
@@ -0,0 +1,153 @@
+"""Simulated SNMP agent for exercising walker.TableWalker offline"""
+
+import bisect
+import os
+
+from twisted.internet import defer, error, task
+
+from ZenPacks.daviswr.Cisco.WLC import walker
+from ZenPacks.daviswr.Cisco.WLC.walker import oid_key
+
+
+class Device(object):
+    """Device or datasource config a walker opens its session for"""
+
+    id = 'wlc1'
+
+
+class Agent(object):
+    """Answers GET and GETBULK from a {OID: value} walk
+
+    failures is a set of request numbers, counting from 1, that time out
+    instead of being answered, and every request for an OID at or after
+    unreachable times out. Responses carry at most max_varbinds, as an
+    agent limited by its maximum message size would.
+    """
+
+    def __init__(self, walk, failures=(), unreachable=None,
+                 max_varbinds=None):
+        self.walk = dict(walk)
+        self.oids = sorted(self.walk, key=oid_key)
+        self.keys = [oid_key(oid) for oid in self.oids]
+        self.failures = set(failures)
+        self.unreachable = oid_key(unreachable) if unreachable else None
+        self.max_varbinds = max_varbinds
+        self.requests = list()
+
+    def fail(self, oids):
+        self.requests.append(None)
+        if len(self.requests) in self.failures:
+            return True
+        return self.unreachable is not None and any(
+            oid_key(oid) >= self.unreachable for oid in oids
+            )
+
+    def getbulk(self, non_repeaters, max_repetitions, oids, timeout, retries):
+        if self.fail(oids):
+            return defer.fail(error.TimeoutError())
+        self.requests[-1] = (max_repetitions, list(oids))
+        starts = [
+            bisect.bisect_right(self.keys, oid_key(oid)) for oid in oids
+            ]
+        # Varbinds in response order, a repetition of every OID at a time
+        varbinds = list()
+        for repetition in range(max_repetitions):
+            for start in starts:
+                if start + repetition < len(self.oids):
+                    found = self.oids[start + repetition]
+                    varbinds.append((found, self.walk[found]))
+        if self.max_varbinds:
+            varbinds = varbinds[:self.max_varbinds]
+        return defer.succeed(varbinds)
+
+    def get(self, oids, timeout, retries):
+        if self.fail(oids):
+            return defer.fail(error.TimeoutError())
+        self.requests[-1] = (0, list(oids))
+        return defer.succeed(dict(
+            (oid, self.walk[oid]) for oid in oids if oid in self.walk
+            ))
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConnInfo(object):
+    """Stands in for SnmpConnInfo, opening sessions to an Agent"""
+
+    agent = None
+
+    def __init__(self, device):
+        self.device = device
+
+    def createSession(self):
+        return self.agent
+
+
+def install(agent):
+    """Points TableWalker sessions at the agent, and its retry delays at a
+    task.Clock, returning the clock and an undo
+    """
+    original = (walker.SnmpConnInfo, walker.reactor)
+    ConnInfo.agent = agent
+    clock = task.Clock()
+    walker.SnmpConnInfo = ConnInfo
+    walker.reactor = clock
+
+    def undo():
+        walker.SnmpConnInfo, walker.reactor = original
+    return clock, undo
+
+
+def run(deferred, clock):
+    """Returns a Deferred's result, advancing the clock past each delay
+
+    Also returns the delays waited, in order.
+    """
+    results = list()
+    deferred.addBoth(results.append)
+    delays = list()
+    while not results:
+        calls = clock.getDelayedCalls()
+        if not calls:
+            raise AssertionError('Deferred never fired')
+        delay = min(call.getTime() for call in calls) - clock.seconds()
+        delays.append(delay)
+        clock.advance(delay)
+    result = results[0]
+    if hasattr(result, 'raiseException'):
+        result.raiseException()
+    return result, delays
+
+
+def table(oid, columns, rows):
+    """Returns a walk of a table, rows of {column number: value} by index"""
+    walk = dict()
+    for index, row in rows.items():
+        for column in columns:
+            if column in row:
+                walk['{0}.{1}.{2}'.format(oid, column, index)] = row[column]
+    return walk
+
+
+def load_walk(name):
+    """Returns a walk from tests/data, saved by snmpwalk -On, as
+    {OID: value} with values as pynetsnmp returns them
+    """
+    path = os.path.join(os.path.dirname(__file__), 'data', name)
+    walk = dict()
+    with open(path) as walk_file:
+        for line in walk_file:
+            oid, _, typed = line.rstrip('\n').partition(' = ')
+            kind, _, value = typed.partition(': ')
+            if 'INTEGER' == kind:
+                value = int(value)
+            elif 'Hex-STRING' == kind:
+                value = ''.join(chr(int(octet, 16)) for octet in value.split())
+            elif 'STRING' == kind:
+                value = value.strip('"')
+            walk[oid] = value
+    return walk
@@ -0,0 +1,133 @@
+"""Benchmarks CiscoControllerAP.process() on large simulated controllers
+
+    python -m ZenPacks.daviswr.Cisco.WLC.tests.bench_modeler [APs ...]
+
+Walk results for a controller with the given numbers of APs (6000 and
+12000 by default), two radios each, spread across 40 AP groups, are
+processed into maps, and the time taken and the process' peak memory
+reported.
+"""
+
+import copy
+import logging
+import random
+import resource
+import sys
+import time
+
+from ZenPacks.daviswr.Cisco.WLC.modeler.plugins.daviswr.snmp \
+    import CiscoControllerAP as modeler
+
+log = logging.getLogger('zen.CiscoWLC.bench')
+
+GROUPS = 40
+
+
+class Device(object):
+    id = 'wlc1'
+    zWlanApGroupIgnoreNames = ''
+    zWlanApIgnoreModels = list()
+    zWlanApIgnoreNames = ''
+    zWlanApIgnoreSubnets = list()
+    zWlanApPackProperties = True
+
+
+def tables(count, seed=1):
+    """Walk results of a controller with count APs"""
+    choose = random.Random(seed).choice
+    tabledata = dict((name, dict()) for name in (
+        'bsnAPGroupsVlanTable',
+        'bsnAPTable',
+        'cLApLinkLatencyTable',
+        'cLApTable',
+        'entPhysicalTable',
+        'clcCdpApCacheTable',
+        'bsnAPIfTable',
+        'cLApDot11IfTable',
+        ))
+    for number in range(GROUPS):
+        tabledata['bsnAPGroupsVlanTable'][str(number + 1)] = {
+            'title': 'group{0}'.format(number),
+            'description': 'Group {0}'.format(number),
+            }
+    for number in range(count):
+        octets = (0, 1, 2, number >> 16 & 255, number >> 8 & 255, number & 255)
+        index = '.'.join(str(octet) for octet in octets)
+        mac = ''.join(chr(octet) for octet in octets)
+        tabledata['bsnAPTable'][index] = {
+            'radioMac': mac,
+            'radioCount': 2,
+            'title': 'AP{0:05d}'.format(number),
+            'location': 'Building {0}'.format(number // 500),
+            'mode': choose((0, 0, 0, 2)),
+            'swVersion': '8.5.182.0',
+            'bootVersion': '1.1.2.4',
+            'model': choose(('AIR-CAP3702I ', 'AIR-AP2802I ')),
+            'serial': 'FOC{0:08d}'.format(number),
+            'ip': '10.{0}.{1}.{2}'.format(
+                number // 65536,
+                number // 256 % 256,
+                number % 256
+                ),
+            'netmask': '255.255.0.0',
+            'gateway': '10.0.0.1',
+            'group': 'group{0}'.format(number % GROUPS),
+            'iosVersion': '15.3(3)JF9$',
+            'mac': mac,
+            'enabled': choose((1, 1, 1, 2)),
+            }
+        tabledata['cLApLinkLatencyTable'][index] = {'latency': 2}
+        tabledata['cLApTable'][index] = {'ent_idx': number + 1}
+        tabledata['entPhysicalTable'][str(number + 1)] = {
+            'hwVersion': 'V0{0}'.format(number % 3),
+            }
+        tabledata['clcCdpApCacheTable']['{0}.1'.format(index)] = {
+            'neighborName': 'sw{0}'.format(number // 48),
+            'neighborIpType': 1,
+            'neighborIp': '\x0a\x00\x00\x01',
+            'neighborInterface': 'Gi1/0/{0}'.format(number % 48 + 1),
+            'neighborModel': 'WS-C3850-48P',
+            }
+        for slot in (0, 1):
+            radio = '{0}.{1}'.format(index, slot)
+            tabledata['bsnAPIfTable'][radio] = {
+                'band': slot + 1,
+                'assignment': 1,
+                'channel': choose((1, 6, 11) if 0 == slot else (36, 149)),
+                'mode': 3,
+                'antenna': 1,
+                'diversity': 255,
+                'gain': 4,
+                'enabled': choose((1, 1, 2)),
+                }
+            tabledata['cLApDot11IfTable'][radio] = {
+                '11n': 1,
+                'width': 3,
+                'width_new': choose((3, 4, 5)),
+                'ext_channel': '',
+                }
+    return dict(), tabledata
+
+
+def bench(count):
+    results = tables(count)
+    timings = list()
+    for attempt in range(3):
+        copied = copy.deepcopy(results)
+        started = time.time()
+        maps = modeler.CiscoControllerAP().process(Device(), copied, log)
+        timings.append(time.time() - started)
+    # ru_maxrss is in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+    print('{0:>6} APs {1:>6} maps {2:>6.2f}s best of 3 {3:>7.1f} MB '
+          'peak'.format(count, len(maps), min(timings), peak))
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    for count in [int(arg) for arg in sys.argv[1:]] or (6000, 12000):
+        bench(count)
+
+
+if __name__ == '__main__':
+    main()
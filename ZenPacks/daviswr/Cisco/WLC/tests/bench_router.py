@@ -0,0 +1,122 @@
+"""Benchmarks CiscoWLCRouter.getComponentPage on a large simulated
+controller
+
+    python -m ZenPacks.daviswr.Cisco.WLC.tests.bench_router [APs ...]
+
+A controller with the given numbers of APs (6000 by default) is cataloged
+as zenpacklib would, with each component pickled and woken only when its
+brain is read. Pages of the AP grid sorted, filtered and at an offset are
+timed against waking and marshalling every AP, as DeviceRouter's
+getComponents does. Components are marshalled to JSON from their
+attributes, standing in for their IInfo adapters.
+"""
+
+import json
+import random
+import sys
+import time
+
+from ZenPacks.daviswr.Cisco.WLC import routers
+from ZenPacks.daviswr.Cisco.WLC.tests import catalog
+
+GROUPS = 40
+UID = '/zport/dmd/Devices/Network/Cisco/Controller/devices/wlc1'
+
+
+class Zuul(object):
+    """Marshals components' attributes to JSON"""
+
+    @staticmethod
+    def marshal(infos, keys=None):
+        return json.dumps(infos)
+
+
+def controller(count, seed=1):
+    """A controller with count APs cataloged"""
+    choose = random.Random(seed).choice
+    aps = [
+        catalog.Component(
+            'AP{0:05d}'.format(number),
+            title='B{0:02d}-AP{1:05d}'.format(number // 500, number),
+            group='group{0}'.format(number % GROUPS),
+            model=choose(('AIR-CAP3702I', 'AIR-AP2802I')),
+            ip='10.{0}.{1}.{2}'.format(
+                number // 65536,
+                number // 256 % 256,
+                number % 256
+                ),
+            swVersion='8.5.182.0',
+            enabled=choose((True, True, True, False)),
+            location='Building {0}'.format(number // 500),
+            serial='FOC{0:08d}'.format(number),
+            )
+        for number in range(count)
+        ]
+    return catalog.Controller(catalog.Catalog(
+        aps,
+        ('title',) + routers.PAGED_GRIDS['AccessPoint'],
+        ('titleSuffixes',)
+        ))
+
+
+def timed(function, *args, **kwargs):
+    """Returns the best of three times of a call, and its result"""
+    timings = list()
+    for attempt in range(3):
+        started = time.time()
+        result = function(*args, **kwargs)
+        timings.append(time.time() - started)
+    return min(timings), result
+
+
+def everything(device):
+    """Wakes and marshals every AP, as getComponents does"""
+    search = device.AccessPointSearch
+    brains = search('title')
+    return Zuul.marshal([vars(brain.getObject()) for brain in brains[:]])
+
+
+def bench(count):
+    device = controller(count)
+    router = routers.CiscoWLCRouter(device)
+    pages = (
+        ('first page', dict()),
+        ('page at {0}'.format(count // 2), dict(start=count // 2)),
+        ('by model', dict(sort='model', dir='DESC')),
+        ('filtered', dict(name='ap001')),
+        )
+    for label, kwargs in pages:
+        elapsed, response = timed(
+            router.getComponentPage,
+            UID,
+            'AccessPoint',
+            **kwargs
+            )
+        print('{0:>6} APs {1:<12} {2:>5} of {3:>6} {4:>8.2f} ms'.format(
+            count,
+            label,
+            len(json.loads(response.data['data'])),
+            response.data['totalCount'],
+            elapsed * 1000
+            ))
+    elapsed, marshalled = timed(everything, device)
+    print('{0:>6} APs {1:<12} {2:>5} of {0:>6} {3:>8.2f} ms {4:>6.2f} MiB '
+          'JSON'.format(
+              count,
+              'every AP',
+              count,
+              elapsed * 1000,
+              len(marshalled) / 1048576.0
+              ))
+
+
+def main():
+    # Marshal attributes in place of IInfo adapters, see above
+    routers.IInfo = vars
+    routers.Zuul = Zuul
+    for count in [int(arg) for arg in sys.argv[1:]] or (6000,):
+        bench(count)
+
+
+if __name__ == '__main__':
+    main()
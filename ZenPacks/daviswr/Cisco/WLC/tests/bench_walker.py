@@ -0,0 +1,188 @@
+"""Benchmarks resumable, tuned walks against restarting fixed-size walks
+
+    python -m ZenPacks.daviswr.Cisco.WLC.tests.bench_walker [APs]
+
+The AP table of a simulated controller is walked in simulated time. Each
+response takes a fixed latency plus a cost per varbind, a response over
+the agent's message size times out, as do a share of requests at random.
+The baseline is SnmpClient's behavior, fixed max-repetitions and starting
+the table over after a timeout.
+"""
+
+import logging
+import random
+import sys
+
+from twisted.internet import defer, error, task
+
+from Products.DataCollector.plugins.CollectorPlugin import GetTableMap
+
+from ZenPacks.daviswr.Cisco.WLC import walker
+from ZenPacks.daviswr.Cisco.WLC.tests import agent
+
+log = logging.getLogger('zen.CiscoWLC.bench')
+
+ENTRY = '.1.3.6.1.4.1.14179.2.2.1.1'
+COLUMNS = (3, 4, 6, 16, 17, 19, 37)
+TABLEMAP = GetTableMap(
+    'bsnAPTable',
+    ENTRY,
+    dict(('.{0}'.format(column), str(column)) for column in COLUMNS)
+    )
+
+LATENCY = 0.02
+PER_VARBIND = 0.0004
+MAX_VARBINDS = 80
+LOSS = 0.01
+TIMEOUT = 2.5
+
+
+class SlowAgent(agent.Agent):
+    """Answers after a simulated latency, timing out as described above"""
+
+    def __init__(self, walk, clock, seed=1):
+        super(SlowAgent, self).__init__(walk)
+        self.clock = clock
+        self.random = random.Random(seed)
+        self.timeouts = 0
+
+    def getbulk(self, non_repeaters, max_repetitions, oids, timeout, retries):
+        d = super(SlowAgent, self).getbulk(
+            non_repeaters,
+            max_repetitions,
+            oids,
+            timeout,
+            retries
+            )
+        varbinds = list()
+        d.addCallback(varbinds.extend)
+        latency = LATENCY + PER_VARBIND * len(varbinds)
+        if len(varbinds) > MAX_VARBINDS or self.random.random() < LOSS:
+            self.timeouts += 1
+            return task.deferLater(self.clock, timeout, self.timeout)
+        return task.deferLater(self.clock, latency, lambda: varbinds)
+
+    def timeout(self):
+        raise error.TimeoutError()
+
+
+class FixedTuning(walker.BulkTuning):
+    """Max-repetitions and timeout that don't change"""
+
+    def success(self, pairs, elapsed):
+        self.varbinds += len(pairs)
+        self.elapsed += elapsed
+
+    def failure(self):
+        pass
+
+
+class Clock(task.Clock):
+    """Simulated time, also answering time.time() for the walker"""
+
+    def time(self):
+        return self.seconds()
+
+
+def rows(count):
+    walk = dict()
+    for number in range(count):
+        index = '0.1.2.3.{0}.{1}'.format(number // 256, number % 256)
+        for column in COLUMNS:
+            walk['{0}.{1}.{2}'.format(ENTRY, column, index)] = \
+                'value-{0}-{1}'.format(column, number)
+    return walk
+
+
+def run(deferred, clock):
+    """Runs simulated time until the Deferred fires"""
+    results = list()
+    deferred.addBoth(results.append)
+    while not results:
+        calls = clock.getDelayedCalls()
+        clock.advance(min(call.getTime() for call in calls) - clock.seconds())
+    return results[0]
+
+
+@defer.inlineCallbacks
+def restarting(table_walker, attempts=4):
+    """Walks the table from its start until one walk completes"""
+    for attempt in range(attempts):
+        tabledata, incomplete = yield table_walker.walk_tables([TABLEMAP])
+        if not incomplete:
+            break
+    defer.returnValue((tabledata, incomplete, attempt + 1))
+
+
+@defer.inlineCallbacks
+def resuming(table_walker):
+    tabledata, incomplete = yield table_walker.walk_tables([TABLEMAP])
+    defer.returnValue((tabledata, incomplete, 1))
+
+
+def bench(name, count, walk_function, retries, tuning):
+    clock = Clock()
+    slow = SlowAgent(rows(count), clock)
+    _, undo = agent.install(slow)
+    original_time = walker.time
+    walker.time = clock
+    walker.reactor = clock
+    try:
+        table_walker = walker.TableWalker(
+            agent.Device(),
+            log,
+            retries=retries,
+            backoff=1,
+            tuning=tuning
+            )
+        table_walker.open()
+        tabledata, incomplete, attempts = run(
+            walk_function(table_walker),
+            clock
+            )
+    finally:
+        walker.time = original_time
+        undo()
+    print('{0:<28} {1:>6} rows {2:>5} requests {3:>4} timeouts '
+          '{4:>7.1f}s {5:>2} walks{6}'.format(
+              name,
+              len(tabledata.get('bsnAPTable', ())),
+              len(slow.requests),
+              slow.timeouts,
+              clock.seconds(),
+              attempts,
+              ', incomplete' if incomplete else ''
+              ))
+
+
+def main():
+    logging.basicConfig(level=logging.ERROR)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 6000
+    print('{0} APs, {1} columns, {2:.0%} loss, {3} varbinds per '
+          'response at most'.format(count, len(COLUMNS), LOSS, MAX_VARBINDS))
+    for reps in (10, 40):
+        bench(
+            'restart, max-reps {0}'.format(reps),
+            count,
+            restarting,
+            0,
+            FixedTuning(max_repetitions=reps, timeout=TIMEOUT),
+            )
+    bench(
+        'resume, max-reps 40',
+        count,
+        resuming,
+        3,
+        FixedTuning(max_repetitions=40, timeout=TIMEOUT),
+        )
+    bench(
+        'resume, tuned from 20',
+        count,
+        resuming,
+        3,
+        walker.BulkTuning(max_repetitions=20, timeout=TIMEOUT),
+        )
+
+
+if __name__ == '__main__':
+    main()
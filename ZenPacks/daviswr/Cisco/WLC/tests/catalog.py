@@ -0,0 +1,117 @@
+"""Simulated per-device component catalog for exercising
+routers.CiscoWLCRouter.getComponentPage offline"""
+
+import bisect
+import pickle
+
+from ZenPacks.daviswr.Cisco.WLC import names
+
+
+class Component(object):
+    """An AP or radio with the attributes its catalog indexes"""
+
+    def __init__(self, component_id, **attributes):
+        self.id = component_id
+        self.title = component_id
+        self.__dict__.update(attributes)
+
+    def titleOrId(self):
+        return self.title or self.id
+
+    def titleSuffixes(self):
+        return names.suffixes(self.titleOrId())
+
+
+class Controller(object):
+    """A controller with an AccessPoint catalog, found by its uid"""
+
+    def __init__(self, catalog):
+        self.AccessPointSearch = catalog
+        self.dmd = self
+
+    def unrestrictedTraverse(self, uid):
+        return self
+
+
+class Brain(object):
+    """A catalog result, waking its component from a pickle"""
+
+    def __init__(self, state, woken):
+        self.state = state
+        self.woken = woken
+
+    def getObject(self):
+        component = pickle.loads(self.state)
+        self.woken.append(component.id)
+        return component
+
+
+class Results(object):
+    """Lazy results, making brains only for the positions sliced"""
+
+    def __init__(self, catalog, positions):
+        self.catalog = catalog
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.catalog.brain(position)
+                    for position in self.positions[index]]
+        return self.catalog.brain(self.positions[index])
+
+
+class Catalog(object):
+    """Answers queries as a zenpacklib device catalog does
+
+    Field indexes sort and keyword indexes match, both lowercased, from
+    sorted (value, position) lists, so a query doesn't read every
+    component. woken lists the ids of the components loaded from brains.
+    """
+
+    def __init__(self, components, fields, keywords):
+        self.states = [pickle.dumps(component) for component in components]
+        self.woken = list()
+        self.fields = dict()
+        for name in fields:
+            self.fields[name] = [
+                position for value, position in sorted(
+                    (self.value(component, name), position)
+                    for position, component in enumerate(components)
+                    )
+                ]
+        self.keywords = dict()
+        for name in keywords:
+            self.keywords[name] = sorted(
+                (keyword, position)
+                for position, component in enumerate(components)
+                for keyword in self.value(component, name)
+                )
+
+    def value(self, component, name):
+        value = getattr(component, name, None)
+        if callable(value):
+            value = value()
+        if isinstance(value, (list, tuple)):
+            return [str(item).lower() for item in value]
+        return str(value).lower()
+
+    def brain(self, position):
+        return Brain(self.states[position], self.woken)
+
+    def __call__(self, sort_on, sort_order='ascending', **query):
+        positions = self.fields[sort_on]
+        if 'descending' == sort_order:
+            positions = positions[::-1]
+        for name, term in query.items():
+            low, high = term['query']
+            entries = self.keywords[name]
+            start = bisect.bisect_left(entries, (low.lower(), -1))
+            end = bisect.bisect_right(entries, (high.lower(), len(entries)))
+            matched = set(position for _, position in entries[start:end])
+            positions = [
+                position for position in positions if position in matched
+                ]
+        return Results(self, positions)
@@ -0,0 +1,83 @@
+"""Tests capture and replay of CiscoControllerAPResumable results"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import capture, replay
+from ZenPacks.daviswr.Cisco.WLC.modeler.plugins.daviswr.snmp \
+    import CiscoControllerAPResumable as modeler
+from ZenPacks.daviswr.Cisco.WLC.tests import test_inventory
+
+
+class Device(test_inventory.Device):
+    zSnmpCommunity = 'secret'
+    zWlanWalkBackoff = 2
+    zWlanWalkRetries = 3
+
+
+class Output(list):
+    """Collects what replay writes, in bytes or text"""
+
+    write = list.append
+
+    def getvalue(self):
+        return ''.join(self)
+
+
+class CaptureTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.device = Device()
+        self.device.zWlanModelCaptureDir = self.directory
+        tabledata = test_inventory.walk([
+            ('ap1', 'default-group', 'AIR-AP2802I', 0, True,
+             ((1, True), (2, True))),
+            ])[1]
+        getdata = {'bulkMaxRepetitions': 40, 'bulkTimeout': 2.5}
+        self.results = (getdata, tabledata, ['bsnAPIfTable'])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def process(self, results):
+        return modeler.CiscoControllerAPResumable().process(
+            self.device,
+            results,
+            test_inventory.log
+            )
+
+    def capture(self):
+        self.process(self.results)
+        names = os.listdir(self.directory)
+        self.assertEqual(1, len(names))
+        return os.path.join(self.directory, names[0])
+
+    def test_incomplete_is_captured(self):
+        fixture = capture.load(self.capture())
+        self.assertEqual(['bsnAPIfTable'], fixture['results'][2])
+        self.assertNotIn('zSnmpCommunity', fixture['properties'])
+        self.assertEqual(3, fixture['properties']['zWlanWalkRetries'])
+
+    def test_replay_updates_only(self):
+        path = self.capture()
+        stream = Output()
+        maps = replay.replay(path, top=1, stream=stream)
+        self.assertIn('Incomplete walk of bsnAPIfTable', stream.getvalue())
+        # As in the captured run, nothing that would remove components
+        self.assertFalse(any(hasattr(om, 'relname') for om in maps))
+        self.assertEqual(
+            ['apGroups/default-group/accessPoints/ap1'],
+            [om.compname for om in maps if 'ap1' == getattr(om, 'id', '')]
+            )
+
+    def test_complete_walk_replaces(self):
+        self.results = self.results[:2] + ([],)
+        maps = replay.replay(self.capture(), top=1, stream=Output())
+        self.assertTrue(any(hasattr(om, 'relname') for om in maps))
+
+
+if __name__ == '__main__':
+    unittest.main()
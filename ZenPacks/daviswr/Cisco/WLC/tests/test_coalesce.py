@@ -0,0 +1,280 @@
+"""Tests status event coalescing by coalesce and AccessPointStatus"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import coalesce
+from ZenPacks.daviswr.Cisco.WLC.dsplugins import AccessPointStatus
+from ZenPacks.daviswr.Cisco.WLC.tests.test_mobilestations import Datasource
+from ZenPacks.daviswr.Cisco.WLC.tests.test_thresholds import Config
+
+# 1000 APs, 50 per switch stack member across 5 stacks, in 4 AP groups
+APS = 1000
+
+
+def controller(minimum=10, detail=10):
+    datasources = list()
+    for number in range(APS):
+        index = '0.1.2.3.{0}.{1}'.format(number // 256, number % 256)
+        scopes = {
+            'group': 'group{0}'.format(number % 4),
+            'neighbor': coalesce.neighbor(
+                'sw{0}'.format(number // 200),
+                'Gi{0}/0/{1}'.format(number // 50 % 4 + 1, number % 50)
+                ),
+            }
+        params = {
+            'snmpindex': index,
+            'title': 'ap{0}'.format(number),
+            'operStatus': 'Associated',
+            }
+        params.update(scopes)
+        datasources.append(Datasource('ap{0}'.format(number), params))
+        for slot in (0, 1):
+            params = {
+                'snmpindex': '{0}.{1}'.format(index, slot),
+                'title': 'Radio {0}'.format(slot),
+                'radio': True,
+                'ap': 'ap{0}'.format(number),
+                'apComponent': 'ap{0}'.format(number),
+                }
+            params.update(scopes)
+            datasources.append(Datasource(
+                'ap{0}_{1}'.format(number, slot),
+                params
+                ))
+    config = Config(datasources)
+    config.zWlanEventCoalesceMin = minimum
+    config.zWlanEventCoalesceWindow = 300
+    config.zWlanEventDetailLimit = detail
+    return config
+
+
+def everything(number):
+    return True
+
+
+def tables(joined, radio_up=everything):
+    """Walk results with the APs for which joined is true"""
+    aps = dict()
+    uptimes = dict()
+    radios = dict()
+    for number in range(APS):
+        if not joined(number):
+            continue
+        index = '0.1.2.3.{0}.{1}'.format(number // 256, number % 256)
+        aps[index] = {'operStatus': 1, 'enabled': 1}
+        uptimes[index] = {'joinUpTime': 1000}
+        for slot in (0, 1):
+            radios['{0}.{1}'.format(index, slot)] = {
+                'bsnAPIfOperStatus': 2 if radio_up(number) else 1,
+                }
+    return {
+        'bsnAPTable': aps,
+        'cLApTable': uptimes,
+        'bsnAPIfTable': radios,
+        }, []
+
+
+def summaries(events):
+    return [event for event in events if 'Storm' in event['eventKey']]
+
+
+class CoalescerTest(unittest.TestCase):
+
+    def problem(self, component, severity=4):
+        return ({
+            'component': component,
+            'severity': severity,
+            'eventKey': 'apStatus',
+            }, coalesce.scopes('default', 'sw1 Gi1/0'))
+
+    def test_storm_takes_problems_below_minimum(self):
+        coalescer = coalesce.Coalescer()
+        events = coalescer.coalesce(
+            'wlc1',
+            [self.problem('ap{0}'.format(number)) for number in range(3)],
+            0, 300, 3, 0
+            )
+        self.assertEqual(['3 APs down behind switch sw1 Gi1/0'], [
+            event['summary'] for event in events
+            ])
+
+        # Past the window, one more AP joins the storm rather than
+        # raising its own event
+        events = coalescer.coalesce(
+            'wlc1', [self.problem('ap3')], 400, 300, 3, 0
+            )
+        self.assertEqual(['4 APs down behind switch sw1 Gi1/0'], [
+            event['summary'] for event in events
+            ])
+
+        events = coalescer.coalesce('wlc1', [
+            self.problem('ap{0}'.format(number), 0)
+            for number in range(4)
+            ], 500, 300, 3, 0)
+        self.assertEqual(
+            ['All 4 APs behind switch sw1 Gi1/0 recovered'],
+            [event['summary'] for event in events]
+            )
+        self.assertEqual({}, coalescer.storms)
+
+    def test_minimum_zero_passes_events(self):
+        coalescer = coalesce.Coalescer()
+        transitions = [self.problem('ap{0}'.format(number))
+                       for number in range(20)]
+        events = coalescer.coalesce('wlc1', transitions, 0, 300, 0, 10)
+        self.assertEqual(20, len(events))
+
+
+class MassOutageTest(unittest.TestCase):
+    """1000 APs dropping and recovering at once"""
+
+    def test_uncoalesced(self):
+        config = controller(minimum=0)
+        plugin = AccessPointStatus()
+        data = plugin.onSuccess(tables(everything), config)
+        self.assertEqual([], data['events'])
+        data = plugin.onSuccess(tables(lambda number: False), config)
+        # One event per AP, radios being covered by their APs'
+        self.assertEqual(APS, len(data['events']))
+        self.assertEqual(APS, len(data['maps']))
+
+    def test_coalesced(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        data = plugin.onSuccess(tables(everything), config)
+        self.assertEqual([], data['events'])
+
+        data = plugin.onSuccess(tables(lambda number: False), config)
+        storms = summaries(data['events'])
+        # One summary per switch stack member, and the detail limit
+        self.assertEqual(20, len(storms))
+        self.assertEqual(30, len(data['events']))
+        self.assertEqual(APS, sum(event['affected'] for event in storms))
+        self.assertEqual(APS, len([
+            om for om in data['maps'] if hasattr(om, 'operStatus')
+            ]))
+
+        # Nothing new while they stay down
+        data = plugin.onSuccess(tables(lambda number: False), config)
+        self.assertEqual([], data['events'])
+
+        data = plugin.onSuccess(tables(lambda number: number < 500), config)
+        storms = summaries(data['events'])
+        self.assertEqual(10, len(storms))
+        self.assertTrue(all(0 == event['severity'] for event in storms))
+
+        data = plugin.onSuccess(tables(everything), config)
+        storms = summaries(data['events'])
+        self.assertEqual(10, len(storms))
+        self.assertTrue(all(
+            0 == event['severity'] for event in data['events']
+            ))
+        # Every problem event sent was cleared
+        self.assertEqual({}, plugin.coalescer.storms)
+        self.assertEqual(set(), plugin.coalescer.open)
+
+    def test_radios_coalesced(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        plugin.onSuccess(tables(everything), config)
+
+        # PoE budget: the radios of one stack member's APs drop
+        data = plugin.onSuccess(
+            tables(everything, lambda number: number >= 50),
+            config
+            )
+        self.assertEqual(
+            ['100 radios down behind switch sw0 Gi1/0'],
+            [event['summary'] for event in summaries(data['events'])]
+            )
+        self.assertEqual(11, len(data['events']))
+
+
+class RestartTest(unittest.TestCase):
+    """Storms open before a collector restart are still cleared"""
+
+    def restart(self, plugin, config):
+        """A new plugin with the state the last one modeled"""
+        for ds in config.datasources:
+            status = plugin.states.get(ds.component, (None, None))[0]
+            if not ds.params.get('radio') and status:
+                ds.params['operStatus'] = status
+        config.eventStorms = plugin.storm_state
+        return AccessPointStatus()
+
+    def test_state_is_modeled(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        data = plugin.onSuccess(tables(everything), config)
+        self.assertEqual([], data['maps'])
+
+        data = plugin.onSuccess(tables(lambda number: number >= 50), config)
+        state = [
+            om.eventStorms for om in data['maps']
+            if hasattr(om, 'eventStorms')
+            ][0]
+        self.assertEqual(plugin.coalescer.state(), state)
+        restored = coalesce.Coalescer()
+        restored.restore(state)
+        self.assertEqual(state, restored.state())
+
+    def test_recovery_during_restart_is_cleared(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        plugin.onSuccess(tables(everything), config)
+        plugin.onSuccess(tables(lambda number: number >= 50), config)
+
+        plugin = self.restart(plugin, config)
+        data = plugin.onSuccess(tables(everything), config)
+        self.assertEqual(
+            ['All 50 APs behind switch sw0 Gi1/0 recovered'],
+            [event['summary'] for event in summaries(data['events'])]
+            )
+        # Clears of the 10 APs' events sent, 10 more details and the
+        # summary, as without the restart
+        self.assertEqual(21, len(data['events']))
+        self.assertTrue(all(
+            0 == event['severity'] for event in data['events']
+            ))
+        self.assertEqual([], data['maps'][-1].eventStorms)
+
+    def test_still_down_after_restart(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        plugin.onSuccess(tables(everything), config)
+        plugin.onSuccess(tables(lambda number: number >= 49), config)
+
+        plugin = self.restart(plugin, config)
+        data = plugin.onSuccess(tables(lambda number: number >= 49), config)
+        self.assertEqual([], data['events'])
+        self.assertEqual([], data['maps'])
+
+        # The last AP behind the switch joins the storm
+        data = plugin.onSuccess(tables(lambda number: number >= 50), config)
+        self.assertEqual(
+            ['50 APs down behind switch sw0 Gi1/0'],
+            [event['summary'] for event in summaries(data['events'])]
+            )
+
+    def test_radio_recovery_during_restart_is_cleared(self):
+        config = controller()
+        plugin = AccessPointStatus()
+        plugin.onSuccess(tables(everything), config)
+        plugin.onSuccess(
+            tables(everything, lambda number: number >= 50),
+            config
+            )
+
+        plugin = self.restart(plugin, config)
+        data = plugin.onSuccess(tables(everything), config)
+        self.assertEqual(
+            ['All 100 radios behind switch sw0 Gi1/0 recovered'],
+            [event['summary'] for event in summaries(data['events'])]
+            )
+        self.assertEqual({}, plugin.coalescer.storms)
+        self.assertEqual(set(), plugin.coalescer.open)
+
+
+if __name__ == '__main__':
+    unittest.main()
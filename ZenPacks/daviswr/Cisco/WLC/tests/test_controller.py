@@ -0,0 +1,87 @@
+"""Tests Controller.getSnmpIgnoreReport"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC.Controller import Controller
+
+PLUGINS = 'ZenPacks.daviswr.Cisco.WLC.dsplugins.'
+
+
+class Datasource(object):
+
+    def __init__(self, sourcetype, datapoints=1, plugin='', enabled=True):
+        self.sourcetype = sourcetype
+        self.points = ['dp{0}'.format(n) for n in range(datapoints)]
+        if plugin:
+            self.plugin_classname = PLUGINS + plugin
+        self.enabled = enabled
+
+    def datapoints(self):
+        return self.points
+
+
+class Template(object):
+
+    def __init__(self, datasources):
+        self.datasources = datasources
+
+    def getRRDDataSources(self, sourcetype=None):
+        return [
+            ds for ds in self.datasources
+            if sourcetype in (None, ds.sourcetype)
+            ]
+
+
+# As on the AccessPointRadio template
+RADIO = Template([
+    Datasource('Python', 4, 'RadioNeighbors'),
+    # One walk for all the load datasources
+    Datasource('Python', 1, 'RadioLoad'),
+    Datasource('Python', 1, 'RadioLoad'),
+    Datasource('Python', 1, 'RadioLoad'),
+    Datasource('Python', 1, 'RadioLoad'),
+    Datasource('Python', 1, 'RadioLoad'),
+    Datasource('SNMP'),
+    Datasource('SNMP'),
+    Datasource('SNMP', enabled=False),
+    Datasource('Python', 1, 'AccessPointStatus'),
+    ])
+
+
+class APRadio(object):
+
+    def __init__(self, ignored, monitored=True):
+        self.ignored = ignored
+        self.is_monitored = monitored
+
+    def monitored(self):
+        return self.is_monitored
+
+    def snmpIgnore(self):
+        return self.ignored
+
+    def getRRDTemplates(self):
+        return [RADIO]
+
+
+class SnmpIgnoreReportTest(unittest.TestCase):
+
+    def test_report(self):
+        controller = Controller()
+        controller.getDeviceComponents = lambda: [
+            APRadio(False),
+            APRadio(True),
+            APRadio(True),
+            APRadio(True, monitored=False),
+            ]
+        # Each ignored radio: 2 RRM neighbor columns, 5 load columns and
+        # 2 SNMP datapoints, but nothing for AP status, which polls
+        # disabled radios
+        self.assertEqual(
+            {'APRadio': {'components': 3, 'ignored': 2, 'oids': 18}},
+            controller.getSnmpIgnoreReport()
+            )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Tests DHCP pool usage counted by dsplugins.MobileStations"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC.dsplugins import MobileStations, ip_int
+from ZenPacks.daviswr.Cisco.WLC.tests import agent
+from ZenPacks.daviswr.Cisco.WLC.tests.test_mobilestations \
+    import Config, Datasource
+
+
+def pool(component, start, end, size, index):
+    return Datasource(component, {
+        'kind': 'pool',
+        'snmpindex': index,
+        'title': component,
+        'start': start,
+        'end': end,
+        'size': size,
+        })
+
+
+class DhcpPoolTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = MobileStations()
+        self.config = Config()
+        self.config.zWlanDhcpUtilThreshold = 50
+        self.config.datasources += [
+            pool('staff', '10.20.0.10', '10.20.0.29', 20, '1'),
+            pool('guest', '10.30.1.100', '10.30.1.149', 50, '2'),
+            ]
+
+    def cycle(self, walk):
+        simulated = agent.Agent(walk)
+        clock, undo = agent.install(simulated)
+        try:
+            result = agent.run(self.plugin.collect(self.config), clock)[0]
+        finally:
+            undo()
+        return simulated, self.plugin.onSuccess(result, self.config)
+
+    def test_recorded_walk(self):
+        walk = agent.load_walk('bsnMobileStationTable.snmpwalk')
+        simulated, data = self.cycle(walk)
+
+        # Addresses are requested along with the other columns
+        self.assertTrue(any(
+            oid.startswith('.1.3.6.1.4.1.14179.2.1.4.1.2')
+            for request in simulated.requests
+            for oid in request[1]
+            ))
+        values = data['values']
+        # Static, unassigned and out of range addresses aren't counted
+        self.assertEqual(12, values['staff']['clients'])
+        self.assertEqual(60.0, values['staff']['utilization'])
+        self.assertEqual(5, values['guest']['clients'])
+        self.assertEqual(10.0, values['guest']['utilization'])
+        self.assertEqual(20, values[None]['stations'])
+
+        self.assertEqual(1, len(data['events']))
+        event = data['events'][0]
+        self.assertEqual('staff', event['component'])
+        self.assertEqual(4, event['severity'])
+        self.assertEqual('dhcpPoolExhaustion', event['eventKey'])
+
+        # Still exhausted, no new event
+        self.assertEqual([], self.cycle(walk)[1]['events'])
+
+        # Clients leaving the pool clear it
+        staff = '.1.3.6.1.4.1.14179.2.1.4.1.2.0.36.215.18.52.'
+        fewer = dict(walk)
+        for last in ('0', '3', '6'):
+            fewer[staff + last] = '0.0.0.0'
+        data = self.cycle(fewer)[1]
+        self.assertEqual(9, data['values']['staff']['clients'])
+        self.assertEqual(0, data['events'][0]['severity'])
+
+    def test_state_is_modeled(self):
+        walk = agent.load_walk('bsnMobileStationTable.snmpwalk')
+        maps = self.cycle(walk)[1]['maps']
+        self.assertEqual(1, len(maps))
+        self.assertTrue(maps[0].exhausted)
+
+    def test_recovery_during_restart_is_cleared(self):
+        for ds in self.config.datasources:
+            ds.params['exhausted'] = 'guest' == ds.component
+        walk = agent.load_walk('bsnMobileStationTable.snmpwalk')
+        data = self.cycle(walk)[1]
+        events = dict(
+            (event['component'], event['severity'])
+            for event in data['events']
+            )
+        self.assertEqual({'staff': 4, 'guest': 0}, events)
+
+    def test_still_exhausted_after_restart(self):
+        for ds in self.config.datasources:
+            ds.params['exhausted'] = 'staff' == ds.component
+        walk = agent.load_walk('bsnMobileStationTable.snmpwalk')
+        data = self.cycle(walk)[1]
+        self.assertEqual([], data['events'])
+        self.assertEqual([], data['maps'])
+
+    def test_no_pools_no_addresses(self):
+        self.config.datasources = [
+            ds for ds in self.config.datasources
+            if 'pool' != ds.params.get('kind')
+            ]
+        walk = agent.load_walk('bsnMobileStationTable.snmpwalk')
+        simulated, data = self.cycle(walk)
+        self.assertFalse(any(
+            oid.startswith('.1.3.6.1.4.1.14179.2.1.4.1.2.')
+            or '.1.3.6.1.4.1.14179.2.1.4.1.2' == oid
+            for request in simulated.requests
+            for oid in request[1]
+            ))
+        self.assertEqual(20, data['values'][None]['stations'])
+
+    def test_ip_int(self):
+        self.assertEqual(0x0a140001, ip_int('10.20.0.1'))
+        self.assertEqual(0x0a2e0001, ip_int('\x0a\x2e\x00\x01'))
+        self.assertEqual(None, ip_int(''))
+        self.assertEqual(None, ip_int('10.20.0'))
+        self.assertEqual(None, ip_int('not.an.ip.address'))
+
+
+if __name__ == '__main__':
+    unittest.main()
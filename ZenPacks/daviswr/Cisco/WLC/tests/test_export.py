@@ -0,0 +1,191 @@
+"""Tests the columnar inventory export of export"""
+
+import gzip
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import export
+
+
+class Component(object):
+    """A persistent component, last committed at mtime"""
+
+    meta_type = 'WLAN'
+
+    def __init__(self, component_id, mtime, **attributes):
+        self.id = component_id
+        self._p_mtime = mtime
+        self.__dict__.update(attributes)
+        self.children = list()
+
+    def _p_activate(self):
+        pass
+
+    def titleOrId(self):
+        return getattr(self, 'title', None) or self.id
+
+    def accessPoints(self):
+        return self.children
+
+    def apRadios(self):
+        return self.children
+
+
+class Controller(object):
+
+    def __init__(self, device_id, groups, wlans):
+        self.id = device_id
+        self.groups = groups
+        self.wlan_list = wlans
+
+    def apGroups(self):
+        return self.groups
+
+    def wlans(self):
+        return self.wlan_list
+
+
+class Connection(object):
+
+    def cacheGC(self):
+        pass
+
+
+class Dmd(object):
+    """Just enough of the dmd to find controllers in a device class"""
+
+    def __init__(self, devices):
+        self.devices = devices
+        self.Devices = self
+        self._p_jar = Connection()
+
+    def getOrganizer(self, path):
+        return self
+
+    def getSubDevicesGen(self):
+        return iter(self.devices)
+
+
+def read(path):
+    """Returns a JSON columns file's table name and rows"""
+    with gzip.open(path, 'rb') as export_file:
+        lines = [json.loads(line.decode('utf-8')) for line in export_file]
+    header = lines[0]
+    names = [name for name, kind in header['columns']]
+    rows = list()
+    for columns in lines[1:]:
+        rows += [dict(zip(names, row)) for row in zip(*[
+            columns[name] for name in names
+            ])]
+    return header['table'], rows
+
+
+class FailingWriter(export.JsonColumnsWriter):
+    """Fails to open the wlans table"""
+
+    def __init__(self, path, table):
+        if 'wlans' == table:
+            raise IOError('No space left on device')
+        super(FailingWriter, self).__init__(path, table)
+
+
+class ExportTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.ap1 = Component(
+            'ap1', 100.0,
+            title='AP 1', model='AIR-AP2802I-B-K9', enabled=True
+            )
+        self.ap1.children.append(Component(
+            'ap1_0', 100.0, band='2.4 GHz', channel='6', enabled=True
+            ))
+        self.ap2 = Component('ap2', 100.0, title='AP 2', enabled=False)
+        self.ap2.children.append(Component('ap2_1', 100.0, band='5 GHz'))
+        group = Component('default-group', 100.0)
+        group.children += [self.ap1, self.ap2]
+        self.wlan = Component('1', 100.0, title='Staff', enabled=True)
+        self.controller = Controller('wlc1', [group], [self.wlan])
+        self.dmd = Dmd([self.controller])
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def export(self, incremental=False, writer_class=None):
+        return export.export(
+            self.dmd,
+            self.directory,
+            batch=2,
+            incremental=incremental,
+            writer_class=writer_class or export.JsonColumnsWriter
+            )
+
+    def files(self, suffix=''):
+        """{table: rows} of the files whose stamps end with suffix"""
+        tables = dict()
+        for name in os.listdir(self.directory):
+            if name.endswith('{0}.json.gz'.format(suffix)):
+                table, rows = read(os.path.join(self.directory, name))
+                tables[table] = rows
+        return tables
+
+    def test_full(self):
+        self.assertEqual(
+            {'accessPoints': 2, 'radios': 2, 'wlans': 1},
+            self.export()
+            )
+        tables = self.files()
+        aps = sorted(tables['accessPoints'], key=lambda row: row['id'])
+        self.assertEqual(['ap1', 'ap2'], [row['id'] for row in aps])
+        self.assertEqual('AIR-AP2802I-B-K9', aps[0]['model'])
+        self.assertEqual(False, aps[1]['enabled'])
+        self.assertEqual(None, aps[1]['model'])
+        self.assertEqual('wlc1', aps[0]['device'])
+        self.assertEqual(100.0, aps[0]['modified'])
+        radios = sorted(tables['radios'], key=lambda row: row['id'])
+        self.assertEqual(['ap1', 'ap2'], [row['ap'] for row in radios])
+        self.assertEqual([0, 1], [row['slot'] for row in radios])
+        self.assertEqual('WLAN', tables['wlans'][0]['type'])
+        self.assertNotIn(export.IDS, tables)
+        self.assertTrue(os.path.exists(
+            os.path.join(self.directory, export.STATE)
+            ))
+
+    def test_incremental(self):
+        self.export()
+        since = export.read_state(self.directory)
+        # ap1 changed, ap2 and its radio were deleted
+        self.ap1._p_mtime = since + 1
+        self.controller.groups[0].children.remove(self.ap2)
+
+        self.assertEqual(
+            {'accessPoints': 1, 'radios': 0, 'wlans': 0, export.IDS: 3},
+            self.export(incremental=True)
+            )
+        tables = self.files('-changes')
+        self.assertEqual(
+            ['ap1'],
+            [row['id'] for row in tables['accessPoints']]
+            )
+        self.assertEqual([], tables['radios'])
+        self.assertEqual(
+            [('accessPoints', 'ap1'), ('radios', 'ap1_0'), ('wlans', '1')],
+            sorted((row['table'], row['id']) for row in tables[export.IDS])
+            )
+
+    def test_incremental_without_state_is_full(self):
+        self.assertEqual(
+            {'accessPoints': 2, 'radios': 2, 'wlans': 1},
+            self.export(incremental=True)
+            )
+
+    def test_failed_writer_leaves_no_partial_files(self):
+        self.assertRaises(IOError, self.export, writer_class=FailingWriter)
+        self.assertEqual([], os.listdir(self.directory))
+
+
+if __name__ == '__main__':
+    unittest.main()
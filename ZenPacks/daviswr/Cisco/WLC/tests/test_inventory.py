@@ -0,0 +1,192 @@
+"""Tests that the inventory summaries CiscoControllerAP stores stay
+consistent with the modeled components as APs come, change and go
+"""
+
+import logging
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import inventory
+from ZenPacks.daviswr.Cisco.WLC.modeler.plugins.daviswr.snmp \
+    import CiscoControllerAP as modeler
+
+log = logging.getLogger('zen.CiscoWLC.tests')
+
+
+class Component(object):
+    """A modeled component, with its relationships by component ID"""
+
+    def __init__(self, om):
+        self.relations = dict()
+        self.update(om)
+
+    def update(self, om):
+        for name, value in om.__dict__.items():
+            if name not in ('compname', 'modname', 'relname'):
+                setattr(self, name, value)
+
+    def related(self, relname):
+        return list(self.relations.get(relname, dict()).values())
+
+    def accessPoints(self):
+        return self.related('accessPoints')
+
+    def apRadios(self):
+        return self.related('apRadios')
+
+
+class Device(Component):
+    id = 'wlc1'
+    zWlanApGroupIgnoreNames = ''
+    zWlanApIgnoreModels = list()
+    zWlanApIgnoreNames = ''
+    zWlanApIgnoreSubnets = list()
+    zWlanApPackProperties = False
+
+    def __init__(self):
+        self.relations = dict()
+
+    def apGroups(self):
+        return self.related('apGroups')
+
+    def find(self, compname):
+        obj = self
+        parts = compname.split('/') if compname else list()
+        for relname, component_id in zip(parts[::2], parts[1::2]):
+            obj = obj.relations[relname][component_id]
+        return obj
+
+    def apply(self, maps):
+        """Applies maps as ApplyDataMap does: a RelationshipMap's
+        components are added or updated, and any others removed
+        """
+        for datamap in maps:
+            obj = self.find(datamap.compname)
+            if not hasattr(datamap, 'maps'):
+                obj.update(datamap)
+                continue
+            related = obj.relations.setdefault(datamap.relname, dict())
+            current = dict()
+            for om in datamap.maps:
+                if om.id in related:
+                    related[om.id].update(om)
+                    current[om.id] = related[om.id]
+                else:
+                    current[om.id] = Component(om)
+            obj.relations[datamap.relname] = current
+
+
+def walk(aps, groups=('default-group', 'lobby')):
+    """Table data for (name, group, model, mode, enabled, radio bands)"""
+    tables = dict(
+        (table, dict()) for table in (
+            'bsnAPGroupsVlanTable',
+            'bsnAPTable',
+            'cLApTable',
+            'entPhysicalTable',
+            'clcCdpApCacheTable',
+            'bsnAPIfTable',
+            )
+        )
+    for number, group in enumerate(groups):
+        tables['bsnAPGroupsVlanTable'][str(number + 1)] = {'title': group}
+    for number, (name, group, model, mode, enabled, bands) in enumerate(aps):
+        mac = '\x00\x01\x02\x03\x04' + chr(number)
+        index = '0.1.2.3.4.{0}'.format(number)
+        tables['bsnAPTable'][index] = {
+            'title': name,
+            'group': group,
+            'model': model,
+            'mode': mode,
+            'enabled': 1 if enabled else 2,
+            'swVersion': '8.5.182.0',
+            'mac': mac,
+            'radioMac': mac,
+            'ip': '10.0.0.{0}'.format(number + 1),
+            }
+        for slot, (band, radio_enabled) in enumerate(bands):
+            tables['bsnAPIfTable']['{0}.{1}'.format(index, slot)] = {
+                'band': band,
+                'enabled': 1 if radio_enabled else 2,
+                }
+    return dict(), tables
+
+
+class InventoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.device = Device()
+        self.aps = [
+            ('ap1', 'default-group', 'AIR-AP2802I', 0, True,
+             ((1, True), (2, True))),
+            ('ap2', 'default-group', 'AIR-AP2802I', 2, True,
+             ((1, True), (2, False))),
+            ('ap3', 'lobby', 'AIR-CAP3702I', 0, False,
+             ((1, True), (2, True))),
+            ('ap4', 'lobby', 'AIR-AP1815W', 2, True,
+             ((1, True), (2, True))),
+            ]
+
+    def model(self):
+        maps = modeler.CiscoControllerAP().process(
+            self.device,
+            walk(self.aps),
+            log
+            )
+        self.device.apply(maps)
+
+    def assertConsistent(self):
+        self.assertEqual(dict(), inventory.mismatches(self.device))
+        for group in self.device.apGroups():
+            self.assertEqual(dict(), inventory.mismatches(group))
+
+    def test_add(self):
+        self.model()
+        self.assertConsistent()
+        self.assertEqual(4, self.device.apCount)
+        self.assertEqual(
+            ['AIR-AP2802I: 2', 'AIR-AP1815W: 1', 'AIR-CAP3702I: 1'],
+            self.device.apModels
+            )
+        self.assertEqual(1, self.device.apsDisabled)
+        self.assertEqual(1, self.device.radiosDisabled)
+
+        self.aps.append(('ap5', 'lobby', 'AIR-AP1815W', 1, True,
+                         ((1, True), (2, True))))
+        self.model()
+        self.assertConsistent()
+        self.assertEqual(5, self.device.apCount)
+
+    def test_update(self):
+        self.model()
+        # An AP upgraded, re-enabled with a radio disabled, and moved
+        self.aps[2] = ('ap3', 'default-group', 'AIR-AP2802I', 2, True,
+                       ((1, True), (2, False)))
+        self.model()
+        self.assertConsistent()
+        self.assertEqual(['AIR-AP2802I: 3', 'AIR-AP1815W: 1'],
+                         self.device.apModels)
+        self.assertEqual(0, self.device.apsDisabled)
+        self.assertEqual(2, self.device.radiosDisabled)
+        lobby = self.device.find('apGroups/lobby')
+        self.assertEqual(1, lobby.apsEnabled)
+
+    def test_remove(self):
+        self.model()
+        del self.aps[1:]
+        self.model()
+        self.assertConsistent()
+        self.assertEqual(1, self.device.apCount)
+        lobby = self.device.find('apGroups/lobby')
+        self.assertEqual([], lobby.accessPoints())
+        self.assertEqual([], lobby.apModels)
+        self.assertEqual(0, lobby.apsEnabled + lobby.apsDisabled)
+
+    def test_mismatch_reported(self):
+        self.model()
+        group = self.device.find('apGroups/default-group')
+        group.apsEnabled += 1
+        self.assertEqual({'apsEnabled': (3, 2)}, inventory.mismatches(group))
+
+
+if __name__ == '__main__':
+    unittest.main()
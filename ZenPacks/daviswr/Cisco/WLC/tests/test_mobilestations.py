@@ -0,0 +1,124 @@
+"""Tests dsplugins.MobileStations against a simulated client table"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC.dsplugins import MobileStations
+from ZenPacks.daviswr.Cisco.WLC.tests import agent
+
+ENTRY = '.1.3.6.1.4.1.14179.2.1.4.1'
+
+
+class Datasource(object):
+
+    def __init__(self, component, params):
+        self.component = component
+        self.params = params
+        self.cycletime = 300
+
+
+class Config(object):
+    id = 'wlc1'
+    zWlanRoamWindow = 60
+
+    def __init__(self):
+        self.datasources = [
+            Datasource(None, {'kind': 'device'}),
+            Datasource('ap1', {
+                'kind': 'ap',
+                'snmpindex': '0.1.2.3.4.1',
+                'groupId': 'default',
+                }),
+            Datasource('ap2', {
+                'kind': 'ap',
+                'snmpindex': '0.1.2.3.4.2',
+                'groupId': 'default',
+                }),
+            Datasource('default', {'kind': 'group'}),
+            ]
+
+
+def ap_mac(number):
+    return ''.join(chr(octet) for octet in (0, 1, 2, 3, 4, number))
+
+
+def client_table(clients):
+    """Walk of bsnMobileStationTable, clients {number: AP number}"""
+    rows = dict(
+        ('0.10.0.0.0.{0}'.format(client), {
+            4: ap_mac(ap) if isinstance(ap, int) else ap,
+            6: 1,
+            25: 3,
+            })
+        for client, ap in clients.items()
+        )
+    return agent.table(ENTRY, (4, 6, 25), rows)
+
+
+class MobileStationsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.plugin = MobileStations()
+        self.config = Config()
+
+    def cycle(self, clients, **kwargs):
+        """Collects from a client table, returning the collect result"""
+        simulated = agent.Agent(client_table(clients), **kwargs)
+        clock, undo = agent.install(simulated)
+        try:
+            return agent.run(self.plugin.collect(self.config), clock)[0]
+        finally:
+            undo()
+
+    def values(self, result):
+        return self.plugin.onSuccess(result, self.config)['values']
+
+    def test_counts_and_roams(self):
+        result = self.cycle({1: 1, 2: 1, 3: 2})
+        values = self.values(result)
+        self.assertEqual(3, values[None]['stations'])
+        self.assertEqual(2, values['ap1']['stations'])
+        self.assertEqual(1, values['ap2']['stations24'])
+        self.assertEqual(3, values['default']['stations'])
+        # The first complete walk is the baseline, not 3 joins
+        self.assertEqual(0, values['ap1']['roamJoins'])
+
+        values = self.values(self.cycle({1: 2, 3: 2, 4: 1}))
+        self.assertEqual(1, values['ap1']['roamsOut'])
+        self.assertEqual(1, values['ap2']['roamsIn'])
+        self.assertEqual(1, values['ap1']['roamLeaves'])
+        self.assertEqual(1, values['ap1']['roamJoins'])
+
+    def test_failed_walk_keeps_clients(self):
+        self.cycle({1: 1, 2: 1, 3: 2, 4: 2})
+        before = dict(self.plugin.clients)
+
+        # A row that can't be counted fails the walk part-way through
+        with self.assertRaises(TypeError):
+            self.cycle({1: 2, 2: 2, 3: object(), 4: 2})
+        self.assertEqual(before, self.plugin.clients)
+
+        # Nothing was lost, so nobody joins or leaves
+        values = self.values(self.cycle({1: 1, 2: 1, 3: 2, 4: 2}))
+        self.assertEqual(0, values['ap1']['roamJoins'])
+        self.assertEqual(0, values['ap2']['roamLeaves'])
+        self.assertEqual(0, values['ap1']['roamsIn'])
+
+    def test_incomplete_walk_keeps_unseen_clients(self):
+        self.cycle({1: 1, 2: 1, 3: 2, 4: 2})
+
+        # The walk stops before clients 3 and 4
+        result = self.cycle(
+            {1: 2, 2: 1, 3: 2, 4: 2},
+            unreachable='{0}.4.0.10.0.0.0.3'.format(ENTRY)
+            )
+        self.assertFalse(result[0])
+        self.assertEqual(4, len(self.plugin.clients))
+
+        values = self.values(self.cycle({1: 2, 2: 1, 3: 2, 4: 2}))
+        self.assertEqual(0, values['ap2']['roamLeaves'])
+        self.assertEqual(0, values['ap2']['roamJoins'])
+        self.assertEqual(1, values['ap2']['roamsIn'])
+
+
+if __name__ == '__main__':
+    unittest.main()
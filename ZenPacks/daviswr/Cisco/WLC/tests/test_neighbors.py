@@ -0,0 +1,69 @@
+"""Tests the RRM neighbor graph of dsplugins.RadioNeighbors"""
+
+import unittest
+from array import array
+
+from ZenPacks.daviswr.Cisco.WLC.dsplugins \
+    import NeighborGraph, RadioNeighbors
+from ZenPacks.daviswr.Cisco.WLC.tests.test_mobilestations import Datasource
+from ZenPacks.daviswr.Cisco.WLC.tests.test_thresholds import Config
+
+
+class NeighborGraphTest(unittest.TestCase):
+
+    def setUp(self):
+        self.graph = NeighborGraph([
+            '0.1.2.3.4.5.0',
+            '0.1.2.3.4.5.1',
+            '0.1.2.3.4.6.0',
+            ])
+        # Heard by the first radio: the third, one of another
+        # controller's, and an unknown radio's neighbor is ignored
+        self.graph.add('0.1.2.3.4.5.0', '0.1.2.3.4.6.0', -60)
+        self.graph.add('0.1.2.3.4.5.0', '0.1.2.9.9.9.0', -80)
+        self.graph.add('0.1.2.9.9.9.0', '0.1.2.3.4.5.0', -50)
+        self.graph.add('0.1.2.3.4.6.0', '0.1.2.3.4.5.0', -200)
+
+    def test_edges(self):
+        self.assertEqual(3, len(self.graph))
+        self.assertEqual([0, 0, 2], list(self.graph.source))
+        self.assertEqual([2, -1, 0], list(self.graph.target))
+        # RSSI is clamped to a signed byte
+        self.assertEqual([-60, -80, -128], list(self.graph.rssi))
+        self.assertEqual(4, self.graph.source.itemsize)
+        self.assertEqual(4, self.graph.target.itemsize)
+
+    def test_stats(self):
+        neighbors, strong, cochannel, loudest = self.graph.stats(
+            array('l', [6, 36, 6]),
+            -70
+            )
+        self.assertEqual([2, 0, 1], list(neighbors))
+        self.assertEqual([1, 0, 0], list(strong))
+        self.assertEqual([1, 0, 1], list(cochannel))
+        self.assertEqual([-60, -128, -128], list(loudest))
+
+
+class RadioNeighborsTest(unittest.TestCase):
+
+    def test_disabled_radio_skipped(self):
+        config = Config([
+            Datasource('radio{0}'.format(number), {
+                'snmpindex': '0.1.2.3.4.5.{0}'.format(number),
+                'channel': 6,
+                'enabled': 0 == number,
+                })
+            for number in (0, 1)
+            ])
+        plugin = RadioNeighbors()
+        radios = plugin.components(config)
+        self.assertEqual(['0.1.2.3.4.5.0'], sorted(radios))
+        graph = NeighborGraph(sorted(radios))
+        graph.add('0.1.2.3.4.5.0', '0.1.2.9.9.9.0', -60)
+        data = plugin.onSuccess((True, graph), config)
+        self.assertEqual(['radio0'], list(data['values']))
+        self.assertEqual(1, data['values']['radio0']['neighbors'])
+
+
+if __name__ == '__main__':
+    unittest.main()
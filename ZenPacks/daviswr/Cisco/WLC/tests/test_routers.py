@@ -0,0 +1,75 @@
+"""Tests routers.CiscoWLCRouter.getComponentPage against a simulated
+catalog"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import names
+from ZenPacks.daviswr.Cisco.WLC.routers import CiscoWLCRouter
+from ZenPacks.daviswr.Cisco.WLC.tests import catalog
+
+UID = '/zport/dmd/Devices/Network/Cisco/Controller/devices/wlc1'
+
+
+class NamesTest(unittest.TestCase):
+
+    def test_suffixes(self):
+        self.assertEqual(['1', 'a1', 'aa1'], names.suffixes('AA1'))
+        self.assertEqual([], names.suffixes(None))
+
+    def test_query(self):
+        self.assertEqual(
+            {'query': ('lobby', 'lobby\x7f'), 'range': 'min:max'},
+            names.query('Lobby')
+            )
+
+
+class ComponentPageTest(unittest.TestCase):
+
+    def setUp(self):
+        aps = [
+            catalog.Component(
+                'AP{0:03d}'.format(number),
+                title='{0}-AP{1:03d}'.format(
+                    'Lobby' if number % 10 == 0 else 'Floor', number
+                    ),
+                model='AIR-AP2802I' if number % 2 else 'AIR-CAP3702I',
+                )
+            for number in range(100)
+            ]
+        self.catalog = catalog.Catalog(
+            aps,
+            ('title', 'model'),
+            ('titleSuffixes',)
+            )
+        self.router = CiscoWLCRouter(catalog.Controller(self.catalog))
+
+    def page(self, **kwargs):
+        response = self.router.getComponentPage(UID, 'AccessPoint', **kwargs)
+        return response.data['totalCount'], self.catalog.woken
+
+    def test_page_by_name(self):
+        total, woken = self.page(start=10, limit=5)
+        self.assertEqual(100, total)
+        # Sorted by title, Floor- before Lobby-, so AP010 isn't among them
+        self.assertEqual(['AP012', 'AP013', 'AP014', 'AP015', 'AP016'], woken)
+
+    def test_sort_indexed_column(self):
+        total, woken = self.page(limit=3, sort='model', dir='DESC')
+        self.assertEqual(3, len(woken))
+        self.assertTrue(all(int(ap[2:]) % 2 == 0 for ap in woken))
+
+    def test_filter_by_any_part_of_name(self):
+        total, woken = self.page(name='bby-ap05', limit=50)
+        self.assertEqual(1, total)
+        self.assertEqual(['AP050'], woken)
+        total, woken = self.page(name='LOBBY', limit=3, dir='DESC')
+        self.assertEqual(10, total)
+        self.assertEqual(['AP050', 'AP090', 'AP080', 'AP070'], woken)
+
+    def test_unpaged_class(self):
+        response = self.router.getComponentPage(UID, 'WirelessLAN')
+        self.assertFalse(response.success)
+
+
+if __name__ == '__main__':
+    unittest.main()
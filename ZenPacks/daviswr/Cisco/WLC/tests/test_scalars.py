@@ -0,0 +1,28 @@
+"""Tests controller scalars from dsplugins.ControllerScalars"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC.dsplugins import ControllerScalars
+from ZenPacks.daviswr.Cisco.WLC.tests.test_mobilestations import Datasource
+from ZenPacks.daviswr.Cisco.WLC.tests.test_thresholds import Config
+
+
+class ControllerScalarsTest(unittest.TestCase):
+
+    def test_memory(self):
+        config = Config([Datasource(None, {'apCount': 10})])
+        data = ControllerScalars().onSuccess({
+            'agentTotalMemory': 1048576,
+            'agentFreeMemory': 65536,
+            }, config)
+        self.assertEqual({
+            # Kbytes, as recorded by the SNMP datasource it replaced
+            'agentFreeMemory': 65536,
+            'totalMemory': 1073741824,
+            'usedMemory': 1006632960,
+            'mem_pct': 93.75,
+            }, data['values'][None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""Simulates zenmodeler passes over many controllers against schedule"""
+
+import logging
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC import schedule
+
+log = logging.getLogger('zen.CiscoWLC.test')
+
+HOUR = 3600
+
+
+class Controller(object):
+    """Modeler device proxy"""
+
+    def __init__(self, device_id, ap_count=0, last=0):
+        self.id = device_id
+        self.apCount = ap_count
+        self._snmpLastCollection = last
+        self.zCollectorClientTimeout = 180
+        self.zWlanModelInterval = 60
+        self.zWlanModelLargeAPs = 1000
+        self.zWlanModelMaxLarge = 1
+
+
+class ScheduleTest(unittest.TestCase):
+
+    def setUp(self):
+        schedule._leases.clear()
+        schedule._first_seen.clear()
+
+    def simulate(self, devices, start, passes, step=60):
+        """Runs zenmodeler passes every step seconds, modeling and
+        processing whatever is due, and returns {device ID: [times]}
+        """
+        modeled = dict((device.id, list()) for device in devices)
+        for number in range(passes):
+            now = start + number * step
+            for device in devices:
+                if schedule.due(device, log, now=now, argv=[]):
+                    device._snmpLastCollection = now
+                    device.apCount = device.apCount or 10
+                    schedule.release(device.id)
+                    modeled[device.id].append(now)
+        return modeled
+
+    def test_bulk_add_spreads_first_models(self):
+        devices = [Controller('wlc{0}'.format(n)) for n in range(200)]
+        modeled = self.simulate(devices, 1000000, 120)
+
+        firsts = sorted(times[0] for times in modeled.values())
+        self.assertEqual(len(firsts), len(devices))
+        # Nobody modeled on the pass they were added...
+        self.assertTrue(firsts[0] > 1000000)
+        # ...and no single pass models more than a few of them
+        per_pass = dict()
+        for first in firsts:
+            per_pass[first] = per_pass.get(first, 0) + 1
+        self.assertTrue(max(per_pass.values()) <= 15)
+        # Each is modeled once per interval at its own offset
+        for times in modeled.values():
+            self.assertTrue(1 <= len(times) <= 2)
+            if len(times) > 1:
+                self.assertTrue(times[1] - times[0] >= HOUR - 60)
+
+    def test_restart_models_at_offsets(self):
+        start = 1000000
+        devices = list()
+        for number in range(100):
+            device_id = 'wlc{0}'.format(number)
+            # Modeled on schedule before the restart
+            last = schedule.last_slot(device_id, HOUR, start)
+            devices.append(Controller(device_id, 10, last))
+        modeled = self.simulate(devices, start, 60)
+
+        for device in devices:
+            times = modeled[device.id]
+            self.assertEqual(1, len(times))
+            due_at = schedule.last_slot(device.id, HOUR, times[0])
+            self.assertTrue(0 <= times[0] - due_at < 60)
+
+    def test_large_and_unknown_need_a_lease(self):
+        large = Controller('large', 5000, 1)
+        unknown = Controller('new')
+        now = schedule.last_slot(large.id, HOUR, 2000000) + 1
+        schedule._first_seen[unknown.id] = 1
+
+        self.assertTrue(schedule.due(large, log, now=now, argv=[]))
+        # The only lease is held until the large controller is processed
+        self.assertFalse(schedule.due(unknown, log, now=now, argv=[]))
+        schedule.release(large.id)
+        self.assertTrue(schedule.due(unknown, log, now=now, argv=[]))
+
+    def test_lease_expires(self):
+        large = Controller('large', 5000, 1)
+        other = Controller('other', 5000, 1)
+        now = 2000000
+        self.assertTrue(schedule.due(large, log, now=now, argv=[]))
+        self.assertFalse(schedule.due(other, log, now=now + 60, argv=[]))
+        self.assertTrue(schedule.due(other, log, now=now + 181, argv=[]))
+
+    def test_small_controllers_skip_leases(self):
+        schedule.acquire('large', 2000000 + 180, 1, 2000000)
+        small = Controller('small', 20, 1)
+        self.assertTrue(schedule.due(small, log, now=2000000, argv=[]))
+
+    def test_requested_by_id_is_always_due(self):
+        device = Controller('wlc1', 5000, 2000000)
+        schedule.acquire('large', 2000000 + 180, 1, 2000000)
+        self.assertFalse(schedule.due(device, log, now=2000001, argv=[]))
+        for argv in (
+                ['zenmodeler', 'run', '-d', 'wlc1'],
+                ['zenmodeler', 'run', '--device', 'wlc1'],
+                ['zenmodeler', 'run', '--device=wlc1'],
+                ['zenmodeler', 'run', '-dwlc1'],
+                ):
+            self.assertTrue(
+                schedule.due(device, log, now=2000001, argv=argv)
+                )
+        self.assertFalse(schedule.due(
+            device,
+            log,
+            now=2000001,
+            argv=['zenmodeler', 'run', '-d', 'wlc10']
+            ))
+
+    def test_disabled(self):
+        device = Controller('wlc1', 5000, 2000000)
+        device.zWlanModelInterval = 0
+        self.assertTrue(schedule.due(device, log, now=2000001, argv=[]))
+
+
+if __name__ == '__main__':
+    unittest.main()
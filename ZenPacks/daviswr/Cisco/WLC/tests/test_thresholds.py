@@ -0,0 +1,151 @@
+"""Tests that threshold state survives a collector restart"""
+
+import unittest
+
+from ZenPacks.daviswr.Cisco.WLC.dsplugins \
+    import AccessPointUplink, RadioLoad
+from ZenPacks.daviswr.Cisco.WLC.tests.test_mobilestations import Datasource
+
+
+class Config(object):
+    id = 'wlc1'
+
+    def __init__(self, datasources):
+        self.datasources = datasources
+
+
+class RadioLoadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config([Datasource('radio1', {
+            'snmpindex': '0.1.2.3.4.5.0',
+            'title': 'Radio 0',
+            'compname': 'apGroups/default/accessPoints/ap1/apRadios/radio1',
+            'ap': 'ap1',
+            'group': 'default',
+            'enabled': True,
+            'exceeded': 0,
+            })])
+        self.config.zWlanApClientThreshold = 50
+        self.config.zWlanApPoorSnrThreshold = 0
+        self.config.zWlanApChannelUtilThreshold = 0
+
+    def cycle(self, plugin, clients):
+        table = {'0.1.2.3.4.5.0': {'bsnAPIfLoadNumOfClients': clients}}
+        return plugin.onSuccess(
+            ({'bsnAPIfLoadParametersTable': table}, []),
+            self.config
+            )
+
+    def test_exceeded_is_modeled(self):
+        data = self.cycle(RadioLoad(), 60)
+        self.assertEqual(3, data['events'][0]['severity'])
+        self.assertEqual(1, data['maps'][0].thresholdsExceeded)
+
+    def test_recovery_during_restart_is_cleared(self):
+        self.config.datasources[0].params['exceeded'] = 1
+        data = self.cycle(RadioLoad(), 40)
+        self.assertEqual(1, len(data['events']))
+        self.assertEqual(0, data['events'][0]['severity'])
+        self.assertEqual('radioClients', data['events'][0]['eventKey'])
+        self.assertEqual(0, data['maps'][0].thresholdsExceeded)
+
+    def test_datasources_share_the_walk(self):
+        """The radio's five load datasources are evaluated once"""
+        radio = self.config.datasources[0]
+        self.config.datasources = [
+            Datasource(radio.component, radio.params) for _ in range(5)
+            ]
+        data = self.cycle(RadioLoad(), 60)
+        self.assertEqual(1, len(data['events']))
+        self.assertEqual(1, len(data['maps']))
+        self.assertEqual(
+            60,
+            data['values']['radio1']['bsnAPIfLoadNumOfClients']
+            )
+
+    def assertCleared(self, data):
+        self.assertEqual(
+            [('radioClients', 0)],
+            [(event['eventKey'], event['severity'])
+             for event in data['events']]
+            )
+        self.assertEqual(
+            [0],
+            [om.thresholdsExceeded for om in data['maps']]
+            )
+
+    def test_disabled_radio_is_cleared(self):
+        plugin = RadioLoad()
+        self.cycle(plugin, 60)
+        self.config.datasources[0].params['enabled'] = False
+        data = self.cycle(plugin, 60)
+        self.assertCleared(data)
+        self.assertEqual('ap1 Radio 0 disabled', data['events'][0]['summary'])
+        # Only once
+        self.assertEqual([], self.cycle(plugin, 60)['events'])
+
+    def test_missing_row_is_cleared(self):
+        plugin = RadioLoad()
+        self.cycle(plugin, 60)
+        empty = ({'bsnAPIfLoadParametersTable': dict()}, [])
+        # Not while the walk was incomplete
+        data = plugin.onSuccess(
+            (empty[0], ['bsnAPIfLoadParametersTable']),
+            self.config
+            )
+        self.assertEqual([], data['events'])
+        self.assertCleared(plugin.onSuccess(empty, self.config))
+
+    def test_disabled_during_restart_is_cleared(self):
+        self.config.datasources[0].params['exceeded'] = 1
+        self.config.datasources[0].params['enabled'] = False
+        self.assertCleared(self.cycle(RadioLoad(), 60))
+
+    def test_still_exceeded_after_restart(self):
+        self.config.datasources[0].params['exceeded'] = 1
+        data = self.cycle(RadioLoad(), 60)
+        self.assertEqual([], data['events'])
+        self.assertEqual([], data['maps'])
+
+
+class AccessPointUplinkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.config = Config([Datasource('ap1', {
+            'snmpindex': '0.1.2.3.4.5',
+            'title': 'ap1',
+            'compname': 'apGroups/default/accessPoints/ap1',
+            'neighborName': 'sw1',
+            'neighborInterface': 'Gi1/0/7',
+            'degraded': '',
+            })])
+        self.config.zWlanApUplinkMinSpeed = 1000
+
+    def cycle(self, plugin, speed, duplex=3):
+        table = {'0.1.2.3.4.5.0': {'speed': speed, 'duplex': duplex}}
+        return plugin.onSuccess(
+            ({'cLApEthernetIfTable': table}, []),
+            self.config
+            )
+
+    def test_degraded_is_modeled(self):
+        data = self.cycle(AccessPointUplink(), 100)
+        self.assertEqual(3, data['events'][0]['severity'])
+        self.assertEqual('100 Mbps', data['maps'][0].uplinkDegraded)
+
+    def test_recovery_during_restart_is_cleared(self):
+        self.config.datasources[0].params['degraded'] = '100 Mbps'
+        data = self.cycle(AccessPointUplink(), 1000)
+        self.assertEqual(0, data['events'][0]['severity'])
+        self.assertEqual('', data['maps'][0].uplinkDegraded)
+
+    def test_still_degraded_after_restart(self):
+        self.config.datasources[0].params['degraded'] = '100 Mbps'
+        data = self.cycle(AccessPointUplink(), 100)
+        self.assertEqual([], data['events'])
+        self.assertEqual([], data['maps'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,276 @@
+"""Tests walker.TableWalker against a simulated agent"""
+
+import logging
+import unittest
+
+from Products.DataCollector.plugins.CollectorPlugin import GetTableMap
+
+from ZenPacks.daviswr.Cisco.WLC import walker
+from ZenPacks.daviswr.Cisco.WLC.dsplugins import SnmpTablePlugin
+from ZenPacks.daviswr.Cisco.WLC.modeler.plugins.daviswr.snmp \
+    import CiscoControllerAPResumable
+from ZenPacks.daviswr.Cisco.WLC.tests import agent
+
+log = logging.getLogger('zen.CiscoWLC.test')
+
+# bsnAPTable's name and operational status columns
+ENTRY = '.1.3.6.1.4.1.14179.2.2.1.1'
+TABLEMAP = GetTableMap('bsnAPTable', ENTRY, {'.3': 'name', '.6': 'status'})
+
+
+def ap_rows(count):
+    return dict(
+        ('0.1.2.3.{0}.{1}'.format(n // 256, n % 256), {
+            3: 'ap{0}'.format(n),
+            6: 1 + n % 2,
+            })
+        for n in range(count)
+        )
+
+
+class WalkerTest(unittest.TestCase):
+
+    def walker(self, walk, retries=3, backoff=2.0, **kwargs):
+        self.agent = agent.Agent(walk, **kwargs)
+        self.clock, undo = agent.install(self.agent)
+        self.addCleanup(undo)
+        table_walker = walker.TableWalker(
+            agent.Device(),
+            log,
+            retries=retries,
+            backoff=backoff,
+            tuning=walker.BulkTuning(max_repetitions=10, timeout=1),
+            )
+        table_walker.open()
+        return table_walker
+
+    def expected(self, rows):
+        return dict(
+            (index, {'name': row[3], 'status': row[6]})
+            for index, row in rows.items()
+            )
+
+    def test_walk_complete(self):
+        rows = ap_rows(300)
+        table_walker = self.walker(agent.table(ENTRY, (3, 6), rows))
+        (tabledata, incomplete), delays = agent.run(
+            table_walker.walk_tables([TABLEMAP]),
+            self.clock
+            )
+        self.assertEqual([], incomplete)
+        self.assertEqual([], delays)
+        self.assertEqual(self.expected(rows), tabledata['bsnAPTable'])
+
+    def test_resumes_from_checkpoint(self):
+        rows = ap_rows(100)
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), rows),
+            failures=(3,)
+            )
+        column, delays = agent.run(
+            table_walker.walk_column(walker.ColumnWalk(ENTRY + '.3')),
+            self.clock
+            )
+        self.assertTrue(column.complete)
+        self.assertEqual([2.0], delays)
+        self.assertEqual(
+            dict(
+                (oid, value) for oid, value in self.agent.walk.items()
+                if oid.startswith(ENTRY + '.3.')
+                ),
+            column.rows
+            )
+
+        # The retry asks for what follows the last OID received, not the
+        # start of the column, so no row is requested twice
+        first, second, failed, retried = self.agent.requests[:4]
+        self.assertEqual(None, failed)
+        received = sorted(column.rows, key=walker.oid_key)
+        self.assertEqual(received[first[0] + second[0] - 1], retried[1][0])
+        answered = [request for request in self.agent.requests if request]
+        self.assertEqual(
+            len(answered),
+            len(set(oids[0] for reps, oids in answered))
+            )
+
+    def test_walk_tables_resumes(self):
+        rows = ap_rows(100)
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), rows),
+            failures=(2, 5)
+            )
+        (tabledata, incomplete), delays = agent.run(
+            table_walker.walk_tables([TABLEMAP]),
+            self.clock
+            )
+        self.assertEqual([], incomplete)
+        self.assertEqual(self.expected(rows), tabledata['bsnAPTable'])
+
+    def test_backoff(self):
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), ap_rows(50)),
+            backoff=2.0,
+            failures=(2, 3, 4),
+            )
+        result, delays = agent.run(
+            table_walker.walk_column(walker.ColumnWalk(ENTRY + '.3')),
+            self.clock
+            )
+        self.assertTrue(result.complete)
+        # Exponential, doubling from zWlanWalkBackoff
+        self.assertEqual([2.0, 4.0, 8.0], delays)
+        # Max-repetitions halves, to the floor, and the timeout doubles
+        reps = [request[0] for request in self.agent.requests if request]
+        self.assertEqual(10, reps[0])
+        self.assertEqual(walker.BulkTuning.floor, reps[1])
+
+    def test_truncated_to_frontier(self):
+        rows = ap_rows(100)
+        walk = agent.table(ENTRY, (3, 6), rows)
+        # The status column stops answering part-way through
+        unreachable = '{0}.6.0.1.2.3.0.40'.format(ENTRY)
+        table_walker = self.walker(walk, retries=2, unreachable=unreachable)
+        (tabledata, incomplete), delays = agent.run(
+            table_walker.walk_tables([TABLEMAP]),
+            self.clock
+            )
+        self.assertEqual(['bsnAPTable'], incomplete)
+        self.assertEqual(2, len(delays))
+        table = tabledata['bsnAPTable']
+        # Rows past where the status column reached are dropped from
+        # every column, so no row is missing a column
+        self.assertTrue(table)
+        self.assertTrue(len(table) < len(rows))
+        self.assertEqual(
+            sorted(rows, key=walker.oid_key)[:len(table)],
+            sorted(table, key=walker.oid_key)
+            )
+        for index, row in table.items():
+            self.assertEqual(self.expected(rows)[index], row)
+
+    def test_stream_table(self):
+        rows = ap_rows(200)
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), rows),
+            failures=(4,),
+            max_varbinds=15,
+            )
+        streamed = list()
+        complete, delays = agent.run(
+            table_walker.stream_table(
+                TABLEMAP,
+                lambda index, row: streamed.append((index, row))
+                ),
+            self.clock
+            )
+        self.assertTrue(complete)
+        self.assertEqual([2.0], delays)
+        self.assertEqual(
+            sorted(rows, key=walker.oid_key),
+            [index for index, row in streamed]
+            )
+        self.assertEqual(self.expected(rows), dict(streamed))
+
+    def test_stream_table_converges(self):
+        """Max-repetitions stops growing at what the agent returns for
+        all the columns requested together
+        """
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), ap_rows(1000)),
+            max_varbinds=30,
+            )
+        complete, delays = agent.run(
+            table_walker.stream_table(TABLEMAP, lambda index, row: None),
+            self.clock
+            )
+        self.assertTrue(complete)
+        reps = [request[0] for request in self.agent.requests]
+        # 15 repetitions of both columns fill a response, and growth
+        # stops one step past that
+        self.assertEqual(18, max(reps))
+        self.assertEqual(18, table_walker.tuning.max_repetitions)
+
+    def test_stream_table_gives_up(self):
+        table_walker = self.walker(
+            agent.table(ENTRY, (3, 6), ap_rows(200)),
+            retries=1,
+            unreachable='{0}.6.0.1.2.3.0.100'.format(ENTRY),
+            )
+        streamed = list()
+        complete, delays = agent.run(
+            table_walker.stream_table(
+                TABLEMAP,
+                lambda index, row: streamed.append(index)
+                ),
+            self.clock
+            )
+        self.assertFalse(complete)
+        self.assertTrue(streamed)
+        self.assertEqual(
+            streamed[-1],
+            max(streamed, key=walker.oid_key)
+            )
+
+    def test_get_retries(self):
+        oid = '.1.3.6.1.4.1.9.9.618.1.8.4.0'
+        table_walker = self.walker({oid: 1200}, failures=(1,))
+        result, delays = agent.run(table_walker.get([oid]), self.clock)
+        self.assertEqual({oid: 1200}, result)
+        self.assertEqual([2.0], delays)
+
+    def test_snmp_properties(self):
+        """Both the modeler and datasource plugins open sessions from
+        the same properties
+        """
+        modeler = CiscoControllerAPResumable.CiscoControllerAPResumable
+        for name in walker.deviceProperties:
+            self.assertTrue(name in SnmpTablePlugin.proxy_attributes)
+            self.assertTrue(name in modeler.deviceProperties)
+        for name in (
+                'zSnmpVer',
+                'zSnmpPort',
+                'zSnmpTimeout',
+                'zSnmpTries',
+                'zSnmpAuthType',
+                'zSnmpAuthPassword',
+                'zSnmpPrivType',
+                'zSnmpPrivPassword',
+                'zSnmpSecurityName',
+                'zMaxOIDPerRequest',
+                ):
+            self.assertTrue(name in walker.deviceProperties)
+
+
+class BulkTuningTest(unittest.TestCase):
+
+    def test_grows_and_backs_off(self):
+        tuning = walker.BulkTuning(max_repetitions=20, timeout=2)
+        pairs = [('.1.3.6.1.2.1.1.{0}'.format(n), 'x' * 20)
+                 for n in range(20)]
+        tuning.success(pairs, 0.01)
+        self.assertEqual(25, tuning.max_repetitions)
+        tuning.failure()
+        self.assertEqual(12, tuning.max_repetitions)
+        # Growth is capped by the response size that failed
+        for _ in range(10):
+            tuning.success(pairs[:12], 0.01)
+        self.assertTrue(tuning.max_repetitions <= 25)
+
+    def test_loss_at_proven_size(self):
+        """A timeout at a size already received doesn't cap growth"""
+        tuning = walker.BulkTuning(max_repetitions=40, timeout=2)
+        pairs = [('.1.3.6.1.2.1.1.{0}'.format(n), 'x' * 20)
+                 for n in range(100)]
+        for _ in range(10):
+            tuning.success(pairs[:tuning.max_repetitions], 0.01)
+        self.assertEqual(tuning.ceiling, tuning.max_repetitions)
+        for _ in range(3):
+            tuning.failure()
+            for _ in range(10):
+                tuning.success(pairs[:tuning.max_repetitions], 0.01)
+        self.assertEqual(None, tuning.max_octets)
+        self.assertEqual(tuning.ceiling, tuning.max_repetitions)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Tests the zenpack.yaml cache of yamlcache"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import yaml
+
+from ZenPacks.daviswr.Cisco.WLC import yamlcache
+
+
+class Spec(dict):
+    created = False
+
+    def create(self):
+        self.created = True
+
+
+class WarningLoader(yaml.Loader):
+    """Stands in for zenpacklib's loader, constructing a Spec"""
+
+    composed = 0
+
+    def compose_document(self):
+        WarningLoader.composed += 1
+        return yaml.Loader.compose_document(self)
+
+    def construct_document(self, node):
+        return Spec(yaml.Loader.construct_document(self, node))
+
+
+class ZenPackLib(object):
+    """Stands in for the zenpacklib module"""
+
+    __version__ = '2.1.0'
+
+    def __init__(self, loader_class=WarningLoader):
+        if loader_class:
+            self.WarningLoader = loader_class
+        self.loaded = 0
+
+    def load_yaml(self, yaml_path):
+        self.loaded += 1
+        with open(yaml_path) as yaml_file:
+            spec = Spec(yaml.safe_load(yaml_file))
+        spec.create()
+        return spec
+
+
+class YamlCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.yaml_path = os.path.join(self.directory, 'zenpack.yaml')
+        with open(self.yaml_path, 'w') as yaml_file:
+            yaml_file.write('name: ZenPacks.daviswr.Cisco.WLC\n')
+        self.cache = os.path.join(self.directory, 'cache')
+        self.environ = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = self.cache
+        WarningLoader.composed = 0
+
+    def tearDown(self):
+        if self.environ is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.environ
+        shutil.rmtree(self.directory)
+
+    def cached(self):
+        return sorted(os.listdir(yamlcache.cache_dir()))
+
+    def test_cached_in_user_directory(self):
+        zenpacklib = ZenPackLib()
+        spec = yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        self.assertEqual({'name': 'ZenPacks.daviswr.Cisco.WLC'}, spec)
+        self.assertTrue(spec.created)
+        self.assertEqual(1, WarningLoader.composed)
+
+        # Nothing is written next to zenpack.yaml, and no partial file
+        # is left
+        self.assertEqual(['cache', 'zenpack.yaml'],
+                         sorted(os.listdir(self.directory)))
+        path = yamlcache.cache_path(self.yaml_path, zenpacklib)
+        self.assertEqual([os.path.basename(path)], self.cached())
+
+        spec = yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        self.assertEqual({'name': 'ZenPacks.daviswr.Cisco.WLC'}, spec)
+        self.assertTrue(spec.created)
+        self.assertEqual(1, WarningLoader.composed)
+        self.assertEqual(0, zenpacklib.loaded)
+
+    def test_changed_yaml_replaces_cache(self):
+        zenpacklib = ZenPackLib()
+        yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        with open(self.yaml_path, 'a') as yaml_file:
+            yaml_file.write('description: Cisco WLC\n')
+        spec = yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        self.assertEqual('Cisco WLC', spec['description'])
+        self.assertEqual(2, WarningLoader.composed)
+        self.assertEqual(1, len(self.cached()))
+
+    def test_no_loader(self):
+        zenpacklib = ZenPackLib(loader_class=None)
+        spec = yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        self.assertTrue(spec.created)
+        self.assertEqual(1, zenpacklib.loaded)
+        self.assertFalse(os.path.exists(self.cache))
+
+    def test_unwritable_cache(self):
+        # A file where the cache directory's parent should be
+        with open(self.cache, 'w'):
+            pass
+        zenpacklib = ZenPackLib()
+        spec = yamlcache.load_yaml(zenpacklib, self.yaml_path)
+        self.assertEqual({'name': 'ZenPacks.daviswr.Cisco.WLC'}, spec)
+        self.assertEqual(0, zenpacklib.loaded)
+
+
+if __name__ == '__main__':
+    unittest.main()
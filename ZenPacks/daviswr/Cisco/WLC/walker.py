@@ -0,0 +1,401 @@
+__doc__ = """walker
+
+walks SNMP tables from a Cisco Wireless LAN Controller (WLC) running AireOS
+one GETBULK at a time, checkpointing the last OID received for each column
+so that a timeout part-way through a large table resumes rather than
+starting over from the first row
+
+"""
+
+import time
+
+from twisted.internet import defer, reactor
+from twisted.internet.task import deferLater
+
+from Products.ZenHub.services.SnmpPerformanceConfig import SnmpConnInfo
+
+# Properties of the device or datasource config a walker's SNMP session
+# is opened from, and its learned GETBULK settings
+deviceProperties = (
+    'bulkMaxRepetitions',
+    'bulkTimeout',
+    'zMaxOIDPerRequest',
+    'zSnmpAuthPassword',
+    'zSnmpAuthType',
+    'zSnmpCommunity',
+    'zSnmpContext',
+    'zSnmpEngineId',
+    'zSnmpPort',
+    'zSnmpPrivPassword',
+    'zSnmpPrivType',
+    'zSnmpSecurityName',
+    'zSnmpTimeout',
+    'zSnmpTries',
+    'zSnmpVer',
+    )
+
+
+def oid_key(oid):
+    """Returns an OID string as a tuple of integers for ordering"""
+    oid = oid.strip('.')
+    return tuple(map(int, oid.split('.'))) if oid else ()
+
+
+def oid_pairs(result):
+    """Normalizes a GETBULK result to (OID string, value) pairs"""
+    if hasattr(result, 'items'):
+        result = result.items()
+    pairs = list()
+    for oid, value in result:
+        if isinstance(oid, tuple):
+            oid = '.' + '.'.join(str(part) for part in oid)
+        pairs.append((oid, value))
+    return sorted(pairs, key=lambda pair: oid_key(pair[0]))
+
+
+class BulkTuning(object):
+    """Learns GETBULK max-repetitions and timeout from a controller
+
+    Max-repetitions grows while full responses come back well within the
+    timeout and is halved when a request fails. If the failed request's
+    estimated response was larger than any received, growth is then capped
+    at half its size, though never below the largest received, so losses
+    unrelated to size don't ratchet it down. The timeout follows a
+    multiple of the smoothed response latency.
+
+    columns is the number of OIDs a GETBULK requested, each of which is
+    repeated up to max-repetitions times in its response.
+    """
+
+    floor = 2
+    ceiling = 100
+    min_timeout = 1.0
+    # Timeout as a multiple of smoothed latency
+    latency_factor = 4.0
+
+    def __init__(self, max_repetitions=20, timeout=2.5, max_timeout=30.0):
+        self.max_repetitions = int(max_repetitions)
+        self.timeout = float(timeout)
+        self.max_timeout = max(float(max_timeout), self.timeout)
+        self.latency = None
+        self.max_octets = None
+        self.largest = 0
+        self.octets = 0
+        self.varbinds = 0
+        self.elapsed = 0.0
+
+    def success(self, pairs, elapsed, columns=1):
+        """Adjusts settings from a response's size and latency"""
+        count = len(pairs)
+        repetitions = count // columns
+        octets = sum(len(oid) + len(str(value)) for oid, value in pairs)
+        self.varbinds += count
+        self.octets += octets
+        self.elapsed += elapsed
+        self.largest = max(self.largest, octets)
+
+        if self.latency is None:
+            self.latency = elapsed
+        else:
+            self.latency = 0.7 * self.latency + 0.3 * elapsed
+        self.timeout = min(
+            self.max_timeout,
+            max(self.min_timeout, self.latency_factor * self.latency)
+            )
+
+        if elapsed > self.timeout / 2:
+            self.max_repetitions = max(
+                self.floor,
+                self.max_repetitions * 3 // 4
+                )
+        elif (repetitions >= self.max_repetitions
+              and elapsed < self.timeout / 4):
+            grown = self.max_repetitions + max(1, self.max_repetitions // 4)
+            if self.max_octets and octets:
+                # Repetitions that fit, at this response's octets each
+                grown = min(grown, self.max_octets * repetitions // octets)
+            self.max_repetitions = max(
+                self.floor,
+                min(self.ceiling, grown)
+                )
+
+    def failure(self, columns=1):
+        """Backs off after a request timed out or failed"""
+        if self.varbinds:
+            estimate = (
+                self.octets * self.max_repetitions * columns // self.varbinds
+                )
+            if estimate > self.largest:
+                self.max_octets = max(self.largest, estimate // 2)
+        self.max_repetitions = max(self.floor, self.max_repetitions // 2)
+        self.timeout = min(self.max_timeout, self.timeout * 2)
+
+    def throughput(self):
+        """Returns varbinds received per second of request latency"""
+        return self.varbinds / self.elapsed if self.elapsed else 0.0
+
+
+class ColumnWalk(object):
+    """Progress of a walk of a single table column"""
+
+    def __init__(self, oid):
+        self.oid = oid
+        self.prefix = oid + '.'
+        # Checkpoint, the last OID received
+        self.last = oid
+        self.rows = dict()
+        self.complete = False
+        self.failures = 0
+
+    def frontier(self):
+        """Returns the index of the last row received, None if complete"""
+        if self.complete:
+            return None
+        return oid_key(self.last[len(self.prefix):])
+
+
+class TableWalker(object):
+    """Resumable GETBULK walker for GetTableMap definitions"""
+
+    def __init__(self, device, log, retries=3, backoff=2.0, tuning=None):
+        self.device = device
+        self.log = log
+        self.retries = retries
+        self.backoff = backoff
+        self.tuning = tuning or BulkTuning()
+        self.proxy = None
+
+    def open(self):
+        """Opens an SNMP session using the device's zSnmp properties"""
+        self.proxy = SnmpConnInfo(self.device).createSession()
+        self.proxy.open()
+
+    def close(self):
+        """Closes the SNMP session"""
+        if self.proxy:
+            self.proxy.close()
+            self.proxy = None
+
+    @defer.inlineCallbacks
+    def get(self, oids):
+        """Gets scalar OIDs in a single request, returning {OID: value}
+
+        Retried up to the walker's retries, after which the last error is
+        raised.
+        """
+        failures = 0
+        while True:
+            try:
+                result = yield self.proxy.get(
+                    list(oids),
+                    self.tuning.timeout,
+                    0
+                    )
+                break
+            except Exception as ex:
+                failures += 1
+                if failures > self.retries:
+                    raise
+                delay = self.backoff * (2 ** (failures - 1))
+                self.log.info(
+                    'Get from %s failed (%s), retrying in %.1fs',
+                    self.device.id,
+                    ex,
+                    delay
+                    )
+                yield deferLater(reactor, delay, lambda: None)
+
+        defer.returnValue(dict(oid_pairs(result)))
+
+    @defer.inlineCallbacks
+    def walk_column(self, column):
+        """Walks a column to its end, retrying from the last OID received"""
+        while not column.complete:
+            started = time.time()
+            try:
+                # Retries are handled here, resuming from the checkpoint
+                result = yield self.proxy.getbulk(
+                    0,
+                    self.tuning.max_repetitions,
+                    [column.last],
+                    self.tuning.timeout,
+                    0
+                    )
+            except Exception as ex:
+                self.tuning.failure()
+                column.failures += 1
+                if column.failures > self.retries:
+                    self.log.warn(
+                        'Giving up on %s for %s after %s attempts: %s',
+                        column.oid,
+                        self.device.id,
+                        column.failures,
+                        ex
+                        )
+                    break
+                delay = self.backoff * (2 ** (column.failures - 1))
+                self.log.info(
+                    'Walk of %s on %s failed (%s), resuming from %s in %.1fs',
+                    column.oid,
+                    self.device.id,
+                    ex,
+                    column.last,
+                    delay
+                    )
+                yield deferLater(reactor, delay, lambda: None)
+                continue
+
+            pairs = oid_pairs(result)
+            self.tuning.success(pairs, time.time() - started)
+            progressed = False
+            for oid, value in pairs:
+                if not oid.startswith(column.prefix):
+                    column.complete = True
+                    break
+                # Agents that do not increase OIDs would otherwise loop
+                elif oid_key(oid) <= oid_key(column.last):
+                    continue
+                column.rows[oid] = value
+                column.last = oid
+                progressed = True
+
+            if progressed:
+                column.failures = 0
+            else:
+                column.complete = True
+
+        defer.returnValue(column)
+
+    @defer.inlineCallbacks
+    def stream_table(self, tablemap, callback):
+        """Walks a table's columns together, passing each row to callback
+
+        Every incomplete column is requested in the same GETBULK. A row is
+        passed to callback(index, row) as soon as every column has moved
+        past its index, and is not kept after that, so memory use doesn't
+        grow with the size of the table. Returns True if the whole table
+        was walked.
+        """
+        columns = [ColumnWalk(oid) for oid in tablemap.getoids()]
+        names = dict(
+            (tablemap.tableoid + column, name)
+            for column, name in tablemap.colnames.items()
+            )
+        # Row index: partial row, waiting on other columns
+        pending = dict()
+        failures = 0
+
+        while True:
+            active = [column for column in columns if not column.complete]
+            if not active:
+                break
+
+            started = time.time()
+            try:
+                result = yield self.proxy.getbulk(
+                    0,
+                    self.tuning.max_repetitions,
+                    [column.last for column in active],
+                    self.tuning.timeout,
+                    0
+                    )
+            except Exception as ex:
+                self.tuning.failure(len(active))
+                failures += 1
+                if failures > self.retries:
+                    self.log.warn(
+                        'Giving up on %s for %s after %s attempts: %s',
+                        tablemap.name,
+                        self.device.id,
+                        failures,
+                        ex
+                        )
+                    defer.returnValue(False)
+                delay = self.backoff * (2 ** (failures - 1))
+                self.log.info(
+                    'Walk of %s on %s failed (%s), resuming in %.1fs',
+                    tablemap.name,
+                    self.device.id,
+                    ex,
+                    delay
+                    )
+                yield deferLater(reactor, delay, lambda: None)
+                continue
+
+            pairs = oid_pairs(result)
+            self.tuning.success(pairs, time.time() - started, len(active))
+            failures = 0
+            for column in active:
+                progressed = False
+                name = names[column.oid]
+                last = oid_key(column.last)
+                for oid, value in pairs:
+                    if not oid.startswith(column.prefix):
+                        continue
+                    key = oid_key(oid)
+                    if key <= last:
+                        continue
+                    index = oid[len(column.prefix):]
+                    pending.setdefault(index, dict())[name] = value
+                    column.last = oid
+                    last = key
+                    progressed = True
+                if not progressed:
+                    column.complete = True
+
+            frontiers = [col.frontier() for col in columns if not col.complete]
+            frontier = min(frontiers) if frontiers else None
+            for key, index in sorted(
+                    (oid_key(index), index) for index in pending):
+                if frontier is not None and key > frontier:
+                    break
+                callback(index, pending.pop(index))
+
+        defer.returnValue(True)
+
+    @defer.inlineCallbacks
+    def walk_tables(self, tablemaps):
+        """Walks each GetTableMap, returning tabledata and incomplete tables
+
+        Rows of an incomplete table are kept only up to the point that every
+        column has reached, so they are consistent with each other.
+        """
+        tabledata = dict()
+        incomplete = list()
+        for tablemap in tablemaps:
+            columns = [ColumnWalk(oid) for oid in tablemap.getoids()]
+            yield defer.DeferredList(
+                [self.walk_column(column) for column in columns]
+                )
+
+            frontiers = [col.frontier() for col in columns if not col.complete]
+            if frontiers:
+                incomplete.append(tablemap.name)
+                frontier = min(frontiers)
+                for column in columns:
+                    column.rows = dict(
+                        (oid, value)
+                        for oid, value in column.rows.items()
+                        if oid_key(oid[len(column.prefix):]) <= frontier
+                        )
+                self.log.warn(
+                    '%s incomplete on %s, keeping rows up to index %s',
+                    tablemap.name,
+                    self.device.id,
+                    '.'.join(str(part) for part in frontier)
+                    )
+
+            tabledata[tablemap.name] = tablemap.mapdata(
+                dict((column.oid, column.rows) for column in columns)
+                )
+
+        self.log.debug(
+            'Walked %s varbinds from %s at %.0f/s, max-repetitions %s, '
+            'timeout %.1fs',
+            self.tuning.varbinds,
+            self.device.id,
+            self.tuning.throughput(),
+            self.tuning.max_repetitions,
+            self.tuning.timeout
+            )
+        defer.returnValue((tabledata, incomplete))
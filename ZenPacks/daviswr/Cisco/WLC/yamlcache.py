@@ -0,0 +1,169 @@
+__doc__ = """yamlcache
+
+loads zenpack.yaml through zenpacklib, caching the parsed YAML node
+graph in the user's cache directory so later imports by Zenoss daemons
+skip scanning and parsing the document
+
+The document is composed with the YAML loader zenpacklib.load_yaml()
+itself uses. The cache is named for a hash of zenpack.yaml and the
+Python, PyYAML and zenpacklib versions, so editing the YAML or upgrading
+any of them builds a new one on the next import. Any problem reading or
+writing the cache falls back to zenpacklib.load_yaml() as if it weren't
+there.
+
+"""
+
+import glob
+import hashlib
+import logging
+import os
+import sys
+import tempfile
+
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import yaml
+
+log = logging.getLogger('zen.CiscoWLC')
+
+# Bump when the cached format changes
+FORMAT = 1
+
+YAML_PATH = os.path.join(os.path.dirname(__file__), 'zenpack.yaml')
+
+# zenpacklib attributes naming the Loader class its load_yaml() parses
+# with, in order of preference: ZenPackLib 2 loads with its
+# WarningLoader, the single-file zenpacklib with its Loader
+LOADERS = (
+    'WarningLoader',
+    'Loader',
+    )
+
+
+def cache_dir():
+    """Returns the directory for this ZenPack's caches in the user's cache
+    directory, as XDG_CACHE_HOME or ~/.cache
+    """
+    base = os.environ.get('XDG_CACHE_HOME') \
+        or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'ZenPacks.daviswr.Cisco.WLC')
+
+
+def find_loader(zenpacklib):
+    """Returns the Loader class zenpacklib.load_yaml() uses, or None"""
+    for name in LOADERS:
+        loader_class = getattr(zenpacklib, name, None)
+        if isinstance(loader_class, type) \
+                and issubclass(loader_class, yaml.Loader):
+            return loader_class
+    return None
+
+
+def cache_path(yaml_path, zenpacklib, directory=None):
+    """Returns the cache file for the current zenpack.yaml and versions"""
+    digest = hashlib.sha1()
+    with open(yaml_path, 'rb') as yaml_file:
+        digest.update(yaml_file.read())
+    digest.update('{0} {1} {2} {3}'.format(
+        FORMAT,
+        sys.version,
+        yaml.__version__,
+        getattr(zenpacklib, '__version__', ''),
+        ).encode('utf-8'))
+    return os.path.join(
+        directory or cache_dir(),
+        '{0}.{1}.cache'.format(
+            os.path.basename(yaml_path),
+            digest.hexdigest()[:16]
+            )
+        )
+
+
+def compose(yaml_path, loader_class):
+    """Parses the YAML document into its node graph"""
+    with open(yaml_path, 'rb') as yaml_file:
+        loader = loader_class(yaml_file)
+        try:
+            return loader.get_single_node()
+        finally:
+            loader.dispose()
+
+
+def read(path):
+    """Returns the cached node graph, or None if there isn't one"""
+    try:
+        with open(path, 'rb') as cache_file:
+            return pickle.load(cache_file)
+    except (IOError, OSError):
+        return None
+    except Exception as ex:
+        log.warn('Ignoring unreadable schema cache %s: %s', path, ex)
+        return None
+
+
+def write(path, node):
+    """Writes the node graph, replacing caches of other versions
+
+    The graph is written to a temporary file that is renamed into place,
+    so a concurrent import never reads a partial cache.
+    """
+    directory = os.path.dirname(path)
+    partial = None
+    try:
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+        handle, partial = tempfile.mkstemp(
+            prefix='{0}.'.format(os.path.basename(path)),
+            suffix='.partial',
+            dir=directory
+            )
+        with os.fdopen(handle, 'wb') as cache_file:
+            pickle.dump(node, cache_file, pickle.HIGHEST_PROTOCOL)
+        os.rename(partial, path)
+    except (IOError, OSError, pickle.PicklingError) as ex:
+        log.debug('Unable to write schema cache %s: %s', path, ex)
+        if partial and os.path.exists(partial):
+            os.remove(partial)
+        return
+    prefix = path.rsplit('.', 2)[0]
+    for stale in glob.glob('{0}.*.cache'.format(prefix)):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except OSError:
+                pass
+
+
+def load_yaml(zenpacklib, yaml_path=YAML_PATH):
+    """Returns zenpacklib's ZenPackSpec for zenpack.yaml, as
+    zenpacklib.load_yaml() does, parsing the YAML only if uncached"""
+    loader_class = find_loader(zenpacklib)
+    if loader_class is None:
+        log.info(
+            'zenpacklib has no %s, loading %s without schema cache',
+            ' or '.join(LOADERS),
+            yaml_path
+            )
+        return zenpacklib.load_yaml(yaml_path)
+    log.debug('Loading %s with %s', yaml_path, loader_class.__name__)
+
+    try:
+        path = cache_path(yaml_path, zenpacklib)
+        node = read(path)
+        if node is None:
+            node = compose(yaml_path, loader_class)
+            write(path, node)
+        loader = loader_class('')
+        try:
+            spec = loader.construct_document(node)
+        finally:
+            loader.dispose()
+    except Exception as ex:
+        log.warn('Loading %s without schema cache: %s', yaml_path, ex)
+        return zenpacklib.load_yaml(yaml_path)
+
+    spec.create()
+    return spec